@@ -1,26 +1,81 @@
 import os
+import threading
+import time
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, g, jsonify, render_template, request
 from flask_cors import CORS, cross_origin
 
+from cnn_classifier.components.training_job import TrainingJobManager
+from cnn_classifier.config.configuration import ConfigurationManager
 from cnn_classifier.pipeline.prediction import PredictionPipeline
-from cnn_classifier.utils.common import decode_image
+from cnn_classifier.utils.common import decode_base64
+from cnn_classifier.utils.monitoring import (PHASE_LATENCY, REQUEST_LATENCY,
+                                             REQUESTS, render_metrics)
+from main import run_pipelines
 
 os.putenv("LANG", "en_US.UTF-8")
 os.putenv("LC_ALL", "en_US.UTF-8")
 
 
 app = Flask(__name__)
+serving_config = ConfigurationManager().get_serving_config()
+# Larger uploads are rejected with 413 before they are read
+app.config["MAX_CONTENT_LENGTH"] = serving_config.max_upload_bytes
 CORS(app)
 
 
 class Client:
     def __init__(self):
-        self.file_name = "input_image.jpg"
-        self.classifier = PredictionPipeline(self.file_name)
+        configuration_manager = ConfigurationManager()
+        self.classifier = PredictionPipeline(
+            config=configuration_manager.get_prediction_config()
+        )
+        self.training_jobs = TrainingJobManager(
+            config=configuration_manager.get_training_job_config(),
+            target=run_pipelines,
+        )
 
 
-client = Client()
+client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> Client:
+    """
+    Returns the client of this process, creating it on first use. Under gunicorn every forked
+    worker creates its own, since the TensorFlow runtime cannot be shared across a fork.
+
+    Returns:
+        Client: The client holding the loaded model.
+    """
+    global client
+    with _client_lock:
+        if client is None:
+            client = Client()
+
+    return client
+
+
+@app.before_request
+def start_timer():
+    g.start_time = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    endpoint = request.endpoint or "unknown"
+    if endpoint != "metrics":
+        REQUEST_LATENCY.labels(endpoint=endpoint).observe(
+            time.perf_counter() - g.start_time
+        )
+        REQUESTS.labels(endpoint=endpoint, status=response.status_code).inc()
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    body, content_type = render_metrics()
+    return body, 200, {"Content-Type": content_type}
 
 
 @app.route("/", methods=["GET"])
@@ -32,21 +87,87 @@ def index():
 @app.route("/train", methods=["GET", "POST"])
 @cross_origin()
 def train():
-    os.system("python main.py")
-    # os.system("dvc repro")
-    return "Training completed successfully"
+    # Training runs in a separate process so /predict keeps being served meanwhile
+    try:
+        job = get_client().training_jobs.submit()
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify(job), 202
+
+
+@app.route("/train/<job_id>", methods=["GET"])
+@cross_origin()
+def train_status(job_id: str):
+    job = get_client().training_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown training job: {job_id}"}), 404
+    return jsonify(job)
+
+
+def read_image() -> bytes:
+    """
+    Reads the encoded image of a prediction request from a `multipart/form-data` upload
+    (field `image`), a raw `image/*` or `application/octet-stream` body, or the base64
+    encoded `image` field of a JSON body.
+
+    Returns:
+        bytes: The encoded image bytes.
+    """
+    if request.mimetype == "multipart/form-data":
+        return request.files["image"].read()
+    if request.mimetype.startswith("image/") or (
+        request.mimetype == "application/octet-stream"
+    ):
+        return request.get_data(cache=False)
+
+    return decode_base64(request.json["image"])
 
 
 @app.route("/predict", methods=["POST"])
 @cross_origin()
 def predict():
-    image = request.json["image"]
-    file_name = client.file_name
-    decode_image(image, file_name)
-    result = client.classifier.predict()
+    with PHASE_LATENCY.labels(phase="decode").time():
+        try:
+            img_bytes = read_image()
+        except KeyError:
+            return jsonify({"error": "Missing image in request"}), 400
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": f"Invalid image: {e}"}), 400
+    if not img_bytes:
+        return jsonify({"error": "Empty image in request"}), 400
+    try:
+        result = get_client().classifier.predict(img_bytes)
+    except (ValueError, OSError) as e:
+        # Raised by decoding an image PIL cannot identify or read
+        return jsonify({"error": f"Invalid image: {e}"}), 400
+    with PHASE_LATENCY.labels(phase="serialization").time():
+        return jsonify(result)
+
+
+@app.route("/predict/batch", methods=["POST"])
+@cross_origin()
+def predict_batch():
+    try:
+        img_strs = request.json["images"]
+    except KeyError:
+        return jsonify({"error": "Missing images in request"}), 400
+    if not isinstance(img_strs, list):
+        return jsonify({"error": "images must be a list"}), 400
+    if len(img_strs) > serving_config.max_batch_images:
+        error = f"At most {serving_config.max_batch_images} images per request"
+        return jsonify({"error": error}), 400
+
+    classifier = get_client().classifier
+    try:
+        images = classifier.preprocess_batch(img_strs)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result = classifier.predict_batch(images)
     return jsonify(result)
 
 
 if __name__ == "__main__":
+    # Development server, use `gunicorn --config gunicorn.conf.py app:app` for deployment
+    get_client()
     # app.run(host="0.0.0.0", port=8080, debug=True)  # for debugging
-    app.run(host="0.0.0.0", port=8080)  # for deployment
+    app.run(host="0.0.0.0", port=8080)
@@ -0,0 +1,168 @@
+"""
+Asynchronous variant of the prediction API, served with an ASGI server:
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 8080
+
+Request bodies are read without blocking, decoding and inference run on a dedicated executor,
+and requests beyond the in-flight limit are rejected with a Retry-After header so latency stays
+bounded under overload.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+
+from cnn_classifier import logger
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.pipeline.prediction import PredictionPipeline
+from cnn_classifier.utils.monitoring import render_metrics
+
+configuration_manager = ConfigurationManager()
+serving_config = configuration_manager.get_serving_config()
+
+
+class InFlightLimiter:
+    def __init__(self, max_in_flight: int):
+        """
+        Initializes the limiter which bounds the number of requests being processed.
+        It is only used from the event loop thread, so it needs no locking.
+
+        Args:
+            max_in_flight (int): The maximum number of admitted requests.
+        """
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        """
+        Admits a request if the limit is not reached.
+
+        Returns:
+            bool: True if the request was admitted.
+        """
+        if self.in_flight >= self.max_in_flight:
+            return False
+        self.in_flight += 1
+
+        return True
+
+    def release(self):
+        """Releases an admitted request."""
+        self.in_flight -= 1
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model before accepting requests
+    app.state.classifier = PredictionPipeline(
+        config=configuration_manager.get_prediction_config()
+    )
+    app.state.executor = ThreadPoolExecutor(
+        max_workers=serving_config.inference_workers, thread_name_prefix="inference"
+    )
+    app.state.limiter = InFlightLimiter(serving_config.max_in_flight)
+    yield
+    app.state.executor.shutdown(wait=True)
+    if app.state.classifier.batcher is not None:
+        app.state.classifier.batcher.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def limit_in_flight(request: Request, call_next):
+    # Shed load before the request body is read, CORS preflights are never rejected
+    if request.method == "OPTIONS" or not request.url.path.startswith("/predict"):
+        return await call_next(request)
+
+    limiter = request.app.state.limiter
+    if not limiter.try_acquire():
+        logger.warning(f"Rejecting {request.url.path}, {limiter.in_flight} in flight")
+        return JSONResponse(
+            {"error": "Server is overloaded, retry later"},
+            status_code=serving_config.overload_status_code,
+            headers={"Retry-After": str(serving_config.retry_after_sec)},
+        )
+    try:
+        return await call_next(request)
+    finally:
+        limiter.release()
+
+
+# Added last so it is the outermost middleware, which also adds the CORS headers to the
+# responses of requests rejected by the limiter
+app.add_middleware(CORSMiddleware, allow_origins=["*"])
+
+
+async def _read_json(request: Request) -> dict:
+    """
+    Reads and parses the JSON request body without blocking the event loop on slow clients.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        dict: The parsed body.
+    """
+    return json.loads(await request.body())
+
+
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "in_flight": app.state.limiter.in_flight}
+
+
+@app.post("/predict")
+async def predict(request: Request):
+    try:
+        img_str = (await _read_json(request))["image"]
+    except (ValueError, KeyError, TypeError) as e:
+        return JSONResponse({"error": f"Invalid request: {e}"}, status_code=400)
+
+    try:
+        return await request.app.state.classifier.predict_async(
+            img_str, request.app.state.executor
+        )
+    except (ValueError, TypeError, OSError) as e:
+        # Raised by invalid base64 or an image PIL cannot identify or read
+        return JSONResponse({"error": f"Invalid image: {e}"}, status_code=400)
+
+
+@app.post("/predict/batch")
+async def predict_batch(request: Request):
+    try:
+        img_strs = (await _read_json(request))["images"]
+    except (ValueError, KeyError, TypeError) as e:
+        return JSONResponse({"error": f"Invalid request: {e}"}, status_code=400)
+    if not isinstance(img_strs, list):
+        return JSONResponse({"error": "images must be a list"}, status_code=400)
+    if len(img_strs) > serving_config.max_batch_images:
+        return JSONResponse(
+            {"error": f"At most {serving_config.max_batch_images} images per request"},
+            status_code=400,
+        )
+
+    try:
+        return await request.app.state.classifier.predict_batch_async(
+            img_strs, request.app.state.executor
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    host, port = serving_config.bind.rsplit(":", 1)
+    uvicorn.run(app, host=host, port=int(port))
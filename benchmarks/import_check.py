@@ -0,0 +1,113 @@
+"""
+Import-time regression check for the CLI stages and the configuration loading.
+
+Runs every check in a fresh interpreter, measures its import time and fails when it pulls
+in a heavy dependency it does not need, e.g.:
+
+    python benchmarks/import_check.py
+    python benchmarks/import_check.py --output import_check.json
+
+The same checks run as part of the test suite in tests/test_import_check.py.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["tensorflow", "keras", "mlflow", "gdown"]
+
+# Code run by each check and the heavy modules it must not import
+CHECKS = {
+    "config": (
+        "from cnn_classifier.config.configuration import ConfigurationManager\n"
+        "configuration_manager = ConfigurationManager()\n"
+        "configuration_manager.get_data_ingestion_config()\n"
+        "configuration_manager.get_pipeline_runner_config()",
+        HEAVY_MODULES,
+    ),
+    "data_ingestion_pipeline": (
+        "import cnn_classifier.pipeline.data_ingestion_pipeline",
+        ["tensorflow", "keras", "mlflow"],
+    ),
+    "data_preprocessing_pipeline": (
+        "import cnn_classifier.pipeline.data_preprocessing_pipeline",
+        HEAVY_MODULES,
+    ),
+    "main": (
+        "import main",
+        HEAVY_MODULES,
+    ),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({code!r})
+duration = time.perf_counter() - start
+print(json.dumps({{
+    "import_sec": duration,
+    "imported": [name for name in {forbidden!r} if name in sys.modules],
+}}))
+"""
+
+
+def run_check(code: str, forbidden: list) -> dict:
+    """
+    Runs the code of a check in a fresh interpreter.
+
+    Args:
+        code (str): The code to run.
+        forbidden (list): The top-level modules the code must not import.
+
+    Returns:
+        dict: The import time, the forbidden modules which were imported and whether the check passed.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.join(REPO_ROOT, "src"), REPO_ROOT, env.get("PYTHONPATH", "")]
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", PROBE.format(code=code, forbidden=forbidden)],
+        cwd=REPO_ROOT,
+        env=env,
+        text=True,
+    )
+    # The logger also writes to stdout, the result is the last line
+    result = json.loads(output.strip().splitlines()[-1])
+    result["passed"] = not result["imported"]
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--only", nargs="+", choices=list(CHECKS), default=list(CHECKS)
+    )
+    parser.add_argument("--output", help="Path of the JSON results file.")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only:
+        code, forbidden = CHECKS[name]
+        results[name] = run_check(code, forbidden)
+        status = "ok" if results[name]["passed"] else "FAILED"
+        message = f"{name}: {results[name]['import_sec']:.2f}s {status}"
+        if results[name]["imported"]:
+            message += f" (imported {', '.join(results[name]['imported'])})"
+        print(message)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Import check results saved at: {args.output}")
+
+    if not all(result["passed"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
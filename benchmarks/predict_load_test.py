@@ -0,0 +1,121 @@
+"""
+Load test for the prediction service comparing unbatched inference with
+dynamic micro-batching at different latency budgets.
+
+Run from the repository root, e.g.:
+
+    python benchmarks/predict_load_test.py --concurrency 1 4 16 --max-latency-ms 0 5 10 20
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from cnn_classifier.components.micro_batcher import MicroBatcher
+from cnn_classifier.components.model_holder import ModelHolder
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.utils.common import load_image_array
+
+
+def run_load(predict_one, image: np.ndarray, concurrency: int, requests: int) -> dict:
+    """
+    Fires `requests` predictions from `concurrency` client threads and records latencies.
+
+    Args:
+        predict_one (Callable): Function predicting a single preprocessed image.
+        image (np.ndarray): The preprocessed image sent by every client.
+        concurrency (int): The number of concurrent clients.
+        requests (int): The total number of requests.
+
+    Returns:
+        dict: Throughput and latency percentiles for the run.
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def client(_):
+        start = time.perf_counter()
+        predict_one(image)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(client, range(requests)))
+    wall_time = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "throughput_rps": requests / wall_time,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--image", default="input_image.jpg")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--max-latency-ms",
+        type=float,
+        nargs="+",
+        default=[0, 5, 10, 20],
+        help="Batching latency budgets to compare, 0 disables batching.",
+    )
+    parser.add_argument("--max-batch-size", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Optional JSON output file.")
+    args = parser.parse_args()
+
+    config = ConfigurationManager().get_prediction_config()
+    max_batch_size = args.max_batch_size or config.max_batch_size
+    model_holder = ModelHolder(
+        model_path=config.model_path, image_size=config.image_size
+    )
+    model_holder.load()
+
+    with open(args.image, "rb") as f:
+        image = load_image_array(f.read(), target_size=config.image_size[:-1])
+
+    results = []
+    for max_latency_ms in args.max_latency_ms:
+        batcher = None
+        if max_latency_ms > 0:
+            batcher = MicroBatcher(
+                predict_fn=model_holder.predict,
+                max_batch_size=max_batch_size,
+                max_latency_ms=max_latency_ms,
+            )
+            predict_one = batcher.predict
+        else:
+            predict_one = lambda x: model_holder.predict(np.expand_dims(x, axis=0))
+
+        for concurrency in args.concurrency:
+            result = run_load(predict_one, image, concurrency, args.requests)
+            result["max_latency_ms"] = max_latency_ms
+            result["max_batch_size"] = max_batch_size if batcher else 1
+            results.append(result)
+            print(
+                f"latency budget {max_latency_ms:>5.1f} ms | concurrency {concurrency:>3} | "
+                f"{result['throughput_rps']:8.2f} req/s | p50 {result['p50_ms']:8.2f} ms | "
+                f"p99 {result['p99_ms']:8.2f} ms"
+            )
+
+        if batcher is not None:
+            batcher.close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
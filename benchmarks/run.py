@@ -0,0 +1,331 @@
+"""
+End-to-end benchmark suite for the training, evaluation and serving hot paths.
+
+Runs offline against a synthetic CT-like dataset and a tiny stand-in model and writes
+machine-readable JSON so results can be compared across commits, e.g.:
+
+    python benchmarks/run.py --output bench_output.json
+    python benchmarks/run.py --only decode inference --images-per-class 16
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from dataclasses import replace
+from typing import Optional
+
+import numpy as np
+
+from predict_load_test import run_load
+from synthetic import REPO_ROOT, make_workspace
+
+BENCHMARKS = [
+    "decode",
+    "input_pipeline",
+    "train_eval",
+    "model_load",
+    "inference",
+    "flask",
+]
+
+
+def summarize(latencies: list) -> dict:
+    """
+    Summarizes latencies in seconds as milliseconds percentiles.
+
+    Args:
+        latencies (list): The measured latencies in seconds.
+
+    Returns:
+        dict: The p50, p99 and mean latency in milliseconds.
+    """
+    latencies_ms = np.array(latencies) * 1000
+
+    return {
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "mean_ms": float(np.mean(latencies_ms)),
+    }
+
+
+def bench_decode(paths: dict, image_size: list) -> dict:
+    """Measures in-memory JPEG decode and resize throughput."""
+    from cnn_classifier.utils.common import load_image_array
+
+    files = []
+    for root, _, names in os.walk(paths["data_path"]):
+        files.extend(os.path.join(root, name) for name in names)
+    payloads = []
+    for file_name in files:
+        with open(file_name, "rb") as f:
+            payloads.append(f.read())
+
+    start = time.perf_counter()
+    for payload in payloads:
+        load_image_array(payload, target_size=image_size[:-1])
+    elapsed = time.perf_counter() - start
+
+    return {"images": len(payloads), "images_per_sec": len(payloads) / elapsed}
+
+
+def bench_input_pipeline(epochs: int) -> dict:
+    """Measures training input pipeline throughput per epoch for every input pipeline."""
+    from cnn_classifier.components.model_trainer import ModelTrainer
+    from cnn_classifier.config.configuration import ConfigurationManager
+    from cnn_classifier.pipeline.data_preprocessing_pipeline import (
+        DataPreprocessingPipeline,
+    )
+
+    configuration_manager = ConfigurationManager()
+    results = {}
+
+    start = time.perf_counter()
+    DataPreprocessingPipeline().run_pipeline(configuration_manager)
+    results["dataset_cache_build_sec"] = time.perf_counter() - start
+
+    base_config = configuration_manager.get_model_trainer_config()
+    for input_pipeline in ("generator", "tf_data", "cache"):
+        for augmentation in (False, True):
+            trainer = ModelTrainer(
+                config=replace(
+                    base_config,
+                    input_pipeline=input_pipeline,
+                    augmentation=augmentation,
+                )
+            )
+            trainer.train_val_generator()
+
+            epoch_rates = []
+            for _ in range(epochs):
+                images = 0
+                start = time.perf_counter()
+                if input_pipeline == "tf_data":
+                    for x, _ in trainer.train_dataset:
+                        images += len(x)
+                else:
+                    for i in range(len(trainer.train_generator)):
+                        images += len(trainer.train_generator[i][0])
+                    trainer.train_generator.on_epoch_end()
+                epoch_rates.append(images / (time.perf_counter() - start))
+
+            name = f"{input_pipeline}{'_augmented' if augmentation else ''}"
+            results[name] = {"images_per_sec_per_epoch": epoch_rates}
+
+    return results
+
+
+def bench_train_eval(paths: dict, epochs: int) -> dict:
+    """Measures ModelTrainer steps/sec and ModelEvaluation.evaluation() wall time."""
+    import shutil
+
+    from cnn_classifier.components.model_evaluation import ModelEvaluation
+    from cnn_classifier.components.model_trainer import ModelTrainer
+    from cnn_classifier.config.configuration import ConfigurationManager
+
+    configuration_manager = ConfigurationManager()
+    trainer_config = replace(
+        configuration_manager.get_model_trainer_config(), epochs=epochs
+    )
+    os.makedirs(os.path.dirname(trainer_config.updated_base_model_path), exist_ok=True)
+    shutil.copyfile(paths["model_path"], trainer_config.updated_base_model_path)
+
+    trainer = ModelTrainer(config=trainer_config)
+    trainer.get_base_model()
+    trainer.train_val_generator()
+    start = time.perf_counter()
+    trainer.train()
+    train_sec = time.perf_counter() - start
+    steps = trainer.steps_per_epoch * epochs
+
+    model_evaluation = ModelEvaluation(
+        config=configuration_manager.get_model_evaluation_config()
+    )
+    start = time.perf_counter()
+    model_evaluation.evaluation()
+    evaluation_sec = time.perf_counter() - start
+
+    return {
+        "train_sec": train_sec,
+        "train_steps_per_sec": steps / train_sec,
+        "evaluation_sec": evaluation_sec,
+    }
+
+
+def bench_model_load(paths: dict, image_size: list) -> dict:
+    """Measures model load time with and without the warm-up inference."""
+    from cnn_classifier.components.model_holder import ModelHolder
+
+    results = {}
+    for warm_up in (False, True):
+        model_holder = ModelHolder(
+            model_path=paths["model_path"], image_size=image_size, warm_up=warm_up
+        )
+        start = time.perf_counter()
+        model_holder.load()
+        load_sec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model_holder.predict(np.zeros((1, *image_size), dtype=np.float32))
+        first_predict_sec = time.perf_counter() - start
+
+        results["warm_up" if warm_up else "cold"] = {
+            "load_sec": load_sec,
+            "first_predict_sec": first_predict_sec,
+        }
+
+    return results
+
+
+def bench_inference(paths: dict, image_size: list, requests: int) -> dict:
+    """Measures single, batched and micro-batched inference latency."""
+    from cnn_classifier.components.micro_batcher import MicroBatcher
+    from cnn_classifier.components.model_holder import ModelHolder
+    from cnn_classifier.utils.common import load_image_array
+
+    model_holder = ModelHolder(model_path=paths["model_path"], image_size=image_size)
+    model_holder.load()
+    with open(paths["sample_image"], "rb") as f:
+        image = load_image_array(f.read(), target_size=image_size[:-1])
+
+    results = {}
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        model_holder.predict(np.expand_dims(image, axis=0))
+        latencies.append(time.perf_counter() - start)
+    results["single"] = summarize(latencies)
+
+    for batch_size in (8, 32):
+        batch = np.stack([image] * batch_size)
+        latencies = []
+        for _ in range(max(requests // batch_size, 5)):
+            start = time.perf_counter()
+            model_holder.predict(batch)
+            latencies.append(time.perf_counter() - start)
+        results[f"batch_{batch_size}"] = {
+            **summarize(latencies),
+            "images_per_sec": batch_size / float(np.median(latencies)),
+        }
+
+    batcher = MicroBatcher(
+        predict_fn=model_holder.predict, max_batch_size=16, max_latency_ms=5
+    )
+    results["micro_batched"] = [
+        run_load(batcher.predict, image, concurrency, requests)
+        for concurrency in (1, 8, 32)
+    ]
+    batcher.close()
+
+    return results
+
+
+def bench_flask(paths: dict, requests: int) -> dict:
+    """Measures /predict request latency of the Flask app under concurrent load."""
+    from werkzeug.serving import make_server
+
+    sys.path.insert(0, REPO_ROOT)
+    import app as flask_app
+
+    # Load the model up front so it is not part of the measured latencies
+    flask_app.get_client()
+    server = make_server("127.0.0.1", 0, flask_app.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/predict"
+
+    with open(paths["sample_image"], "rb") as f:
+        body = json.dumps({"image": base64.b64encode(f.read()).decode()}).encode()
+
+    def post(_):
+        request = urllib.request.Request(
+            url, data=body, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request) as response:
+            response.read()
+
+    try:
+        return {
+            "predict": [
+                run_load(post, None, concurrency, requests)
+                for concurrency in (1, 8, 32)
+            ]
+        }
+    finally:
+        server.shutdown()
+
+
+def git_commit() -> Optional[str]:
+    """Returns the current git commit of the repository, if available."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--images-per-class", type=int, default=64)
+    parser.add_argument("--image-size", type=int, nargs=3, default=[224, 224, 3])
+    parser.add_argument("--stored-size", type=int, nargs=2, default=[512, 512])
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--workspace", default=None)
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    workspace = args.workspace or tempfile.mkdtemp(prefix="cnn_classifier_bench_")
+    paths = make_workspace(
+        workspace, args.images_per_class, args.image_size, tuple(args.stored_size)
+    )
+    # The configuration manager, logger and app resolve their files relative to the working directory
+    os.chdir(workspace)
+
+    results = {}
+    for name in args.only:
+        print(f"Running benchmark: {name}")
+        if name == "decode":
+            results[name] = bench_decode(paths, args.image_size)
+        elif name == "input_pipeline":
+            results[name] = bench_input_pipeline(args.epochs)
+        elif name == "train_eval":
+            results[name] = bench_train_eval(paths, args.epochs)
+        elif name == "model_load":
+            results[name] = bench_model_load(paths, args.image_size)
+        elif name == "inference":
+            results[name] = bench_inference(paths, args.image_size, args.requests)
+        elif name == "flask":
+            results[name] = bench_flask(paths, args.requests)
+
+    import tensorflow as tf
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "tensorflow": tf.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": vars(args),
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Benchmark results saved at: {output}")
+
+
+if __name__ == "__main__":
+    main()
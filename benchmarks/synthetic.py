@@ -0,0 +1,150 @@
+"""
+Synthetic CT-like dataset, tiny stand-in model and throwaway workspace used by the
+benchmarks so they run offline without the real dataset or the VGG16 model.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import yaml
+from PIL import Image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLASS_NAMES = ["adenocarcinoma", "normal"]
+# Marks a directory created by make_workspace, the only non-empty directories it replaces
+WORKSPACE_MARKER = ".benchmark_workspace"
+
+
+def make_ct_image(rng: np.random.Generator, size: tuple) -> Image.Image:
+    """
+    Draws a grayscale CT-like slice: a bright elliptical body with darker lungs and noise.
+
+    Args:
+        rng (np.random.Generator): The random generator.
+        size (tuple): The image size as (height, width).
+
+    Returns:
+        Image.Image: The RGB image.
+    """
+    height, width = size
+    y, x = np.mgrid[0:height, 0:width]
+    cy, cx = height / 2, width / 2
+    body = ((x - cx) / (0.45 * width)) ** 2 + ((y - cy) / (0.35 * height)) ** 2 < 1
+    lungs = (
+        ((np.abs(x - cx) - 0.18 * width) / (0.12 * width)) ** 2
+        + ((y - cy) / (0.22 * height)) ** 2
+    ) < 1
+    image = 40 + 140 * body - 110 * (body & lungs) + rng.normal(0, 12, size)
+    image = np.clip(image, 0, 255).astype(np.uint8)
+
+    return Image.fromarray(image).convert("RGB")
+
+
+def make_dataset(data_path: str, images_per_class: int, size: tuple, seed: int = 42):
+    """
+    Writes a synthetic dataset with one sub-directory of JPEGs per class.
+
+    Args:
+        data_path (str): The dataset directory.
+        images_per_class (int): The number of images per class.
+        size (tuple): The stored image size as (height, width).
+        seed (int, optional): The random seed. Defaults to 42.
+    """
+    rng = np.random.default_rng(seed)
+    for class_name in CLASS_NAMES:
+        class_dir = os.path.join(data_path, class_name)
+        os.makedirs(class_dir, exist_ok=True)
+        for i in range(images_per_class):
+            make_ct_image(rng, size).save(
+                os.path.join(class_dir, f"{i:05d}.jpg"), quality=90
+            )
+
+
+def make_tiny_model(path: str, image_size: list):
+    """
+    Saves a tiny stand-in classifier with the same input, head layer names and
+    compile settings as the real model.
+
+    Args:
+        path (str): The path to save the `.keras` model to.
+        image_size (list): The model input size, e.g. [224, 224, 3].
+    """
+    import tensorflow as tf
+
+    inputs = tf.keras.Input(shape=image_size)
+    x = tf.keras.layers.Conv2D(8, 3, strides=4, activation="relu")(inputs)
+    x = tf.keras.layers.MaxPooling2D(4)(x)
+    x = tf.keras.layers.Flatten(name="head_flatten")(x)
+    outputs = tf.keras.layers.Dense(
+        len(CLASS_NAMES), activation="softmax", name="head_output"
+    )(x)
+    model = tf.keras.models.Model(inputs=inputs, outputs=outputs)
+    model.compile(
+        optimizer=tf.keras.optimizers.legacy.SGD(learning_rate=0.01),
+        loss=tf.keras.losses.CategoricalCrossentropy(),
+        metrics=["accuracy"],
+    )
+    model.save(path)
+
+
+def make_workspace(
+    workspace: str, images_per_class: int, image_size: list, stored_size: tuple
+) -> dict:
+    """
+    Creates a workspace mirroring the repository layout (config, params and artifacts)
+    so the real ConfigurationManager, components and app can run against synthetic data.
+
+    Args:
+        workspace (str): The workspace directory, recreated from scratch. It must be empty,
+            missing or a workspace created earlier.
+        images_per_class (int): The number of synthetic images per class.
+        image_size (list): The model input size, e.g. [224, 224, 3].
+        stored_size (tuple): The size of the stored JPEGs as (height, width).
+
+    Raises:
+        ValueError: If the workspace is a non-empty directory not created by this function.
+
+    Returns:
+        dict: Paths of interest inside the workspace.
+    """
+    if os.path.isdir(workspace) and os.listdir(workspace):
+        if not os.path.exists(os.path.join(workspace, WORKSPACE_MARKER)):
+            raise ValueError(
+                f"Refusing to replace {workspace}, it is not empty and is not a "
+                "benchmark workspace"
+            )
+        shutil.rmtree(workspace)
+    os.makedirs(os.path.join(workspace, "config"), exist_ok=True)
+    open(os.path.join(workspace, WORKSPACE_MARKER), "w").close()
+
+    with open(os.path.join(REPO_ROOT, "config", "config.yaml")) as f:
+        config = yaml.safe_load(f)
+    with open(os.path.join(REPO_ROOT, "params.yaml")) as f:
+        params = yaml.safe_load(f)
+
+    model_path = "artifacts/benchmark/tiny_model.keras"
+    # The benchmarks resend the same image, which the prediction cache would short-circuit
+    config["prediction"].update(
+        backend="keras", model_path=model_path, hot_reload=False, cache=False
+    )
+    params["params"]["IMAGE_SIZE"] = list(image_size)
+
+    with open(os.path.join(workspace, "config", "config.yaml"), "w") as f:
+        yaml.safe_dump(config, f)
+    with open(os.path.join(workspace, "params.yaml"), "w") as f:
+        yaml.safe_dump(params, f)
+
+    data_path = os.path.join(
+        workspace, config["data_ingestion"]["unzip_dir"], "Chest-CT-Scan-data"
+    )
+    make_dataset(data_path, images_per_class, stored_size)
+    os.makedirs(os.path.join(workspace, os.path.dirname(model_path)), exist_ok=True)
+    make_tiny_model(os.path.join(workspace, model_path), image_size)
+
+    return {
+        "workspace": workspace,
+        "data_path": data_path,
+        "model_path": os.path.join(workspace, model_path),
+        "sample_image": os.path.join(data_path, CLASS_NAMES[0], "00000.jpg"),
+    }
@@ -0,0 +1,65 @@
+"""
+Gunicorn configuration for serving the Flask app in production:
+
+    gunicorn --config gunicorn.conf.py app:app
+
+The app and its imports are preloaded once in the master and shared copy-on-write with the
+forked workers. The TensorFlow runtime is not fork-safe once started, so every worker sizes
+its TF thread pools and then loads and warms up its own model before accepting requests.
+"""
+
+import os
+
+from cnn_classifier.config.configuration import ConfigurationManager
+
+serving_config = ConfigurationManager().get_serving_config()
+
+bind = serving_config.bind
+workers = serving_config.workers
+threads = serving_config.threads
+worker_class = "gthread"
+timeout = serving_config.timeout
+preload_app = True
+
+
+def post_fork(server, worker):
+    """
+    Configures the TensorFlow thread pools of a freshly forked worker and loads its model.
+
+    Args:
+        server (gunicorn.arbiter.Arbiter): The gunicorn master.
+        worker (gunicorn.workers.base.Worker): The forked worker.
+    """
+    import tensorflow as tf
+
+    import app
+
+    # Split the cores across the workers so they do not oversubscribe the CPU
+    intra_op_threads = serving_config.intra_op_threads or max(
+        1, (os.cpu_count() or 1) // serving_config.workers
+    )
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(
+        serving_config.inter_op_threads
+    )
+
+    app.get_client()
+    server.log.info(
+        f"Worker {worker.pid} loaded the model with {intra_op_threads} intra-op "
+        f"and {serving_config.inter_op_threads} inter-op TF threads"
+    )
+
+
+def child_exit(server, worker):
+    """
+    Drops the Prometheus metrics of an exited worker when metrics are aggregated
+    across workers through `PROMETHEUS_MULTIPROC_DIR`.
+
+    Args:
+        server (gunicorn.arbiter.Arbiter): The gunicorn master.
+        worker (gunicorn.workers.base.Worker): The exited worker.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
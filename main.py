@@ -1,33 +1,128 @@
+import argparse
+import importlib
+from typing import Callable, Optional
+
+from cnn_classifier import logger
+from cnn_classifier.components.model_store import ModelStore
+from cnn_classifier.components.stage_fingerprint import StageFingerprint
 from cnn_classifier.config.configuration import ConfigurationManager
-from cnn_classifier.pipeline.data_ingestion_pipeline import DataIngestionPipeline
-from cnn_classifier.pipeline.model_evaluation_pipeline import ModelEvaluationPipeline
-from cnn_classifier.pipeline.model_trainer_pipeline import ModelTrainerPipeline
-from cnn_classifier.pipeline.prepare_base_model_pipeline import PrepareBaseModelPipeline
 
+# Pipeline classes by pipeline name. They are imported only when their stage runs, so
+# skipped stages and TensorFlow-free stages do not pay for importing TensorFlow and MLflow
 pipelines = {
-    "data_ingestion_pipeline": DataIngestionPipeline(),
-    "prepare_base_model_pipeline": PrepareBaseModelPipeline(),
-    "model_trainer_pipeline": ModelTrainerPipeline(),
-    "model_evaluation_pipeline": ModelEvaluationPipeline(),
+    "data_ingestion_pipeline": "DataIngestionPipeline",
+    "data_preprocessing_pipeline": "DataPreprocessingPipeline",
+    "prepare_base_model_pipeline": "PrepareBaseModelPipeline",
+    "model_trainer_pipeline": "ModelTrainerPipeline",
+    "model_evaluation_pipeline": "ModelEvaluationPipeline",
+    "model_export_pipeline": "ModelExportPipeline",
+}
+# Pipelines which can exchange live models through a ModelStore
+model_pipelines = {
+    "prepare_base_model_pipeline",
+    "model_trainer_pipeline",
+    "model_evaluation_pipeline",
+    "model_export_pipeline",
 }
 
 
-def run_pipelines(configuration_manager: ConfigurationManager):
+def load_pipeline(pipeline_name: str):
     """
-    Runs the entire pipeline.
+    Imports the module of a pipeline and instantiates its pipeline class.
+
+    Args:
+        pipeline_name (str): The pipeline name, which is also its module name.
+
+    Returns:
+        The pipeline object.
+    """
+    module = importlib.import_module(f"cnn_classifier.pipeline.{pipeline_name}")
+
+    return getattr(module, pipelines[pipeline_name])()
+
+
+def run_pipelines(
+    configuration_manager: ConfigurationManager,
+    progress_callback: Optional[Callable[[str, str], None]] = None,
+    force: bool = False,
+):
+    """
+    Runs the entire pipeline, skipping stages whose `dvc.yaml` deps, params and config
+    section are unchanged since their last successful run. With `in_memory_handoff` enabled
+    the stages pass models to each other in memory and persist them in the background.
 
     Args:
         configuration_manager (ConfigurationManager): The configuration manager object to generat the configurations.
+        progress_callback (Optional[Callable[[str, str], None]], optional): Called with the pipeline name and
+            its status ("running", "succeeded", "failed" or "skipped") around every pipeline. Defaults to None.
+        force (bool, optional): Whether to run every stage regardless of its fingerprint. Defaults to False.
     """
-    for pipeline_name in pipelines:
-        # Get the pipeline using the name
-        pipeline = pipelines[pipeline_name]
-        pipeline.run_pipeline(configuration_manager=configuration_manager)
+    pipeline_runner_config = configuration_manager.get_pipeline_runner_config()
+    stage_fingerprint = StageFingerprint(
+        config=pipeline_runner_config,
+        config_box=configuration_manager.config,
+        params=configuration_manager.params,
+    )
+    model_store = ModelStore() if pipeline_runner_config.in_memory_handoff else None
+
+    # With the model store, earlier stages' models may still be written in the background.
+    # A stage whose inputs were regenerated in this run is therefore never skipped, and the
+    # fingerprints are only computed for saving once the writes are flushed.
+    completed = []
+    try:
+        for pipeline_name in pipelines:
+            stage = pipeline_name.removesuffix("_pipeline")
+            regenerated = model_store is not None and model_store.has_models_under(
+                stage_fingerprint.deps(stage)
+            )
+            if (
+                not force
+                and not regenerated
+                and stage_fingerprint.is_up_to_date(
+                    stage, stage_fingerprint.compute(stage)
+                )
+            ):
+                logger.info(f"Skipping {pipeline_name}, inputs are unchanged")
+                if progress_callback is not None:
+                    progress_callback(pipeline_name, "skipped")
+                continue
+
+            if progress_callback is not None:
+                progress_callback(pipeline_name, "running")
+            pipeline_kwargs = (
+                dict(model_store=model_store)
+                if pipeline_name in model_pipelines
+                else {}
+            )
+            try:
+                # Get the pipeline using the name
+                pipeline = load_pipeline(pipeline_name)
+                pipeline.run_pipeline(
+                    configuration_manager=configuration_manager, **pipeline_kwargs
+                )
+            except Exception:
+                if progress_callback is not None:
+                    progress_callback(pipeline_name, "failed")
+                raise
+            completed.append(stage)
+            if progress_callback is not None:
+                progress_callback(pipeline_name, "succeeded")
+    finally:
+        if model_store is not None:
+            model_store.close()
+        for stage in completed:
+            stage_fingerprint.save(stage, stage_fingerprint.compute(stage))
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the training pipelines.")
+    parser.add_argument(
+        "--force", action="store_true", help="Run every stage even if unchanged."
+    )
+    args = parser.parse_args()
+
     # Instantiate the configuration manager once
     configuration_manager = ConfigurationManager()
 
     # # Run all pipelines
-    run_pipelines(configuration_manager)
+    run_pipelines(configuration_manager, force=args.force)
@@ -0,0 +1,232 @@
+import os
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.python.framework.convert_to_constants import \
+    convert_variables_to_constants_v2
+
+from cnn_classifier import logger
+from cnn_classifier.components.model_trainer import ModelTrainer
+from cnn_classifier.components.prepare_base_model import PrepareBaseModel
+from cnn_classifier.entity.config_entity import (BackboneReportConfig,
+                                                 BaseModelConfig,
+                                                 ModelTrainerConfig)
+from cnn_classifier.utils.common import save_json
+
+
+class BackboneReport:
+    def __init__(
+        self,
+        config: BackboneReportConfig,
+        base_model_config: BaseModelConfig,
+        model_trainer_config: ModelTrainerConfig,
+    ):
+        """
+        Initializes the class with the given BackboneReportConfig object.
+
+        Args:
+            config (BackboneReportConfig): The configuration object for the backbone report.
+            base_model_config (BaseModelConfig): The base model configuration every backbone
+                is prepared with, except for the backbone and the pooling.
+            model_trainer_config (ModelTrainerConfig): The training configuration every backbone
+                is trained with.
+        """
+        self.config = config
+        self.base_model_config = base_model_config
+        self.model_trainer_config = model_trainer_config
+
+    @staticmethod
+    def count_flops(model: tf.keras.Model, image_size: list) -> int:
+        """
+        Counts the floating point operations of a forward pass of one image with the
+        TensorFlow profiler, a multiply-add counting as two operations.
+
+        Args:
+            model (tf.keras.Model): The model.
+            image_size (list): The input image shape.
+
+        Returns:
+            int: The FLOPs per image.
+        """
+        forward = tf.function(lambda x: model(x, training=False))
+        concrete_function = forward.get_concrete_function(
+            tf.TensorSpec([1, *image_size], tf.float32)
+        )
+        graph = convert_variables_to_constants_v2(concrete_function).graph
+        profile = tf.compat.v1.profiler.profile(
+            graph=graph,
+            run_meta=tf.compat.v1.RunMetadata(),
+            cmd="op",
+            options=tf.compat.v1.profiler.ProfileOptionBuilder.float_operation(),
+        )
+
+        return int(profile.total_float_ops)
+
+    def measure_latency(self, model: tf.keras.Model, image_size: list) -> dict:
+        """
+        Measures the CPU latency of single-image predictions after a warm-up prediction.
+
+        Args:
+            model (tf.keras.Model): The model.
+            image_size (list): The input image shape.
+
+        Returns:
+            dict: The p50 and p99 latency in milliseconds.
+        """
+        batch = np.random.default_rng(0).random((1, *image_size), dtype=np.float32)
+        with tf.device("/CPU:0"):
+            model.predict_on_batch(batch)
+            latencies = []
+            for _ in range(self.config.latency_runs):
+                start = time.perf_counter()
+                model.predict_on_batch(batch)
+                latencies.append(time.perf_counter() - start)
+        latencies_ms = np.array(latencies) * 1000
+
+        return {
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p99_ms": float(np.percentile(latencies_ms, 99)),
+        }
+
+    def _report_backbone(self, backbone: str) -> dict:
+        """
+        Prepares, optionally trains, and measures one backbone.
+
+        Args:
+            backbone (str): The backbone name.
+
+        Returns:
+            dict: The parameters, FLOPs, size on disk, CPU latency and validation accuracy.
+        """
+        backbone_dir = os.path.join(self.config.root_dir, backbone)
+        os.makedirs(backbone_dir, exist_ok=True)
+        base_model_config = replace(
+            self.base_model_config,
+            root_dir=backbone_dir,
+            base_model_path=Path(os.path.join(backbone_dir, "base_model.keras")),
+            updated_base_model_path=Path(
+                os.path.join(backbone_dir, "base_model_updated.keras")
+            ),
+            backbone=backbone,
+            pooling=self.config.pooling,
+        )
+        prepare_base_model = PrepareBaseModel(config=base_model_config)
+        prepare_base_model.get_base_model()
+        prepare_base_model.update_base_model()
+        model = prepare_base_model.full_model
+        model_path = base_model_config.updated_base_model_path
+
+        result = {"backbone": backbone}
+        if self.config.train:
+            model_trainer_config = replace(
+                self.model_trainer_config,
+                root_dir=backbone_dir,
+                updated_base_model_path=base_model_config.updated_base_model_path,
+                trained_model_file_path=Path(
+                    os.path.join(backbone_dir, "trained_model.keras")
+                ),
+                feature_cache_dir=Path(os.path.join(backbone_dir, "feature_cache")),
+                checkpoint_dir=Path(os.path.join(backbone_dir, "checkpoints")),
+                checkpoint_every_epochs=None,
+                resume=False,
+            )
+            model_trainer = ModelTrainer(config=model_trainer_config)
+            model_trainer.train_val_generator()
+            model_trainer.get_base_model()
+            model_trainer.train()
+            model = model_trainer.model
+            model_path = model_trainer_config.trained_model_file_path
+
+            validation_data = (
+                model_trainer.val_dataset
+                if model_trainer_config.input_pipeline == "tf_data"
+                else model_trainer.val_generator
+            )
+            result["val_accuracy"] = float(
+                model.evaluate(validation_data, return_dict=True)["accuracy"]
+            )
+            result["images_processed"] = model_trainer.images_processed
+
+        image_size = base_model_config.image_size
+        result.update(
+            params=int(model.count_params()),
+            trainable_params=int(
+                sum(np.prod(weight.shape) for weight in model.trainable_weights)
+            ),
+            flops=self.count_flops(model, image_size),
+            size_mb=os.path.getsize(model_path) / 2**20,
+            latency=self.measure_latency(model, image_size),
+        )
+
+        return result
+
+    def _recommend(self, results: list) -> Optional[str]:
+        """
+        Picks the backbone with the lowest CPU latency reaching the accuracy bar.
+
+        Args:
+            results (list): The backbone results.
+
+        Returns:
+            Optional[str]: The recommended backbone, or None without an accuracy bar or a backbone reaching it.
+        """
+        if self.config.accuracy_bar is None:
+            return None
+        candidates = [
+            result
+            for result in results
+            if result.get("val_accuracy", -1.0) >= self.config.accuracy_bar
+        ]
+        if not candidates:
+            return None
+
+        fastest = min(candidates, key=lambda result: result["latency"]["p50_ms"])
+
+        return fastest["backbone"]
+
+    def run(self) -> dict:
+        """
+        Reports every configured backbone one after the other and saves the report.
+
+        Returns:
+            dict: The report.
+        """
+        results = []
+        for backbone in self.config.backbones:
+            logger.info(f"Reporting backbone {backbone}")
+            try:
+                result = self._report_backbone(backbone)
+            except Exception as e:
+                logger.error(f"Reporting backbone {backbone} failed: {e}")
+                result = {"backbone": backbone, "error": str(e)}
+            else:
+                message = (
+                    f"{backbone}: {result['params'] / 1e6:.1f}M params, "
+                    f"{result['flops'] / 1e9:.2f} GFLOPs, {result['size_mb']:.1f} MB, "
+                    f"p50 {result['latency']['p50_ms']:.1f} ms"
+                )
+                if "val_accuracy" in result:
+                    message += f", val_accuracy {result['val_accuracy']:.4f}"
+                logger.info(message)
+            results.append(result)
+            # Release the graphs of the previous backbone before building the next one
+            tf.keras.backend.clear_session()
+
+        self.images_processed = sum(
+            result.get("images_processed", 0) for result in results
+        )
+        report = {
+            "pooling": self.config.pooling,
+            "accuracy_bar": self.config.accuracy_bar,
+            "recommended": self._recommend(results),
+            "backbones": results,
+        }
+        save_json(Path(self.config.report_file), report)
+        if report["recommended"] is not None:
+            logger.info(f"Recommended backbone: {report['recommended']}")
+
+        return report
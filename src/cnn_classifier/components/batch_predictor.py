@@ -0,0 +1,194 @@
+import csv
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from cnn_classifier import logger
+from cnn_classifier.entity.config_entity import BatchPredictionConfig
+from cnn_classifier.pipeline.prediction import PredictionPipeline
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+OUTPUT_FIELDS = ["file", "label", "score", "error"]
+# How often the loader thread blocked on a full queue checks whether the consumer stopped
+PUT_TIMEOUT_SEC = 0.1
+
+
+class BatchPredictor:
+    def __init__(self, config: BatchPredictionConfig, classifier: PredictionPipeline):
+        """
+        Initializes the class with the given BatchPredictionConfig object and prediction pipeline.
+
+        Args:
+            config (BatchPredictionConfig): The configuration object for batch prediction.
+            classifier (PredictionPipeline): The prediction pipeline holding the loaded model.
+        """
+        self.config = config
+        self.classifier = classifier
+
+    @staticmethod
+    def iter_image_files(input_dir: Path) -> Iterator[str]:
+        """
+        Lazily walks the input directory in a stable order and yields image file paths.
+
+        Args:
+            input_dir (Path): The directory to score.
+
+        Yields:
+            str: The path of an image file.
+        """
+        for root, dirs, files in os.walk(input_dir):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, file_name)
+
+    def _load(self, path: str) -> tuple:
+        """
+        Reads and preprocesses a single image file.
+
+        Args:
+            path (str): The path of the image file.
+
+        Returns:
+            tuple: The path, the image array (None on failure) and the error message (None on success).
+        """
+        try:
+            with open(path, "rb") as f:
+                return path, self.classifier.preprocess(f.read()), None
+        except Exception as e:
+            return path, None, str(e)
+
+    def _iter_batches(self, input_dir: Path) -> Iterator[list]:
+        """
+        Yields batches of loaded images which are decoded by a thread pool running ahead
+        of inference by at most `prefetch_batches` batches, so memory stays bounded.
+
+        Args:
+            input_dir (Path): The directory to score.
+
+        Yields:
+            list: A list of (path, image, error) tuples.
+        """
+        batches = queue.Queue(maxsize=self.config.prefetch_batches)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # Gives up once the consumer stopped, e.g. after an inference error, instead of
+            # blocking on the full queue forever
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=PUT_TIMEOUT_SEC)
+                    return True
+                except queue.Full:
+                    pass
+
+            return False
+
+        def producer():
+            try:
+                with ThreadPoolExecutor(max_workers=self.config.num_workers) as executor:
+                    chunk = []
+                    for path in self.iter_image_files(input_dir):
+                        chunk.append(path)
+                        if len(chunk) == self.config.batch_size:
+                            if not put(list(executor.map(self._load, chunk))):
+                                return
+                            chunk = []
+                    if chunk:
+                        put(list(executor.map(self._load, chunk)))
+            except Exception as e:
+                put(e)
+            finally:
+                put(None)
+
+        thread = threading.Thread(target=producer, name="batch-loader", daemon=True)
+        thread.start()
+        try:
+            while (batch := batches.get()) is not None:
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+
+    def _predict_batch(self, batch: list) -> list:
+        """
+        Runs batched inference over the successfully loaded images of a batch.
+
+        Args:
+            batch (list): A list of (path, image, error) tuples.
+
+        Returns:
+            list: One output row per input file.
+        """
+        loaded = [image for _, image, error in batch if error is None]
+        probabilities = iter(
+            self.classifier.predict_proba(np.stack(loaded), batch_size=len(loaded))
+            if loaded
+            else []
+        )
+
+        rows = []
+        for path, _, error in batch:
+            if error is not None:
+                rows.append({"file": path, "label": None, "score": None, "error": error})
+                continue
+            probability = next(probabilities)
+            class_index = int(np.argmax(probability))
+            rows.append(
+                {
+                    "file": path,
+                    "label": self.classifier.to_label(class_index),
+                    "score": float(probability[class_index]),
+                    "error": None,
+                }
+            )
+
+        return rows
+
+    def predict_directory(self, input_dir: Path, output_file: Optional[Path] = None) -> int:
+        """
+        Scores every image below the input directory and writes the results incrementally
+        to a JSONL or CSV file (chosen by the output file extension).
+
+        Args:
+            input_dir (Path): The directory to score.
+            output_file (Optional[Path], optional): The output file. Defaults to the configured output file.
+
+        Returns:
+            int: The number of files scored.
+        """
+        output_file = output_file or self.config.output_file
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        as_csv = str(output_file).lower().endswith(".csv")
+
+        count = 0
+        with open(output_file, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS) if as_csv else None
+            if writer is not None:
+                writer.writeheader()
+
+            batches = self._iter_batches(input_dir)
+            try:
+                for batch in batches:
+                    for row in self._predict_batch(batch):
+                        if writer is not None:
+                            writer.writerow(row)
+                        else:
+                            f.write(json.dumps(row) + "\n")
+                    f.flush()
+                    count += len(batch)
+                    logger.info(f"Scored {count} images from {input_dir}")
+            finally:
+                # Stops the loader thread right away if scoring failed
+                batches.close()
+
+        logger.info(f"Batch predictions for {count} images saved at: {output_file}")
+
+        return count
@@ -0,0 +1,64 @@
+import math
+from typing import Optional
+
+import numpy as np
+import tensorflow as tf
+
+
+class CachedImageSequence(tf.keras.utils.Sequence):
+    def __init__(
+        self,
+        images: np.ndarray,
+        labels: np.ndarray,
+        indices: np.ndarray,
+        num_classes: int,
+        batch_size: int,
+        shuffle: bool = False,
+        augmentation: Optional[tf.keras.Sequential] = None,
+    ):
+        """
+        Initializes a batch sequence over the memory-mapped dataset cache. It exposes the same
+        `samples`, `batch_size` and `classes` attributes as the `flow_from_directory` iterator.
+
+        Args:
+            images (np.ndarray): The memory-mapped uint8 images.
+            labels (np.ndarray): The class index of every image.
+            indices (np.ndarray): The indices of the images in this subset.
+            num_classes (int): The number of classes.
+            batch_size (int): The batch size.
+            shuffle (bool, optional): Whether to reshuffle the samples every epoch. Defaults to False.
+            augmentation (Optional[tf.keras.Sequential], optional): Augmentation layers applied
+                to every batch. Defaults to None.
+        """
+        super().__init__()
+        self.images = images
+        self.labels = labels
+        self.indices = np.array(indices)
+        self.num_classes = num_classes
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.augmentation = augmentation
+
+        self.samples = len(self.indices)
+        self.classes = self.labels[self.indices]
+        if self.shuffle:
+            np.random.shuffle(self.indices)
+
+    def __len__(self) -> int:
+        return math.ceil(self.samples / self.batch_size)
+
+    def __getitem__(self, index: int) -> tuple:
+        # Sorted reads keep memory-mapped page access sequential
+        batch_indices = np.sort(
+            self.indices[index * self.batch_size : (index + 1) * self.batch_size]
+        )
+        x = self.images[batch_indices].astype(np.float32) / 255.0
+        y = np.eye(self.num_classes, dtype=np.float32)[self.labels[batch_indices]]
+        if self.augmentation is not None:
+            x = self.augmentation(x, training=True).numpy()
+
+        return x, y
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.indices)
@@ -1,7 +1,12 @@
+import hashlib
 import os
+import shutil
+import threading
 import zipfile
-
-import gdown
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote, urlparse
 
 from cnn_classifier import logger
 from cnn_classifier.entity.config_entity import DataIngestionConfig
@@ -16,6 +21,38 @@ class DataIngestion:
             config (DataIngestionConfig): The configuration object for data ingestion.
         """
         self.config = config
+        self._local = threading.local()
+        self._zip_files = []
+
+    @staticmethod
+    def _sha256(path: Path) -> str:
+        """
+        Computes the SHA-256 checksum of a file.
+
+        Args:
+            path (Path): The path to the file.
+
+        Returns:
+            str: The hex digest of the file contents.
+        """
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    def _is_valid_local_file(self) -> bool:
+        """
+        Checks whether the local data file is complete. With a configured checksum the file
+        must match it, otherwise it must be a readable zip archive.
+
+        Returns:
+            bool: True if the download can be skipped.
+        """
+        local_data_file = self.config.local_data_file
+        if not os.path.exists(local_data_file):
+            return False
+        if self.config.sha256:
+            return self._sha256(local_data_file) == self.config.sha256.lower()
+
+        return zipfile.is_zipfile(local_data_file)
 
     def download_data(self):
         """Downloads the data from a specified source URL and save it to a local file."""
@@ -24,13 +61,46 @@ class DataIngestion:
             source_url = self.config.source_url
             local_data_file = self.config.local_data_file
             os.makedirs(root_dir, exist_ok=True)
+
+            if self._is_valid_local_file():
+                logger.info(
+                    f"Skipping download, {local_data_file} already exists and is valid"
+                )
+                return
+
+            if os.path.exists(local_data_file):
+                # gdown would resume into an existing file instead of replacing it
+                logger.info(f"Removing invalid {local_data_file}")
+                os.remove(local_data_file)
+
             logger.info(
                 f"Downloading data from {source_url} into file {local_data_file}"
             )
 
-            file_id = source_url.split("/")[-2]
-            prefix = self.config.prefix
-            gdown.download(f"{prefix}{file_id}", local_data_file)
+            parsed_url = urlparse(source_url)
+            if parsed_url.scheme in ("", "file"):
+                source_path = (
+                    unquote(parsed_url.path) if parsed_url.scheme else source_url
+                )
+                shutil.copyfile(source_path, local_data_file)
+            else:
+                if parsed_url.netloc == "drive.google.com":
+                    file_id = source_url.split("/")[-2]
+                    url = f"{self.config.prefix}{file_id}"
+                else:
+                    url = source_url
+                import gdown
+
+                # Resumes from the partial temporary file left by an interrupted download
+                if gdown.download(url, local_data_file, resume=True) is None:
+                    raise RuntimeError(f"Failed to download {url}")
+
+            if self.config.sha256 and not self._is_valid_local_file():
+                raise ValueError(
+                    f"Checksum mismatch for {local_data_file}, "
+                    f"expected sha256 {self.config.sha256}"
+                )
+
             logger.info(
                 f"Downloaded data from {source_url} into file {local_data_file}"
             )
@@ -39,12 +109,105 @@ class DataIngestion:
             logger.error(f"Failed to download data: {e}")
             raise e
 
+    def _zip_file(self) -> zipfile.ZipFile:
+        """
+        Returns a zip file handle owned by the current thread.
+
+        Returns:
+            zipfile.ZipFile: The open zip file.
+        """
+        if getattr(self._local, "zip_file", None) is None:
+            self._local.zip_file = zipfile.ZipFile(self.config.local_data_file, "r")
+            self._zip_files.append(self._local.zip_file)
+
+        return self._local.zip_file
+
+    def _member_path(self, member: zipfile.ZipInfo) -> str:
+        """
+        Resolves the path a member extracts to.
+
+        Args:
+            member (zipfile.ZipInfo): The archive member.
+
+        Raises:
+            ValueError: If the member would be extracted outside the unzip directory.
+
+        Returns:
+            str: The absolute path of the member.
+        """
+        unzip_dir = os.path.realpath(self.config.unzip_dir)
+        target = os.path.realpath(os.path.join(unzip_dir, member.filename))
+        if os.path.commonpath([unzip_dir, target]) != unzip_dir:
+            raise ValueError(
+                f"Refusing to extract {member.filename}, it is outside {unzip_dir}"
+            )
+
+        return target
+
+    @staticmethod
+    def _is_extracted(member: zipfile.ZipInfo, target: str) -> bool:
+        """
+        Checks whether a member was already extracted with identical size and CRC.
+
+        Args:
+            member (zipfile.ZipInfo): The archive member.
+            target (str): The path the member extracts to.
+
+        Returns:
+            bool: True if the extracted file is identical to the member.
+        """
+        if not os.path.isfile(target) or os.path.getsize(target) != member.file_size:
+            return False
+
+        crc = 0
+        with open(target, "rb") as f:
+            while chunk := f.read(1 << 20):
+                crc = zlib.crc32(chunk, crc)
+
+        return crc == member.CRC
+
+    def _extract_member(self, member: zipfile.ZipInfo) -> bool:
+        """
+        Extracts a single member unless it is already extracted.
+
+        Args:
+            member (zipfile.ZipInfo): The archive member.
+
+        Returns:
+            bool: True if the member was extracted, False if it was skipped.
+        """
+        target = self._member_path(member)
+        if self._is_extracted(member, target):
+            return False
+
+        self._zip_file().extract(member, self.config.unzip_dir)
+
+        return True
+
     def extract_zip_file(self):
         """Extracts a zip file into the specified directory."""
         unzip_dir = self.config.unzip_dir
         os.makedirs(unzip_dir, exist_ok=True)
         with zipfile.ZipFile(self.config.local_data_file, "r") as f:
-            f.extractall(unzip_dir)
-            logger.info(
-                f"Extracted data from {self.config.local_data_file} into {unzip_dir}"
-            )
+            members = []
+            for member in f.infolist():
+                if member.is_dir():
+                    os.makedirs(self._member_path(member), exist_ok=True)
+                else:
+                    members.append(member)
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.config.extract_workers
+            ) as executor:
+                extracted = sum(executor.map(self._extract_member, members))
+        finally:
+            for zip_file in self._zip_files:
+                zip_file.close()
+            self._zip_files.clear()
+            self._local = threading.local()
+
+        logger.info(
+            f"Extracted data from {self.config.local_data_file} into {unzip_dir} "
+            f"({extracted} extracted, {len(members) - extracted} already up to date)"
+        )
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from cnn_classifier import logger
+from cnn_classifier.entity.config_entity import DataPreprocessingConfig
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".ppm", ".tif", ".tiff")
+IMAGES_FILE = "images.npy"
+LABELS_FILE = "labels.npy"
+MANIFEST_FILE = "manifest.json"
+
+
+class DataPreprocessing:
+    def __init__(self, config: DataPreprocessingConfig):
+        """
+        Initializes the class with the given DataPreprocessingConfig object.
+
+        Args:
+            config (DataPreprocessingConfig): The configuration object for data preprocessing.
+        """
+        self.config = config
+
+    @staticmethod
+    def list_samples(data_path: Path) -> tuple:
+        """
+        Lists the image files per class in the same order as `flow_from_directory`.
+
+        Args:
+            data_path (Path): The dataset directory with one subdirectory per class.
+
+        Returns:
+            tuple: The sorted class names and the list of (relative path, class index) samples.
+        """
+        class_names = sorted(
+            f.name for f in os.scandir(data_path) if f.is_dir()
+        )
+        samples = []
+        for class_index, class_name in enumerate(class_names):
+            class_dir = os.path.join(data_path, class_name)
+            for root, _, files in sorted(os.walk(class_dir)):
+                for file_name in sorted(files):
+                    if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                        path = os.path.join(root, file_name)
+                        samples.append((os.path.relpath(path, data_path), class_index))
+
+        return class_names, samples
+
+    def _compute_key(self, samples: list) -> str:
+        """
+        Computes a key identifying the cache from the image size and the source file contents.
+
+        Args:
+            samples (list): The list of (relative path, class index) samples.
+
+        Returns:
+            str: The hex digest of the key.
+        """
+        digest = hashlib.sha256(json.dumps(list(self.config.image_size)).encode())
+        for rel_path, class_index in samples:
+            digest.update(f"{rel_path}:{class_index}:".encode())
+            with open(os.path.join(self.config.data_path, rel_path), "rb") as f:
+                digest.update(hashlib.file_digest(f, "sha256").digest())
+
+        return digest.hexdigest()
+
+    def _is_up_to_date(self, key: str) -> bool:
+        """
+        Checks whether a complete cache with the given key already exists.
+
+        Args:
+            key (str): The key of the current source data.
+
+        Returns:
+            bool: True if the cache can be reused.
+        """
+        manifest_path = os.path.join(self.config.root_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return False
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+        return manifest.get("key") == key and all(
+            os.path.exists(os.path.join(self.config.root_dir, file_name))
+            for file_name in (IMAGES_FILE, LABELS_FILE)
+        )
+
+    def _load_image(self, rel_path: str) -> np.ndarray:
+        """
+        Decodes and resizes a single image the same way `flow_from_directory` does.
+
+        Args:
+            rel_path (str): The path of the image relative to the data path.
+
+        Returns:
+            np.ndarray: The uint8 image array with shape (H, W, 3).
+        """
+        height, width = self.config.image_size[:-1]
+        with Image.open(os.path.join(self.config.data_path, rel_path)) as img:
+            img = img.convert("RGB")
+            if img.size != (width, height):
+                img = img.resize((width, height), Image.BILINEAR)
+
+            return np.asarray(img, dtype=np.uint8)
+
+    def preprocess(self):
+        """
+        Decodes and resizes the dataset once into a memory-mappable uint8 `.npy` file,
+        skipping the work when the cache already matches the source data and image size.
+        """
+        class_names, samples = self.list_samples(self.config.data_path)
+        self.images_processed = 0
+        key = self._compute_key(samples)
+        if self._is_up_to_date(key):
+            logger.info(f"Dataset cache at {self.config.root_dir} is up to date")
+            return
+
+        os.makedirs(self.config.root_dir, exist_ok=True)
+        images = np.lib.format.open_memmap(
+            os.path.join(self.config.root_dir, IMAGES_FILE),
+            mode="w+",
+            dtype=np.uint8,
+            shape=(len(samples), *self.config.image_size),
+        )
+        for i, (rel_path, _) in enumerate(samples):
+            images[i] = self._load_image(rel_path)
+        images.flush()
+        del images
+
+        labels = np.array([class_index for _, class_index in samples], dtype=np.int64)
+        np.save(os.path.join(self.config.root_dir, LABELS_FILE), labels)
+
+        # The manifest is written last so an interrupted run is never mistaken for a complete cache
+        manifest = {
+            "key": key,
+            "image_size": list(self.config.image_size),
+            "class_names": class_names,
+            "files": [rel_path for rel_path, _ in samples],
+        }
+        with open(os.path.join(self.config.root_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=4)
+
+        self.images_processed = len(samples)
+        logger.info(
+            f"Cached {len(samples)} preprocessed images into {self.config.root_dir}"
+        )
+
+    @staticmethod
+    def load_cache(root_dir: Path) -> tuple:
+        """
+        Memory-maps the cached dataset without copying it into memory.
+
+        Args:
+            root_dir (Path): The directory of the dataset cache.
+
+        Returns:
+            tuple: The read-only images memmap, the labels array and the manifest dictionary.
+        """
+        images = np.load(os.path.join(root_dir, IMAGES_FILE), mmap_mode="r")
+        labels = np.load(os.path.join(root_dir, LABELS_FILE))
+        with open(os.path.join(root_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+
+        return images, labels, manifest
+
+    @staticmethod
+    def split_indices(
+        labels: np.ndarray, validation_split: float, subset: str
+    ) -> np.ndarray:
+        """
+        Splits the samples like `flow_from_directory`, i.e. the first `validation_split`
+        fraction of every class forms the validation subset.
+
+        Args:
+            labels (np.ndarray): The class index of every sample.
+            validation_split (float): The fraction of samples used for validation.
+            subset (str): Either "training" or "validation".
+
+        Returns:
+            np.ndarray: The indices of the samples in the subset.
+        """
+        indices = []
+        for class_index in np.unique(labels):
+            class_indices = np.flatnonzero(labels == class_index)
+            stop = int(validation_split * len(class_indices))
+            indices.append(
+                class_indices[:stop] if subset == "validation" else class_indices[stop:]
+            )
+
+        return np.concatenate(indices)
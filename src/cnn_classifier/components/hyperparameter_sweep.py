@@ -0,0 +1,427 @@
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from multiprocessing.managers import SyncManager
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+from cnn_classifier import logger
+from cnn_classifier.components.mlflow_logger import AsyncMlflowLogger
+from cnn_classifier.components.model_trainer import ModelTrainer
+from cnn_classifier.entity.config_entity import (HyperparameterSweepConfig,
+                                                 ModelTrainerConfig)
+from cnn_classifier.utils.common import save_json
+
+# Parameters of params.yaml a trial can override and the ModelTrainerConfig field they set,
+# the learning rate is set on the optimizer of the loaded base model instead
+SEARCHABLE_PARAMS = {
+    "LEARNING_RATE": None,
+    "BATCH_SIZE": "batch_size",
+    "EPOCHS": "epochs",
+    "AUGMENTATION": "augmentation",
+    "FINE_TUNE_LAYERS": "fine_tune_layers",
+    "FINE_TUNE_LEARNING_RATE": "fine_tune_learning_rate",
+}
+
+
+class AshaScheduler:
+    def __init__(
+        self,
+        manager: SyncManager,
+        min_epochs: int,
+        reduction_factor: int,
+        mode: str,
+    ):
+        """
+        Initializes the asynchronous successive halving (ASHA) scheduler shared by the trial
+        processes. Trials report their metric at the rungs min_epochs * reduction_factor^k and
+        only continue if it is in the top 1/reduction_factor of the values reported at that rung
+        so far, so poor trials stop without waiting for the others to reach the rung.
+
+        Args:
+            manager (SyncManager): The manager holding the shared state.
+            min_epochs (int): The epochs every trial trains before it can be stopped.
+            reduction_factor (int): The reduction factor between rungs.
+            mode (str): Whether the metric is maximized ("max") or minimized ("min").
+        """
+        if mode not in ("max", "min"):
+            raise ValueError(f"Unknown mode: {mode}, expected 'max' or 'min'")
+        self.min_epochs = min_epochs
+        self.reduction_factor = reduction_factor
+        self.sign = 1.0 if mode == "max" else -1.0
+
+        self._rungs = manager.dict()
+        self._lock = manager.Lock()
+
+    def rungs(self, max_epochs: int) -> list:
+        """
+        Returns the epochs at which a trial is compared against the others.
+
+        Args:
+            max_epochs (int): The epochs of the trial.
+
+        Returns:
+            list: The rung epochs before the last epoch.
+        """
+        rungs = []
+        epochs = self.min_epochs
+        while epochs < max_epochs:
+            rungs.append(epochs)
+            epochs *= self.reduction_factor
+
+        return rungs
+
+    def should_continue(self, epochs: int, value: float) -> bool:
+        """
+        Records the metric of a trial at a rung and decides whether the trial continues.
+
+        Args:
+            epochs (int): The rung epochs.
+            value (float): The metric of the trial after these epochs.
+
+        Returns:
+            bool: True if the trial is in the top 1/reduction_factor of the rung.
+        """
+        with self._lock:
+            values = self._rungs.get(epochs, []) + [self.sign * value]
+            self._rungs[epochs] = values
+        cutoff = np.quantile(values, 1 - 1 / self.reduction_factor)
+
+        return self.sign * value >= cutoff
+
+
+class AshaCallback(tf.keras.callbacks.Callback):
+    def __init__(
+        self,
+        scheduler: AshaScheduler,
+        metric: str,
+        max_epochs: int,
+        mlflow_logger: AsyncMlflowLogger,
+    ):
+        """
+        Initializes the callback which logs the epoch metrics of a trial and stops it
+        when the scheduler decides so.
+
+        Args:
+            scheduler (AshaScheduler): The shared scheduler.
+            metric (str): The metric compared across trials, e.g. "val_accuracy".
+            max_epochs (int): The epochs of the trial.
+            mlflow_logger (AsyncMlflowLogger): The logger of the trial run.
+        """
+        super().__init__()
+        self.scheduler = scheduler
+        self.metric = metric
+        self.rungs = set(scheduler.rungs(max_epochs))
+        self.mlflow_logger = mlflow_logger
+        self.stopped_early = False
+
+    def on_epoch_end(self, epoch: int, logs: dict = None):
+        logs = logs or {}
+        if self.metric not in logs:
+            raise ValueError(
+                f"Metric {self.metric} is not logged by training, "
+                f"expected one of {sorted(logs)}"
+            )
+        self.mlflow_logger.log_metrics(logs, step=epoch + 1)
+
+        epochs = epoch + 1
+        if epochs in self.rungs and not self.scheduler.should_continue(
+            epochs, logs[self.metric]
+        ):
+            logger.info(f"Stopping trial after {epochs} epochs")
+            self.model.stop_training = True
+            self.stopped_early = True
+
+
+def _init_trial_worker(threads: int):
+    """
+    Limits the TensorFlow thread pools of a trial process before its runtime starts,
+    so parallel trials do not oversubscribe the CPU.
+
+    Args:
+        threads (int): The intra-op threads of the process.
+    """
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _run_trial(
+    trial_id: int,
+    trial_params: dict,
+    config: HyperparameterSweepConfig,
+    model_trainer_config: ModelTrainerConfig,
+    scheduler: AshaScheduler,
+    parent_run_id: str,
+) -> dict:
+    """
+    Trains one trial in a worker process and logs it as a nested MLflow run.
+
+    Args:
+        trial_id (int): The trial number.
+        trial_params (dict): The params.yaml values the trial overrides.
+        config (HyperparameterSweepConfig): The sweep configuration.
+        model_trainer_config (ModelTrainerConfig): The configuration the trial starts from.
+        scheduler (AshaScheduler): The shared scheduler.
+        parent_run_id (str): The MLflow run of the sweep.
+
+    Returns:
+        dict: The trial result.
+    """
+    trial_name = f"trial_{trial_id:03d}"
+    trial_dir = os.path.join(config.root_dir, trial_name)
+    os.makedirs(trial_dir, exist_ok=True)
+    trainer_config = replace(
+        model_trainer_config,
+        root_dir=trial_dir,
+        trained_model_file_path=Path(os.path.join(trial_dir, "trained_model.keras")),
+        # Parallel trials must not write and read the same cached features
+        feature_cache_dir=Path(os.path.join(trial_dir, "feature_cache")),
+        # Trials are short and restarted from scratch, so they skip checkpoints
+        checkpoint_dir=Path(os.path.join(trial_dir, "checkpoints")),
+        checkpoint_every_epochs=None,
+        resume=False,
+        **{
+            SEARCHABLE_PARAMS[name]: value
+            for name, value in trial_params.items()
+            if SEARCHABLE_PARAMS[name] is not None
+        },
+    )
+
+    mlflow_logger = AsyncMlflowLogger(tracking_uri=config.mlflow_uri)
+    run_id = mlflow_logger.start_run(run_name=trial_name, parent_run_id=parent_run_id)
+    mlflow_logger.log_params({**config.params, **trial_params})
+    try:
+        model_trainer = ModelTrainer(config=trainer_config)
+        model_trainer.train_val_generator()
+        model_trainer.get_base_model()
+        if "LEARNING_RATE" in trial_params:
+            model_trainer.model.optimizer.learning_rate.assign(
+                trial_params["LEARNING_RATE"]
+            )
+
+        max_epochs = trainer_config.epochs
+        if trainer_config.fine_tune_layers:
+            max_epochs += trainer_config.fine_tune_epochs
+        asha_callback = AshaCallback(
+            scheduler=scheduler,
+            metric=config.metric,
+            max_epochs=max_epochs,
+            mlflow_logger=mlflow_logger,
+        )
+        model_trainer.train(callbacks=[asha_callback])
+
+        # Early stopping may restore an earlier epoch's weights, so validation metrics are
+        # measured on the final model rather than taken from the last epoch of the history
+        if config.metric.startswith("val_"):
+            validation_data = (
+                model_trainer.val_dataset
+                if trainer_config.input_pipeline == "tf_data"
+                else model_trainer.val_generator
+            )
+            scores = model_trainer.model.evaluate(validation_data, return_dict=True)
+            value = float(scores[config.metric.removeprefix("val_")])
+        else:
+            value = float(model_trainer.history.history[config.metric][-1])
+    except Exception:
+        mlflow_logger.failed = True
+        raise
+    finally:
+        mlflow_logger.close()
+
+    return {
+        "trial_id": trial_id,
+        "params": trial_params,
+        "value": value,
+        "epochs": model_trainer.epochs_run,
+        "stopped_early": asha_callback.stopped_early,
+        "model_path": str(trainer_config.trained_model_file_path),
+        "images_processed": model_trainer.images_processed,
+        "run_id": run_id,
+    }
+
+
+class HyperparameterSweep:
+    def __init__(
+        self,
+        config: HyperparameterSweepConfig,
+        model_trainer_config: ModelTrainerConfig,
+    ):
+        """
+        Initializes the class with the given HyperparameterSweepConfig object.
+
+        Args:
+            config (HyperparameterSweepConfig): The configuration object for the sweep.
+            model_trainer_config (ModelTrainerConfig): The training configuration every trial
+                starts from before applying its parameters.
+        """
+        self.config = config
+        self.model_trainer_config = model_trainer_config
+
+    def trials(self) -> list:
+        """
+        Expands the search space into the parameters of every trial.
+
+        Returns:
+            list: The params.yaml values overridden by each trial.
+        """
+        unknown = set(self.config.search_space) - set(SEARCHABLE_PARAMS)
+        if unknown:
+            raise ValueError(
+                f"Unknown search space parameters: {sorted(unknown)}, "
+                f"expected some of {list(SEARCHABLE_PARAMS)}"
+            )
+
+        names = list(self.config.search_space)
+        trials = [
+            dict(zip(names, values))
+            for values in itertools.product(
+                *(self.config.search_space[name] for name in names)
+            )
+        ]
+        if self.config.num_trials is not None and self.config.num_trials < len(trials):
+            trials = random.Random(self.config.seed).sample(
+                trials, self.config.num_trials
+            )
+
+        return trials
+
+    def _best(self, results: list) -> dict:
+        """
+        Picks the best trial, preferring trials which trained all their epochs.
+
+        Args:
+            results (list): The trial results.
+
+        Returns:
+            dict: The result of the best trial.
+        """
+        succeeded = [result for result in results if "error" not in result]
+        if not succeeded:
+            raise RuntimeError("Every trial of the hyperparameter sweep failed")
+        candidates = [
+            result for result in succeeded if not result["stopped_early"]
+        ] or succeeded
+        sign = 1.0 if self.config.mode == "max" else -1.0
+
+        return max(candidates, key=lambda result: sign * result["value"])
+
+    def run(self) -> dict:
+        """
+        Runs the trials in a process pool, writes the sweep report and promotes the best model.
+
+        Returns:
+            dict: The result of the best trial.
+        """
+        trials = self.trials()
+        threads = self.config.threads_per_trial or max(
+            1, (os.cpu_count() or 1) // self.config.max_workers
+        )
+        logger.info(
+            f"Running {len(trials)} trials, {self.config.max_workers} at a time "
+            f"with {threads} threads each"
+        )
+
+        mlflow_logger = AsyncMlflowLogger(tracking_uri=self.config.mlflow_uri)
+        parent_run_id = mlflow_logger.start_run(run_name="hyperparameter_sweep")
+        mlflow_logger.log_params(
+            {
+                "search_space": json.dumps(self.config.search_space),
+                "num_trials": len(trials),
+                "metric": self.config.metric,
+                "min_epochs": self.config.min_epochs,
+                "reduction_factor": self.config.reduction_factor,
+            }
+        )
+
+        results = []
+        # TensorFlow is not fork-safe, and a fresh process per trial releases its memory
+        context = multiprocessing.get_context("spawn")
+        with context.Manager() as manager:
+            scheduler = AshaScheduler(
+                manager,
+                min_epochs=self.config.min_epochs,
+                reduction_factor=self.config.reduction_factor,
+                mode=self.config.mode,
+            )
+            with ProcessPoolExecutor(
+                max_workers=self.config.max_workers,
+                mp_context=context,
+                initializer=_init_trial_worker,
+                initargs=(threads,),
+                max_tasks_per_child=1,
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        _run_trial,
+                        trial_id,
+                        trial_params,
+                        self.config,
+                        self.model_trainer_config,
+                        scheduler,
+                        parent_run_id,
+                    ): (trial_id, trial_params)
+                    for trial_id, trial_params in enumerate(trials)
+                }
+                for future in as_completed(futures):
+                    trial_id, trial_params = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Trial {trial_id} {trial_params} failed: {e}")
+                        result = {
+                            "trial_id": trial_id,
+                            "params": trial_params,
+                            "error": str(e),
+                        }
+                    else:
+                        logger.info(
+                            f"Trial {trial_id} {trial_params}: {self.config.metric} "
+                            f"{result['value']:.4f} after {result['epochs']} epochs"
+                        )
+                    results.append(result)
+
+        self.results = sorted(results, key=lambda result: result["trial_id"])
+        self.images_processed = sum(
+            result.get("images_processed", 0) for result in self.results
+        )
+        best = self._best(self.results)
+        logger.info(
+            f"Best trial {best['trial_id']} {best['params']}: "
+            f"{self.config.metric} {best['value']:.4f}"
+        )
+
+        save_json(
+            Path(self.config.report_file),
+            {
+                "metric": self.config.metric,
+                "mode": self.config.mode,
+                "best": best,
+                "trials": self.results,
+            },
+        )
+        mlflow_logger.log_params(
+            {f"best_{name}": value for name, value in best["params"].items()}
+        )
+        mlflow_logger.log_metrics({f"best_{self.config.metric}": best["value"]})
+        mlflow_logger.log_artifact(self.config.report_file)
+        mlflow_logger.close()
+
+        if self.config.promote:
+            shutil.copyfile(best["model_path"], self.config.trained_model_file_path)
+            logger.info(
+                f"Promoted {best['model_path']} to {self.config.trained_model_file_path}"
+            )
+        # Only the best model is kept, the others are large and can be retrained
+        for result in self.results:
+            if result is not best and "model_path" in result:
+                if os.path.exists(result["model_path"]):
+                    os.remove(result["model_path"])
+
+        return best
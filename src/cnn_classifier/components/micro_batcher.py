@@ -0,0 +1,154 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+import numpy as np
+
+from cnn_classifier import logger
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 16,
+        max_latency_ms: float = 10.0,
+    ):
+        """
+        Initializes the batcher which groups concurrent single-image requests into
+        one batched forward pass.
+
+        Args:
+            predict_fn (Callable[[np.ndarray], np.ndarray]): Function running inference on a batch of images.
+            max_batch_size (int, optional): Maximum number of images per forward pass. Defaults to 16.
+            max_latency_ms (float, optional): Maximum time the first queued image waits for
+                more images to arrive before the batch is run. Defaults to 10.0.
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="micro-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, image: np.ndarray) -> Future:
+        """
+        Queues a single preprocessed image for inference.
+
+        Args:
+            image (np.ndarray): The image with shape (H, W, C).
+
+        Raises:
+            RuntimeError: If the batcher is closed.
+
+        Returns:
+            Future: A future resolving to the model output for this image.
+        """
+        future = Future()
+        # Images queued after the stop signal would never be processed
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit an image to a closed micro-batcher")
+            self._queue.put((image, future))
+
+        return future
+
+    def predict(self, image: np.ndarray) -> np.ndarray:
+        """
+        Queues a single preprocessed image and blocks until its batch has been run.
+
+        Args:
+            image (np.ndarray): The image with shape (H, W, C).
+
+        Returns:
+            np.ndarray: The model output for this image.
+        """
+        return self.submit(image).result()
+
+    def close(self):
+        """Stops the worker thread once the already queued images are processed."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _collect_batch(self, first_item: tuple) -> tuple:
+        """
+        Collects queued items until the batch is full or the latency budget is spent.
+
+        Args:
+            first_item (tuple): The item that opened the batch.
+
+        Returns:
+            tuple: The list of collected items and whether a stop signal was received.
+        """
+        batch = [first_item]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _process(self, batch: list):
+        """
+        Runs a single forward pass over the batch and fans the results back out.
+        Items whose future was cancelled meanwhile, e.g. by a disconnected client, are dropped.
+
+        Args:
+            batch (list): The list of (image, future) items.
+        """
+        batch = [
+            (image, future)
+            for image, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        try:
+            outputs = self.predict_fn(np.stack([image for image, _ in batch]))
+        except Exception as e:
+            logger.error(f"Batched inference of {len(batch)} images failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), output in zip(batch, outputs):
+            future.set_result(output)
+
+    def _run(self):
+        """Worker loop which drains the queue batch by batch."""
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch, stop = self._collect_batch(item)
+            # A failing batch must not stop the thread, or every later request would hang
+            try:
+                self._process(batch)
+            except Exception as e:
+                logger.error(f"Micro-batch of {len(batch)} images failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
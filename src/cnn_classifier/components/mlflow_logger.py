@@ -0,0 +1,309 @@
+import atexit
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+import mlflow
+from mlflow.entities import Metric, Param, RunStatus
+from mlflow.environment_variables import (MLFLOW_EXPERIMENT_ID,
+                                          MLFLOW_EXPERIMENT_NAME)
+from mlflow.tracking import MlflowClient
+from mlflow.tracking.default_experiment import DEFAULT_EXPERIMENT_ID
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+
+from cnn_classifier import logger
+
+# Limits of a single MLflow `log_batch` request
+MAX_PARAMS_PER_BATCH = 100
+MAX_METRICS_PER_BATCH = 1000
+
+_STOP = object()
+
+
+class AsyncMlflowLogger:
+    def __init__(
+        self,
+        tracking_uri: Optional[str] = None,
+        max_retries: int = 3,
+        retry_backoff_sec: float = 1.0,
+    ):
+        """
+        Initializes the logger which sends MLflow params, metrics and models from a background
+        thread, so tracking server round trips and model uploads stay off the critical path.
+
+        Args:
+            tracking_uri (Optional[str], optional): The MLflow tracking URI, a local `file:` store works too.
+                Defaults to None, which uses the globally configured tracking URI.
+            max_retries (int, optional): How often a failed MLflow call is retried. Defaults to 3.
+            retry_backoff_sec (float, optional): The delay before the first retry, doubled for every
+                further retry. Defaults to 1.0.
+        """
+        self.tracking_uri = tracking_uri or mlflow.get_tracking_uri()
+        self.client = MlflowClient(tracking_uri=self.tracking_uri)
+        self.max_retries = max_retries
+        self.retry_backoff_sec = retry_backoff_sec
+        self.run_id = None
+        self.failed = False
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._worker, name="mlflow_logger", daemon=True
+        )
+        self._closed = False
+        self._thread.start()
+        atexit.register(self.close)
+
+    def start_run(
+        self,
+        experiment_name: Optional[str] = None,
+        run_name: Optional[str] = None,
+        parent_run_id: Optional[str] = None,
+    ) -> str:
+        """
+        Creates the run every following call logs into. This is the only blocking call.
+
+        Args:
+            experiment_name (Optional[str], optional): The experiment to create the run in.
+                Defaults to None, which like `mlflow.start_run()` uses the experiment named by
+                `MLFLOW_EXPERIMENT_NAME` or `MLFLOW_EXPERIMENT_ID`, else the default experiment.
+            run_name (Optional[str], optional): The run name. Defaults to None, which lets
+                MLflow generate one.
+            parent_run_id (Optional[str], optional): The run to nest this run under, which must
+                belong to the same experiment. Defaults to None.
+
+        Returns:
+            str: The run id.
+        """
+        experiment_name = experiment_name or MLFLOW_EXPERIMENT_NAME.get()
+        experiment_id = MLFLOW_EXPERIMENT_ID.get() or DEFAULT_EXPERIMENT_ID
+        if experiment_name is not None:
+            experiment = self._retry(
+                lambda: self.client.get_experiment_by_name(experiment_name)
+            )
+            if experiment is not None:
+                experiment_id = experiment.experiment_id
+            else:
+                experiment_id = self._retry(
+                    lambda: self.client.create_experiment(experiment_name)
+                )
+        tags = {}
+        if parent_run_id is not None:
+            tags[MLFLOW_PARENT_RUN_ID] = parent_run_id
+        run = self._retry(
+            lambda: self.client.create_run(experiment_id, tags=tags, run_name=run_name)
+        )
+        self.run_id = run.info.run_id
+
+        return self.run_id
+
+    def log_params(self, params: dict):
+        """
+        Queues parameters, sent together with the other queued params and metrics.
+
+        Args:
+            params (dict): The parameters to log.
+        """
+        self._queue.put(
+            ("params", [Param(key, str(value)) for key, value in params.items()])
+        )
+
+    def log_metrics(self, metrics: dict, step: int = 0):
+        """
+        Queues metrics, sent together with the other queued params and metrics.
+
+        Args:
+            metrics (dict): The metrics to log.
+            step (int, optional): The step the metrics belong to. Defaults to 0.
+        """
+        timestamp = int(time.time() * 1000)
+        self._queue.put(
+            (
+                "metrics",
+                [
+                    Metric(key, float(value), timestamp, step)
+                    for key, value in metrics.items()
+                ],
+            )
+        )
+
+    def log_artifact(self, local_path: str):
+        """
+        Queues a local file to be uploaded as a run artifact.
+
+        Args:
+            local_path (str): The path of the file.
+        """
+        self._queue.put(("artifact", local_path))
+
+    def log_model(
+        self,
+        model,
+        artifact_path: str,
+        registered_model_name: Optional[str] = None,
+    ):
+        """
+        Serializes a Keras model to a temporary directory and queues it to be uploaded as a
+        run artifact. The model is saved on the calling thread, so the caller may modify or
+        replace it right after this returns.
+
+        Args:
+            model (tf.keras.Model): The model to log.
+            artifact_path (str): The artifact path of the model inside the run.
+            registered_model_name (Optional[str], optional): The name to register the model under
+                in the Model Registry. Defaults to None, which does not register it.
+        """
+        # Imports TensorFlow, so it is deferred until a model is actually logged
+        import mlflow.keras
+
+        tmp_dir = tempfile.mkdtemp(prefix="mlflow_model_")
+        try:
+            mlflow.keras.save_model(model, os.path.join(tmp_dir, "model"))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self._queue.put(("model", (tmp_dir, artifact_path, registered_model_name)))
+
+    def _retry(self, call: Callable):
+        """
+        Runs an MLflow call, retrying it with exponential backoff when it fails.
+
+        Args:
+            call (Callable): The call to run.
+
+        Returns:
+            The result of the call.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return call()
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff_sec * 2**attempt
+                logger.warning(f"MLflow call failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _log_batch(self, params: list, metrics: list):
+        """
+        Sends params and metrics in as few `log_batch` requests as MLflow allows.
+
+        Args:
+            params (list): The `Param` entities.
+            metrics (list): The `Metric` entities.
+        """
+        while params or metrics:
+            params_chunk = params[:MAX_PARAMS_PER_BATCH]
+            metrics_chunk = metrics[:MAX_METRICS_PER_BATCH]
+            params = params[MAX_PARAMS_PER_BATCH:]
+            metrics = metrics[MAX_METRICS_PER_BATCH:]
+            self._retry(
+                lambda: self.client.log_batch(
+                    self.run_id, metrics=metrics_chunk, params=params_chunk
+                )
+            )
+
+    def _log_model(self, tmp_dir: str, artifact_path: str, registered_model_name: str):
+        """
+        Uploads a saved model into the run, called on the background thread.
+
+        Args:
+            tmp_dir (str): The temporary directory holding the saved model.
+            artifact_path (str): The artifact path of the model inside the run.
+            registered_model_name (str): The registered model name, or None.
+        """
+        start = time.perf_counter()
+        # The fluent active run is shared by all threads, so instead of logging the model
+        # inside `mlflow.start_run()` it is uploaded with the client
+        self._retry(
+            lambda: self.client.log_artifacts(
+                self.run_id, os.path.join(tmp_dir, "model"), artifact_path=artifact_path
+            )
+        )
+        if registered_model_name is not None:
+            self._retry(
+                lambda: mlflow.register_model(
+                    f"runs:/{self.run_id}/{artifact_path}", registered_model_name
+                )
+            )
+        logger.info(
+            f"Logged model to MLflow run {self.run_id} "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+    def _worker(self):
+        """
+        Drains the queue, coalescing every queued param and metric into batched requests
+        before uploading queued artifacts and models.
+        """
+        mlflow.set_tracking_uri(self.tracking_uri)
+        stop = False
+        while not stop:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            params, metrics, artifacts, models = [], [], [], []
+            for item in items:
+                if item is _STOP:
+                    stop = True
+                elif item[0] == "params":
+                    params.extend(item[1])
+                elif item[0] == "metrics":
+                    metrics.extend(item[1])
+                elif item[0] == "artifact":
+                    artifacts.append(item[1])
+                else:
+                    models.append(item[1])
+
+            try:
+                self._log_batch(params, metrics)
+                for local_path in artifacts:
+                    self._retry(
+                        lambda: self.client.log_artifact(self.run_id, local_path)
+                    )
+                for tmp_dir, artifact_path, registered_model_name in models:
+                    self._log_model(tmp_dir, artifact_path, registered_model_name)
+            except Exception as e:
+                self.failed = True
+                logger.error(f"Failed to log to MLflow run {self.run_id}: {e}")
+            finally:
+                for tmp_dir, _, _ in models:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                for _ in items:
+                    self._queue.task_done()
+
+    def flush(self):
+        """
+        Blocks until everything queued so far is logged.
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Flushes the queue, stops the background thread and terminates the run.
+        Registered with `atexit`, so pending logs are flushed when the interpreter exits.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+        if self.run_id is not None:
+            status = RunStatus.FAILED if self.failed else RunStatus.FINISHED
+            try:
+                self._retry(
+                    lambda: self.client.set_terminated(
+                        self.run_id, RunStatus.to_string(status)
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Failed to terminate MLflow run {self.run_id}: {e}")
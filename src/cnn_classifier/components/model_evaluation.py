@@ -1,30 +1,58 @@
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 from urllib.parse import urlparse
 
-import mlflow
-import mlflow.keras
+import numpy as np
 import tensorflow as tf
 
+from cnn_classifier.components.cached_image_sequence import \
+    CachedImageSequence
+from cnn_classifier.components.data_preprocessing import DataPreprocessing
+from cnn_classifier.components.model_store import ModelStore
 from cnn_classifier.entity.config_entity import ModelEvaluationConfig
+from cnn_classifier.utils.classification_metrics import (classification_report,
+                                                         scalar_metrics)
 from cnn_classifier.utils.common import save_json
 
+if TYPE_CHECKING:
+    from cnn_classifier.components.mlflow_logger import AsyncMlflowLogger
+
 
 class ModelEvaluation:
 
-    def __init__(self, config: ModelEvaluationConfig):
+    def __init__(
+        self, config: ModelEvaluationConfig, model_store: Optional[ModelStore] = None
+    ):
         """
         Initializes the class with the given ModelEvaluationConfig object.
 
         Parameters:
             config (ModelEvaluationConfig): The configuration object for model evaluation.
+            model_store (Optional[ModelStore], optional): The store holding the trained model in memory.
+                Defaults to None, which loads it from disk.
         """
         self.config = config
+        self.model_store = model_store
 
     def _val_generator(self):
         """
         Generates the validation data generator for the model.
         """
+        if self.config.input_pipeline == "cache":
+            images, labels, manifest = DataPreprocessing.load_cache(
+                self.config.dataset_cache_dir
+            )
+            self.val_generator = CachedImageSequence(
+                images=images,
+                labels=labels,
+                indices=DataPreprocessing.split_indices(labels, 0.30, "validation"),
+                num_classes=len(manifest["class_names"]),
+                batch_size=self.config.batch_size,
+            )
+            self.class_names = manifest["class_names"]
+            return
+
         data_generator_kwargs = dict(rescale=1 / 255, validation_split=0.30)
         data_flow_kwargs = dict(
             target_size=self.config.image_size[:-1],
@@ -42,6 +70,8 @@ class ModelEvaluation:
             shuffle=False,
             **data_flow_kwargs,
         )
+        class_indices = self.val_generator.class_indices
+        self.class_names = sorted(class_indices, key=class_indices.get)
 
     @staticmethod
     def load_model(path: Path) -> tf.keras.Model:
@@ -59,10 +89,32 @@ class ModelEvaluation:
     def evaluation(self):
         """
         Method to perform evaluation using the loaded model and validation data generator.
+        The probabilities are collected in a single inference pass and every metric, including
+        the loss, is computed from them.
         """
-        self.model = self.load_model(self.config.model_path)
+        if self.model_store is not None:
+            self.model = self.model_store.get(self.config.model_path)
+        else:
+            self.model = self.load_model(self.config.model_path)
         self._val_generator()
-        self.score = self.model.evaluate(self.val_generator)
+
+        probabilities, labels = [], []
+        for i in range(len(self.val_generator)):
+            images, y = self.val_generator[i]
+            probabilities.append(self.model.predict_on_batch(images))
+            labels.append(np.argmax(y, axis=1))
+
+        labels = np.concatenate(labels)
+        self.images_processed = len(labels)
+        self.scores = classification_report(
+            probabilities=np.concatenate(probabilities),
+            labels=labels,
+            class_names=self.class_names,
+            threshold=self.config.decision_threshold,
+            positive_class=self.config.positive_class,
+            calibration_bins=self.config.calibration_bins,
+        )
+        self.score = [self.scores["loss"], self.scores["accuracy"]]
 
     def save_score(self, path: Path, scores: dict):
         """
@@ -70,39 +122,58 @@ class ModelEvaluation:
 
         Args:
             path (Path): The file path where the scores will be saved.
-            scores (dict): A dictionary containing the loss and accuracy to be saved.
+            scores (dict): A dictionary containing the metrics to be saved.
         """
         save_json(path, data=scores)
 
-    def log_into_mlflow(self):
+    def log_into_mlflow(self, wait: bool = False) -> "AsyncMlflowLogger":
         """
-        Sets the MLflow registry URI, starts a new MLflow run, logs parameters and metrics,
-        saves scores locally, and registers the model in MLflow Model Registry if the tracking
-        URI scheme is not "file". Otherwise, logs the model without registering it.
+        Sets the MLflow registry URI, starts a new MLflow run, saves scores locally and queues
+        the parameters, metrics and model for a background thread which batches and retries the
+        MLflow calls. The model is registered in MLflow Model Registry if the tracking URI scheme
+        is not "file". Otherwise, it is logged without registering it.
+
+        Args:
+            wait (bool, optional): Whether to block until everything is logged and the run is
+                terminated. Defaults to False, which flushes at interpreter exit at the latest.
+
+        Returns:
+            AsyncMlflowLogger: The logger, whose `close()` flushes the pending logs.
         """
+        import mlflow
+
+        from cnn_classifier.components.mlflow_logger import AsyncMlflowLogger
+
         mlflow.set_registry_uri(self.config.mlflow_uri)
         tracking_url_type_store = urlparse(mlflow.get_tracking_uri()).scheme
 
-        with mlflow.start_run():
-            scores = {"loss": self.score[0], "accuracy": self.score[1]}
-            mlflow.log_params(self.config.params)
-            mlflow.log_metrics(scores)
-
-            # Get run id
-            run = mlflow.active_run()
-            run_id = run.info.run_id
-            # Save scores locally as well
-            path = os.path.join(self.config.root_dir, f"scores_{run_id}.json")
-            self.save_score(Path(path), scores)
-
-            # Model registry does not work with file store
-            if tracking_url_type_store != "file":
-                # Register the model
-                # There are other ways to use the Model Registry, which depends on the use case,
-                # please refer to the doc for more information:
-                # https://mlflow.org/docs/latest/model-registry.html#api-workflow
-                mlflow.keras.log_model(
-                    self.model, "model", registered_model_name="VGG16Model"
-                )
-            else:
-                mlflow.keras.log_model(self.model, "model")
+        mlflow_logger = AsyncMlflowLogger(
+            max_retries=self.config.mlflow_max_retries,
+            retry_backoff_sec=self.config.mlflow_retry_backoff_sec,
+        )
+        run_id = mlflow_logger.start_run()
+
+        mlflow_logger.log_params(self.config.params)
+        mlflow_logger.log_metrics(scalar_metrics(self.scores))
+
+        # Save scores locally as well, the full report with the confusion matrix goes to the run
+        path = os.path.join(self.config.root_dir, f"scores_{run_id}.json")
+        self.save_score(Path(path), self.scores)
+        mlflow_logger.log_artifact(path)
+
+        # Model registry does not work with file store
+        # There are other ways to use the Model Registry, which depends on the use case,
+        # please refer to the doc for more information:
+        # https://mlflow.org/docs/latest/model-registry.html#api-workflow
+        mlflow_logger.log_model(
+            self.model,
+            "model",
+            registered_model_name=(
+                "VGG16Model" if tracking_url_type_store != "file" else None
+            ),
+        )
+
+        if wait:
+            mlflow_logger.close()
+
+        return mlflow_logger
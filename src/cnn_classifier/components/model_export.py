@@ -0,0 +1,145 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import tensorflow as tf
+
+from cnn_classifier import logger
+from cnn_classifier.components.cached_image_sequence import \
+    CachedImageSequence
+from cnn_classifier.components.data_preprocessing import DataPreprocessing
+from cnn_classifier.components.model_holder import TFLiteModel
+from cnn_classifier.components.model_store import ModelStore
+from cnn_classifier.entity.config_entity import ModelExportConfig
+from cnn_classifier.utils.common import save_json
+
+
+class ModelExport:
+    def __init__(
+        self, config: ModelExportConfig, model_store: Optional[ModelStore] = None
+    ):
+        """
+        Initializes the class with the given ModelExportConfig object.
+
+        Args:
+            config (ModelExportConfig): The configuration object for model export.
+            model_store (Optional[ModelStore], optional): The store holding the trained model in memory.
+                Defaults to None, which loads it from disk.
+        """
+        self.config = config
+        self.model_store = model_store
+
+    def _val_generator(self):
+        """
+        Generates the validation data generator used for calibration and the accuracy comparison.
+        """
+        if self.config.input_pipeline == "cache":
+            images, labels, manifest = DataPreprocessing.load_cache(
+                self.config.dataset_cache_dir
+            )
+            self.val_generator = CachedImageSequence(
+                images=images,
+                labels=labels,
+                indices=DataPreprocessing.split_indices(labels, 0.30, "validation"),
+                num_classes=len(manifest["class_names"]),
+                batch_size=self.config.batch_size,
+            )
+            return
+
+        val_data_generator = tf.keras.preprocessing.image.ImageDataGenerator(
+            rescale=1 / 255, validation_split=0.30
+        )
+        self.val_generator = val_data_generator.flow_from_directory(
+            directory=self.config.data_path,
+            subset="validation",
+            shuffle=False,
+            target_size=self.config.image_size[:-1],
+            batch_size=self.config.batch_size,
+            interpolation="bilinear",
+        )
+
+    def _representative_dataset(self):
+        """
+        Yields single calibration images from the validation data for int8 quantization.
+
+        Yields:
+            list: A list holding one float32 image batch of size 1.
+        """
+        count = 0
+        for i in range(len(self.val_generator)):
+            images, _ = self.val_generator[i]
+            for image in images:
+                if count >= self.config.calibration_samples:
+                    return
+                yield [np.expand_dims(image, axis=0).astype(np.float32)]
+                count += 1
+
+    def export(self):
+        """
+        Converts the trained Keras model to TFLite with the configured post-training quantization.
+        """
+        if self.model_store is not None:
+            self.model = self.model_store.get(self.config.model_path)
+        else:
+            self.model = tf.keras.models.load_model(self.config.model_path)
+        self._val_generator()
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+        quantization = self.config.quantization
+        if quantization in ("dynamic", "int8"):
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "int8":
+            converter.representative_dataset = self._representative_dataset
+            converter.target_spec.supported_ops = [
+                tf.lite.OpsSet.TFLITE_BUILTINS_INT8
+            ]
+        elif quantization not in ("none", "dynamic"):
+            raise ValueError(
+                f"Unknown quantization: {quantization}, "
+                "expected one of 'none', 'dynamic' or 'int8'"
+            )
+
+        with open(self.config.tflite_model_path, "wb") as f:
+            f.write(converter.convert())
+        logger.info(
+            f"Exported {quantization} quantized TFLite model at: "
+            f"{self.config.tflite_model_path}"
+        )
+
+    def compare(self):
+        """
+        Compares the exported model with the float Keras model on the validation data and
+        saves accuracy, prediction agreement and model sizes to the report file.
+        """
+        tflite_model = TFLiteModel(self.config.tflite_model_path)
+
+        labels, keras_predictions, tflite_predictions = [], [], []
+        for i in range(len(self.val_generator)):
+            images, y = self.val_generator[i]
+            labels.append(np.argmax(y, axis=1))
+            keras_predictions.append(
+                np.argmax(self.model.predict_on_batch(images), axis=1)
+            )
+            tflite_predictions.append(
+                np.argmax(tflite_model.predict_on_batch(images), axis=1)
+            )
+
+        labels = np.concatenate(labels)
+        self.images_processed = len(labels)
+        keras_predictions = np.concatenate(keras_predictions)
+        tflite_predictions = np.concatenate(tflite_predictions)
+
+        keras_accuracy = float(np.mean(keras_predictions == labels))
+        tflite_accuracy = float(np.mean(tflite_predictions == labels))
+        report = {
+            "quantization": self.config.quantization,
+            "keras_accuracy": keras_accuracy,
+            "tflite_accuracy": tflite_accuracy,
+            "accuracy_delta": tflite_accuracy - keras_accuracy,
+            "agreement": float(np.mean(keras_predictions == tflite_predictions)),
+            "keras_size_bytes": os.path.getsize(self.config.model_path),
+            "tflite_size_bytes": os.path.getsize(self.config.tflite_model_path),
+        }
+        save_json(Path(self.config.report_file), data=report)
+        logger.info(f"Export report: {report}")
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import tensorflow as tf
+
+from cnn_classifier import logger
+from cnn_classifier.utils.monitoring import (BATCH_SIZE, FORWARD_PASS_LATENCY,
+                                             MODEL_LOAD_SECONDS, MODEL_VERSION)
+
+
+class TFLiteModel:
+    def __init__(self, model_path: Path, num_threads: Optional[int] = None):
+        """
+        Wraps a TFLite interpreter behind the `predict_on_batch` interface of a Keras model.
+
+        Args:
+            model_path (Path): The path to the `.tflite` model file.
+            num_threads (Optional[int], optional): The number of interpreter threads. Defaults to None,
+                which follows the TensorFlow intra-op thread setting of the process if there is one.
+        """
+        if num_threads is None:
+            num_threads = tf.config.threading.get_intra_op_parallelism_threads() or None
+        self.interpreter = tf.lite.Interpreter(
+            model_path=str(model_path), num_threads=num_threads
+        )
+        self._input_index = self.interpreter.get_input_details()[0]["index"]
+        self._output_index = self.interpreter.get_output_details()[0]["index"]
+        self._batch_size = None
+        # The interpreter is not thread-safe
+        self._lock = threading.Lock()
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Runs the interpreter on a batch of images, resizing its input tensor when needed.
+
+        Args:
+            batch (np.ndarray): The batch of images with shape (N, H, W, C).
+
+        Returns:
+            np.ndarray: The model outputs with shape (N, classes).
+        """
+        with self._lock:
+            if batch.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_size = batch.shape[0]
+
+            self.interpreter.set_tensor(self._input_index, batch.astype(np.float32))
+            self.interpreter.invoke()
+
+            return self.interpreter.get_tensor(self._output_index).copy()
+
+
+class ModelHolder:
+    def __init__(
+        self,
+        model_path: Path,
+        image_size: list,
+        warm_up: bool = True,
+        hot_reload: bool = False,
+        backend: str = "keras",
+        num_threads: Optional[int] = None,
+    ):
+        """
+        Initializes the holder which keeps a single loaded copy of the model per process.
+
+        Args:
+            model_path (Path): The path to the trained model file.
+            image_size (list): The input image size of the model, e.g. [224, 224, 3].
+            warm_up (bool, optional): Whether to run a dummy inference after loading. Defaults to True.
+            hot_reload (bool, optional): Whether to reload the model when the file on disk changes. Defaults to False.
+            backend (str, optional): Either "keras" or "tflite". Defaults to "keras".
+            num_threads (Optional[int], optional): The number of TFLite interpreter threads. Defaults to None.
+        """
+        if backend not in ("keras", "tflite"):
+            raise ValueError(
+                f"Unknown backend: {backend}, expected one of 'keras' or 'tflite'"
+            )
+
+        self.model_path = model_path
+        self.image_size = image_size
+        self.warm_up = warm_up
+        self.hot_reload = hot_reload
+        self.backend = backend
+        self.num_threads = num_threads
+
+        self.version = 0
+        self._model = None
+        self._signature: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def _file_signature(self) -> tuple:
+        """
+        Returns a cheap signature (modification time and size) of the model file.
+
+        Returns:
+            tuple: The modification time in nanoseconds and the size in bytes.
+        """
+        stat = os.stat(self.model_path)
+
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _is_stale(self) -> bool:
+        """
+        Checks whether the model file on disk differs from the loaded one.
+
+        Returns:
+            bool: True if the file has changed since the last load attempt.
+        """
+        try:
+            return self._file_signature() != self._signature
+        except FileNotFoundError:
+            # The file is being replaced, keep serving the current model
+            return False
+
+    def _warm_up(self, model):
+        """
+        Runs a dummy inference so that the first real request does not pay for graph tracing.
+
+        Args:
+            model: The freshly loaded Keras or TFLite model.
+        """
+        dummy = np.zeros((1, *self.image_size), dtype=np.float32)
+        model.predict_on_batch(dummy)
+
+    def _load(self):
+        """Loads (or reloads) the model from disk. Must be called with the lock held."""
+        start = time.perf_counter()
+        signature = self._file_signature()
+        model = (
+            TFLiteModel(self.model_path, num_threads=self.num_threads)
+            if self.backend == "tflite"
+            else tf.keras.models.load_model(self.model_path)
+        )
+        if self.warm_up:
+            self._warm_up(model)
+
+        self._model = model
+        self._signature = signature
+        self.version += 1
+        load_sec = time.perf_counter() - start
+        MODEL_LOAD_SECONDS.labels(backend=self.backend).observe(load_sec)
+        MODEL_VERSION.set(self.version)
+        logger.info(
+            f"Loaded {self.backend} model (version {self.version}) from "
+            f"{self.model_path} in {load_sec:.2f}s"
+        )
+
+    def load(self):
+        """Loads the model eagerly, e.g. at application startup."""
+        with self._lock:
+            self._load()
+
+    def get_model(self):
+        """
+        Returns the loaded model, loading it lazily on first use and reloading it
+        if hot reload is enabled and the file on disk has changed.
+
+        Returns:
+            The loaded Keras model or TFLite model wrapper.
+        """
+        model = self._model
+        if model is not None and not (self.hot_reload and self._is_stale()):
+            return model
+
+        with self._lock:
+            if self._model is None:
+                self._load()
+            elif self.hot_reload and self._is_stale():
+                try:
+                    self._load()
+                except Exception as e:
+                    logger.error(f"Failed to reload model from {self.model_path}: {e}")
+                    # Keep serving the current model and do not retry until the file changes again
+                    try:
+                        self._signature = self._file_signature()
+                    except OSError:
+                        # The file is gone or being replaced, the next request checks again
+                        pass
+
+            return self._model
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Runs inference on a batch of preprocessed images.
+
+        Args:
+            batch (np.ndarray): The batch of images with shape (N, H, W, C).
+
+        Returns:
+            np.ndarray: The predicted class probabilities with shape (N, classes).
+        """
+        model = self.get_model()
+        BATCH_SIZE.observe(len(batch))
+        with FORWARD_PASS_LATENCY.time():
+            return model.predict_on_batch(batch)
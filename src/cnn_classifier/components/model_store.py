@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from cnn_classifier import logger
+
+if TYPE_CHECKING:
+    import tensorflow as tf
+
+
+class ModelStore:
+    def __init__(self):
+        """
+        Initializes the store which hands live models between pipeline stages in the same
+        process, while persisting them to disk on a background thread for DVC.
+
+        Writes happen one at a time in submission order, so waiting for a write also means
+        every earlier write has finished.
+        """
+        self._models = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="model_store"
+        )
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        """
+        Normalizes a model path into a dictionary key.
+
+        Args:
+            path (Path): The model path.
+
+        Returns:
+            str: The absolute path.
+        """
+        return os.path.abspath(path)
+
+    @staticmethod
+    def _save(path: Path, model: "tf.keras.Model"):
+        """
+        Saves a model to disk, called on the background thread.
+
+        Args:
+            path (Path): The path where the model will be saved.
+            model (tf.keras.Model): The model to be saved.
+        """
+        start = time.perf_counter()
+        model.save(path)
+        logger.info(f"Persisted {path} in {time.perf_counter() - start:.1f}s")
+
+    def put(self, path: Path, model: "tf.keras.Model"):
+        """
+        Hands over a model produced by a stage and schedules it to be saved to the given path.
+
+        Args:
+            path (Path): The path where the model will be saved.
+            model (tf.keras.Model): The model to be handed over.
+        """
+        key = self._key(path)
+        with self._lock:
+            self._models[key] = model
+            self._pending[key] = self._executor.submit(self._save, path, model)
+
+    def get(self, path: Path, mutable: bool = False) -> "tf.keras.Model":
+        """
+        Returns the live model handed over for the given path, loading it from disk when
+        no earlier stage in this process produced it. The pending write of the model is
+        awaited first, as Keras does not support using a model while it is being saved.
+
+        Args:
+            path (Path): The model path.
+            mutable (bool, optional): Whether the caller will modify the model, e.g. train it.
+                The model is then no longer handed out for this path. Defaults to False.
+
+        Returns:
+            tf.keras.Model: The model.
+        """
+        key = self._key(path)
+        with self._lock:
+            model = self._models.get(key)
+        if model is None:
+            import tensorflow as tf
+
+            return tf.keras.models.load_model(path)
+
+        self.wait(path)
+        if mutable:
+            with self._lock:
+                self._models.pop(key, None)
+        logger.info(f"Reusing in-memory model for {path}")
+
+        return model
+
+    def wait(self, path: Path):
+        """
+        Blocks until the model for the given path and every earlier model are saved.
+
+        Args:
+            path (Path): The model path.
+
+        Raises:
+            Exception: The error raised while saving the model, if any.
+        """
+        with self._lock:
+            future: Future = self._pending.get(self._key(path))
+        if future is not None:
+            future.result()
+
+    def has_models_under(self, paths: list) -> bool:
+        """
+        Checks whether a model was handed over at or below any of the given paths, i.e.
+        whether a stage in this process regenerated it.
+
+        Args:
+            paths (list): The files or directories to check.
+
+        Returns:
+            bool: True if a model was handed over for one of the paths.
+        """
+        roots = [self._key(path) for path in paths]
+        with self._lock:
+            keys = list(self._pending)
+
+        return any(
+            key == root or key.startswith(root + os.sep)
+            for key in keys
+            for root in roots
+        )
+
+    def close(self):
+        """
+        Waits for all pending writes and releases the live models.
+
+        Raises:
+            Exception: The first error raised while saving a model, if any.
+        """
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            futures = list(self._pending.values())
+            self._pending.clear()
+            self._models.clear()
+        for future in futures:
+            future.result()
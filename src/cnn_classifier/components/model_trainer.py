@@ -1,30 +1,66 @@
+import hashlib
+import json
+import os
 from pathlib import Path
+from typing import Optional
 
+import numpy as np
 import tensorflow as tf
 
+from cnn_classifier import logger
+from cnn_classifier.components.cached_image_sequence import \
+    CachedImageSequence
+from cnn_classifier.components.data_preprocessing import DataPreprocessing
+from cnn_classifier.components.model_store import ModelStore
+from cnn_classifier.components.prepare_base_model import PrepareBaseModel
+from cnn_classifier.components.training_callbacks import (EpochLogger,
+                                                          WeightCheckpoint)
 from cnn_classifier.entity.config_entity import ModelTrainerConfig
 
 
 class ModelTrainer:
-    def __init__(self, config: ModelTrainerConfig):
+    def __init__(
+        self, config: ModelTrainerConfig, model_store: Optional[ModelStore] = None
+    ):
         """
         Initializes the class with the given ModelTrainerConfig object.
 
         Parameters:
             config (ModelTrainerConfig): The configuration object for the model training.
+            model_store (Optional[ModelStore], optional): The store to exchange models with the other
+                stages in memory. Defaults to None, which loads and saves them synchronously.
         """
         self.config = config
+        self.model_store = model_store
 
     def get_base_model(self):
         """
         Gets the base model and loads it using the updated base model path from the configuration.
         """
-        self.model = tf.keras.models.load_model(self.config.updated_base_model_path)
+        if self.model_store is not None:
+            # Training modifies the model in place, so its pending write must finish first
+            self.model = self.model_store.get(
+                self.config.updated_base_model_path, mutable=True
+            )
+        else:
+            self.model = tf.keras.models.load_model(self.config.updated_base_model_path)
 
     def train_val_generator(self):
         """
         Generates the training and validation data generators for the model.
         """
+        if self.config.input_pipeline == "tf_data":
+            self._train_val_dataset()
+            return
+        if self.config.input_pipeline == "cache":
+            self._train_val_cached()
+            return
+        if self.config.input_pipeline != "generator":
+            raise ValueError(
+                f"Unknown input pipeline: {self.config.input_pipeline}, "
+                "expected one of 'generator', 'tf_data' or 'cache'"
+            )
+
         data_generator_kwargs = dict(rescale=1 / 255, validation_split=0.20)
         data_flow_kwargs = dict(
             target_size=self.config.image_size[:-1],
@@ -62,6 +98,263 @@ class ModelTrainer:
             shuffle=True,
             **data_flow_kwargs,
         )
+        self.train_samples = self.train_generator.samples
+
+    @staticmethod
+    def _augmentation_layers() -> tf.keras.Sequential:
+        """
+        Returns vectorized augmentation layers matching the `ImageDataGenerator` settings.
+        Shear is left out since `ImageDataGenerator` interprets `shear_range=0.2` in degrees,
+        which is visually a no-op, and there is no built-in shear layer.
+
+        Returns:
+            tf.keras.Sequential: The augmentation layers.
+        """
+        return tf.keras.Sequential(
+            [
+                tf.keras.layers.RandomRotation(40 / 360, fill_mode="nearest"),
+                tf.keras.layers.RandomTranslation(0.2, 0.2, fill_mode="nearest"),
+                tf.keras.layers.RandomZoom(0.2, fill_mode="nearest"),
+                tf.keras.layers.RandomFlip("horizontal"),
+            ],
+            name="augmentation",
+        )
+
+    def _train_val_dataset(self):
+        """
+        Generates the training and validation `tf.data` pipelines for the model, decoding
+        in parallel, caching the decoded images and prefetching batches ahead of training.
+        The subsets follow the per-class ordered split of `flow_from_directory`, so
+        evaluation and export never see training images.
+        """
+        autotune = tf.data.AUTOTUNE
+        class_names, samples = DataPreprocessing.list_samples(self.config.data_path)
+        paths = np.array(
+            [os.path.join(self.config.data_path, rel_path) for rel_path, _ in samples]
+        )
+        labels = np.array([class_index for _, class_index in samples], dtype=np.int64)
+        image_size = self.config.image_size[:-1]
+
+        def load_image(path: tf.Tensor, label: tf.Tensor) -> tuple:
+            image = tf.io.decode_image(
+                tf.io.read_file(path), channels=3, expand_animations=False
+            )
+            image = tf.image.resize(image, image_size, method="bilinear")
+            return image, tf.one_hot(label, len(class_names))
+
+        def load_subset(indices: np.ndarray) -> tf.data.Dataset:
+            return tf.data.Dataset.from_tensor_slices(
+                (paths[indices], labels[indices])
+            ).map(load_image, num_parallel_calls=autotune)
+
+        train_indices = DataPreprocessing.split_indices(labels, 0.20, "training")
+        # The split is ordered by class, which the shuffle buffer alone would not mix
+        train_indices = np.random.default_rng(42).permutation(train_indices)
+        train_dataset = load_subset(train_indices)
+        val_dataset = load_subset(
+            DataPreprocessing.split_indices(labels, 0.20, "validation")
+        )
+        self.train_samples = len(train_indices)
+
+        # Cache the decoded images as uint8 to keep the in-memory cache 4x smaller
+        to_uint8 = lambda x, y: (tf.cast(tf.round(x), tf.uint8), y)
+        rescale = lambda x, y: (tf.cast(x, tf.float32) / 255.0, y)
+
+        train_dataset = (
+            train_dataset.map(to_uint8, num_parallel_calls=autotune)
+            .cache()
+            .shuffle(1000, seed=42, reshuffle_each_iteration=True)
+            .batch(self.config.batch_size)
+            .map(rescale, num_parallel_calls=autotune)
+        )
+        if self.config.augmentation:
+            augmentation = self._augmentation_layers()
+            train_dataset = train_dataset.map(
+                lambda x, y: (augmentation(x, training=True), y),
+                num_parallel_calls=autotune,
+            )
+
+        self.train_dataset = train_dataset.prefetch(autotune)
+        self.val_dataset = (
+            val_dataset.map(to_uint8, num_parallel_calls=autotune)
+            .cache()
+            .batch(self.config.batch_size)
+            .map(rescale, num_parallel_calls=autotune)
+            .prefetch(autotune)
+        )
+
+    def _train_val_cached(self):
+        """
+        Generates the training and validation batch sequences from the memory-mapped
+        dataset cache written by the data preprocessing stage.
+        """
+        images, labels, manifest = DataPreprocessing.load_cache(
+            self.config.dataset_cache_dir
+        )
+        num_classes = len(manifest["class_names"])
+
+        self.val_generator = CachedImageSequence(
+            images=images,
+            labels=labels,
+            indices=DataPreprocessing.split_indices(labels, 0.20, "validation"),
+            num_classes=num_classes,
+            batch_size=self.config.batch_size,
+        )
+        self.train_generator = CachedImageSequence(
+            images=images,
+            labels=labels,
+            indices=DataPreprocessing.split_indices(labels, 0.20, "training"),
+            num_classes=num_classes,
+            batch_size=self.config.batch_size,
+            shuffle=True,
+            augmentation=(
+                self._augmentation_layers() if self.config.augmentation else None
+            ),
+        )
+        self.train_samples = self.train_generator.samples
+
+    def _feature_source(self, subset: str):
+        """
+        Returns an unshuffled, non-augmented batch source over the given subset.
+
+        Args:
+            subset (str): Either "training" or "validation".
+
+        Returns:
+            The batch source exposing `classes` in iteration order.
+        """
+        if self.config.input_pipeline == "cache":
+            images, labels, manifest = DataPreprocessing.load_cache(
+                self.config.dataset_cache_dir
+            )
+            return CachedImageSequence(
+                images=images,
+                labels=labels,
+                indices=DataPreprocessing.split_indices(labels, 0.20, subset),
+                num_classes=len(manifest["class_names"]),
+                batch_size=self.config.batch_size,
+            )
+
+        data_generator = tf.keras.preprocessing.image.ImageDataGenerator(
+            rescale=1 / 255, validation_split=0.20
+        )
+        return data_generator.flow_from_directory(
+            directory=self.config.data_path,
+            subset=subset,
+            shuffle=False,
+            target_size=self.config.image_size[:-1],
+            batch_size=self.config.batch_size,
+            interpolation="bilinear",
+        )
+
+    def _feature_cache_key(self) -> str:
+        """
+        Computes a key identifying the cached embeddings from the backbone file,
+        the image size and the listing of the dataset.
+
+        Returns:
+            str: The hex digest of the key.
+        """
+        stat = os.stat(self.config.updated_base_model_path)
+        digest = hashlib.sha256(
+            json.dumps(
+                [stat.st_mtime_ns, stat.st_size, list(self.config.image_size)]
+            ).encode()
+        )
+        for root, _, files in sorted(os.walk(self.config.data_path)):
+            for file_name in sorted(files):
+                path = os.path.join(root, file_name)
+                digest.update(f"{path}:{os.path.getsize(path)}".encode())
+
+        return digest.hexdigest()
+
+    def _extract_features(self, backbone: tf.keras.Model) -> dict:
+        """
+        Runs the frozen backbone once over both subsets and persists the embeddings,
+        reusing previously persisted embeddings when the cache key still matches.
+
+        Args:
+            backbone (tf.keras.Model): The frozen backbone.
+
+        Returns:
+            dict: The (features, one-hot labels) tuple per subset.
+        """
+        cache_dir = self.config.feature_cache_dir
+        key_path = os.path.join(cache_dir, "key.json")
+        key = self._feature_cache_key()
+        subsets = ("training", "validation")
+
+        cached = False
+        if os.path.exists(key_path):
+            with open(key_path) as f:
+                cached = json.load(f).get("key") == key
+
+        if not cached:
+            os.makedirs(cache_dir, exist_ok=True)
+            num_classes = self.model.output_shape[-1]
+            for subset in subsets:
+                source = self._feature_source(subset)
+                np.save(
+                    os.path.join(cache_dir, f"features_{subset}.npy"),
+                    backbone.predict(source),
+                )
+                np.save(
+                    os.path.join(cache_dir, f"labels_{subset}.npy"),
+                    np.eye(num_classes, dtype=np.float32)[source.classes],
+                )
+            # The key is written last so an interrupted run is never mistaken for a complete cache
+            with open(key_path, "w") as f:
+                json.dump({"key": key}, f)
+            logger.info(f"Cached embeddings into {cache_dir}")
+        else:
+            logger.info(f"Reusing cached embeddings from {cache_dir}")
+
+        return {
+            subset: (
+                np.load(
+                    os.path.join(cache_dir, f"features_{subset}.npy"), mmap_mode="r"
+                ),
+                np.load(os.path.join(cache_dir, f"labels_{subset}.npy")),
+            )
+            for subset in subsets
+        }
+
+    def _train_on_features(self, callbacks: list, checkpoint_key: str):
+        """
+        Trains the classification head directly on the cached backbone embeddings.
+        The head layers are shared with the full model, so the full model is trained in place.
+
+        Args:
+            callbacks (list): The Keras callbacks.
+            checkpoint_key (str): The key of the checkpoint to resume from.
+        """
+        backbone, head_layers = PrepareBaseModel.split_model(self.model)
+        features = self._extract_features(backbone)
+
+        inputs = tf.keras.Input(shape=backbone.output_shape[1:])
+        outputs = inputs
+        for layer in head_layers:
+            outputs = layer(outputs)
+        head = tf.keras.models.Model(inputs=inputs, outputs=outputs)
+        head.compile(
+            optimizer=self.model.optimizer.__class__.from_config(
+                self.model.optimizer.get_config()
+            ),
+            loss=self.model.loss,
+            metrics=["accuracy"],
+        )
+
+        x_train, y_train = features["training"]
+        self.history = head.fit(
+            x_train,
+            y_train,
+            batch_size=self.config.batch_size,
+            epochs=self.config.epochs,
+            validation_data=features["validation"],
+            shuffle=True,
+            callbacks=callbacks,
+            initial_epoch=self._initial_epoch(head, checkpoint_key),
+        )
 
     @staticmethod
     def save_model(path: Path, model: tf.keras.Model):
@@ -74,10 +367,90 @@ class ModelTrainer:
         """
         model.save(path)
 
-    def train(self):
+    def _checkpoint_key(self) -> str:
         """
-        Trains the model using the train and validation generators and saves the trained model to a specified path.
+        Computes a key identifying the training setup a checkpoint belongs to from the
+        base model file and the settings which change the trained weights, except the
+        number of epochs so a run can be resumed with more epochs.
+
+        Returns:
+            str: The hex digest of the key.
+        """
+        stat = os.stat(self.config.updated_base_model_path)
+
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    list(self.config.image_size),
+                    self.config.batch_size,
+                    self.config.augmentation,
+                    self.config.input_pipeline,
+                    self.config.training_mode,
+                ]
+            ).encode()
+        ).hexdigest()
+
+    def _callbacks(self, checkpoint_key: Optional[str] = None) -> list:
+        """
+        Builds the training callbacks configured in `params.yaml`.
+
+        Args:
+            checkpoint_key (Optional[str], optional): The key the checkpoints are saved with.
+                Defaults to None, which saves no checkpoints.
+
+        Returns:
+            list: The Keras callbacks.
+        """
+        callbacks = [EpochLogger(samples_per_epoch=self.train_samples)]
+        if self.config.early_stopping_patience is not None:
+            callbacks.append(
+                tf.keras.callbacks.EarlyStopping(
+                    monitor="val_loss",
+                    patience=self.config.early_stopping_patience,
+                    restore_best_weights=True,
+                )
+            )
+        if checkpoint_key is not None and self.config.checkpoint_every_epochs:
+            callbacks.append(
+                WeightCheckpoint(
+                    checkpoint_dir=self.config.checkpoint_dir,
+                    every_epochs=self.config.checkpoint_every_epochs,
+                    key=checkpoint_key,
+                )
+            )
+
+        return callbacks
+
+    def _initial_epoch(self, model: tf.keras.Model, checkpoint_key: str) -> int:
         """
+        Loads the last checkpoint into the model when resuming is enabled.
+
+        Args:
+            model (tf.keras.Model): The model being trained.
+            checkpoint_key (str): The key of the current training setup.
+
+        Returns:
+            int: The epoch to start training from.
+        """
+        if not self.config.resume:
+            return 0
+
+        return WeightCheckpoint.restore(
+            self.config.checkpoint_dir, checkpoint_key, model
+        )
+
+    def _fit_kwargs(self) -> dict:
+        """
+        Returns the data arguments of `fit` for the configured input pipeline.
+
+        Returns:
+            dict: The training and validation data and steps.
+        """
+        if self.config.input_pipeline == "tf_data":
+            return dict(x=self.train_dataset, validation_data=self.val_dataset)
+
         self.steps_per_epoch = (
             self.train_generator.samples // self.train_generator.batch_size
         )
@@ -85,12 +458,164 @@ class ModelTrainer:
             self.val_generator.samples // self.val_generator.batch_size
         )
 
-        self.model.fit(
-            self.train_generator,
-            epochs=self.config.epochs,
+        return dict(
+            x=self.train_generator,
             steps_per_epoch=self.steps_per_epoch,
             validation_steps=self.validation_steps,
             validation_data=self.val_generator,
         )
 
-        self.save_model(path=self.config.trained_model_file_path, model=self.model)
+    def _fit(self, callbacks: list, checkpoint_key: str):
+        """
+        Trains the full model end to end on the train and validation data.
+
+        Args:
+            callbacks (list): The Keras callbacks.
+            checkpoint_key (str): The key of the checkpoint to resume from.
+        """
+        self.history = self.model.fit(
+            epochs=self.config.epochs,
+            callbacks=callbacks,
+            initial_epoch=self._initial_epoch(self.model, checkpoint_key),
+            **self._fit_kwargs(),
+        )
+
+    @staticmethod
+    def _bfloat16_supported() -> bool:
+        """
+        Checks whether the hardware computes in bfloat16 natively, as GPUs and CPUs with
+        AVX512-BF16 or AMX do. Elsewhere bfloat16 is emulated and slower than float32.
+
+        Returns:
+            bool: True if bfloat16 is supported natively.
+        """
+        if tf.config.list_physical_devices("GPU"):
+            return True
+        try:
+            with open("/proc/cpuinfo") as f:
+                cpu_flags = f.read()
+        except OSError:
+            return False
+
+        return "avx512_bf16" in cpu_flags or "amx_bf16" in cpu_flags
+
+    @staticmethod
+    def _with_dtype_policy(model: tf.keras.Model, policy: str) -> tf.keras.Model:
+        """
+        Clones a model with every layer but the output layer using the given dtype policy.
+        The weights and trainable flags are kept.
+
+        Args:
+            model (tf.keras.Model): The model.
+            policy (str): The dtype policy, e.g. "mixed_bfloat16" or "float32".
+
+        Returns:
+            tf.keras.Model: The cloned model, not compiled.
+        """
+        output_layer_name = model.layers[-1].name
+
+        def clone_layer(layer: tf.keras.layers.Layer) -> tf.keras.layers.Layer:
+            layer_config = layer.get_config()
+            # The softmax output stays in float32 for numerically stable probabilities
+            if layer.name != output_layer_name:
+                layer_config["dtype"] = policy
+            return layer.__class__.from_config(layer_config)
+
+        clone = tf.keras.models.clone_model(model, clone_function=clone_layer)
+        clone.set_weights(model.get_weights())
+
+        return clone
+
+    def _fine_tune(self, callbacks: list):
+        """
+        Second training phase: unfreezes the last `fine_tune_layers` backbone layers and
+        trains them together with the head at the lower fine-tuning learning rate, optionally
+        in bfloat16 mixed precision and compiled with XLA.
+
+        Args:
+            callbacks (list): Additional Keras callbacks.
+        """
+        backbone, _ = PrepareBaseModel.split_model(self.model)
+        PrepareBaseModel.freeze_layers(
+            backbone.layers, freeze_all=False, freeze_till=self.config.fine_tune_layers
+        )
+        optimizer_class = self.model.optimizer.__class__
+        optimizer_config = self.model.optimizer.get_config()
+        optimizer_config["learning_rate"] = self.config.fine_tune_learning_rate
+        compile_kwargs = dict(loss=self.model.loss, metrics=["accuracy"])
+
+        mixed_precision = self.config.mixed_precision and self._bfloat16_supported()
+        if self.config.mixed_precision and not mixed_precision:
+            logger.warning(
+                "bfloat16 is not supported natively by this hardware, "
+                "fine-tuning in float32"
+            )
+        if mixed_precision:
+            self.model = self._with_dtype_policy(self.model, "mixed_bfloat16")
+        self.model.compile(
+            optimizer=optimizer_class.from_config(optimizer_config),
+            jit_compile=self.config.jit_compile,
+            **compile_kwargs,
+        )
+        logger.info(
+            f"Fine-tuning the last {self.config.fine_tune_layers} backbone layers "
+            f"at learning rate {self.config.fine_tune_learning_rate}"
+        )
+
+        # Epochs are numbered after the first phase, so logs and callbacks continue from it
+        self.history = self.model.fit(
+            epochs=self.config.epochs + self.config.fine_tune_epochs,
+            initial_epoch=self.config.epochs,
+            callbacks=self._callbacks() + callbacks,
+            **self._fit_kwargs(),
+        )
+
+        if mixed_precision:
+            # The saved model serves in float32, bfloat16 is only used to speed up training
+            self.model = self._with_dtype_policy(self.model, "float32")
+            # Optimizers bind to the variables they were built with, so the float32 clone
+            # needs a fresh one instead of the optimizer of the bfloat16 model
+            self.model.compile(
+                optimizer=optimizer_class.from_config(optimizer_config),
+                **compile_kwargs,
+            )
+
+    def train(self, callbacks: Optional[list] = None):
+        """
+        Trains the model using the train and validation generators and saves the trained model to a specified path.
+        With `fine_tune_layers` set, the head is trained on the frozen backbone first and the top
+        backbone layers are fine-tuned afterwards.
+
+        Args:
+            callbacks (Optional[list], optional): Additional Keras callbacks, e.g. to stop
+                training early. A callback which sets `stopped_early` also skips fine-tuning.
+                Defaults to None.
+        """
+        extra_callbacks = list(callbacks or [])
+        checkpoint_key = self._checkpoint_key()
+        callbacks = self._callbacks(checkpoint_key) + extra_callbacks
+        if self.config.training_mode == "feature_cache" and not self.config.augmentation:
+            self._train_on_features(callbacks, checkpoint_key)
+        else:
+            if self.config.training_mode == "feature_cache":
+                logger.warning(
+                    "Feature-cache training requires AUGMENTATION: False, "
+                    "falling back to full training"
+                )
+            self._fit(callbacks, checkpoint_key)
+        # Resumed or early stopped runs train fewer than the configured number of epochs
+        self.epochs_run = len(self.history.epoch)
+
+        stopped_early = any(
+            getattr(callback, "stopped_early", False) for callback in extra_callbacks
+        )
+        if self.config.fine_tune_layers and not stopped_early:
+            self._fine_tune(extra_callbacks)
+            self.epochs_run += len(self.history.epoch)
+        WeightCheckpoint.clear(self.config.checkpoint_dir)
+        self.images_processed = self.train_samples * self.epochs_run
+
+        if self.model_store is not None:
+            self.model_store.put(self.config.trained_model_file_path, self.model)
+        else:
+            self.save_model(path=self.config.trained_model_file_path, model=self.model)
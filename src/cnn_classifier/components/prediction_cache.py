@@ -0,0 +1,155 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from cnn_classifier import logger
+from cnn_classifier.utils.monitoring import (CACHE_EVICTIONS, CACHE_REQUESTS,
+                                             CACHE_SIZE_BYTES)
+
+# Rough per-entry overhead of the key, the dictionary slot and the array header
+ENTRY_OVERHEAD_BYTES = 256
+
+
+class PredictionCache:
+    def __init__(self, max_bytes: int, ttl_sec: Optional[float] = None):
+        """
+        Initializes the LRU cache of model outputs keyed by the hash of the image bytes.
+        Entries belong to one model version and are dropped as soon as another version is seen.
+
+        Args:
+            max_bytes (int): The approximate memory budget of the cached entries.
+            ttl_sec (Optional[float], optional): How long an entry stays valid. Defaults to None,
+                which keeps entries until they are evicted.
+        """
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+
+        self._entries = OrderedDict()
+        self._model_version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(img_bytes: bytes) -> str:
+        """
+        Computes the cache key of an image.
+
+        Args:
+            img_bytes (bytes): The encoded image bytes.
+
+        Returns:
+            str: The hex digest of the image bytes.
+        """
+        return hashlib.sha256(img_bytes).hexdigest()
+
+    def _sync_version(self, model_version: int):
+        """
+        Clears the cache when the model version changed. Must be called with the lock held.
+
+        Args:
+            model_version (int): The version of the model currently served.
+        """
+        if model_version != self._model_version:
+            if self._entries:
+                logger.info(
+                    f"Model version changed to {model_version}, "
+                    f"dropping {len(self._entries)} cached predictions"
+                )
+            self._entries.clear()
+            self.size_bytes = 0
+            CACHE_SIZE_BYTES.set(0)
+            self._model_version = model_version
+
+    def get(self, key: str, model_version: int) -> Optional[np.ndarray]:
+        """
+        Looks up the cached model output of an image.
+
+        Args:
+            key (str): The cache key of the image.
+            model_version (int): The version of the model currently served.
+
+        Returns:
+            Optional[np.ndarray]: The cached model output, or None on a miss.
+        """
+        with self._lock:
+            self._sync_version(model_version)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_sec is not None:
+                if time.monotonic() - entry[1] > self.ttl_sec:
+                    self._remove(key)
+                    entry = None
+
+            if entry is None:
+                self.misses += 1
+                CACHE_REQUESTS.labels(result="miss").inc()
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            CACHE_REQUESTS.labels(result="hit").inc()
+
+            return entry[0]
+
+    def put(self, key: str, model_version: int, output: np.ndarray):
+        """
+        Caches the model output of an image, evicting the least recently used entries
+        to stay within the memory budget.
+
+        Args:
+            key (str): The cache key of the image.
+            model_version (int): The version of the model which produced the output.
+            output (np.ndarray): The model output.
+        """
+        entry_bytes = output.nbytes + ENTRY_OVERHEAD_BYTES
+        if entry_bytes > self.max_bytes:
+            return
+
+        with self._lock:
+            # Outputs of a model which was replaced while they were computed are dropped
+            if self._model_version is not None and model_version < self._model_version:
+                return
+            self._sync_version(model_version)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (output, time.monotonic(), entry_bytes)
+            self.size_bytes += entry_bytes
+
+            while self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+                CACHE_EVICTIONS.inc()
+            CACHE_SIZE_BYTES.set(self.size_bytes)
+
+    def _remove(self, key: str):
+        """
+        Removes an entry. Must be called with the lock held.
+
+        Args:
+            key (str): The cache key of the image.
+        """
+        _, _, entry_bytes = self._entries.pop(key)
+        self.size_bytes -= entry_bytes
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The hits, misses, evictions, number of entries and size in bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+            }
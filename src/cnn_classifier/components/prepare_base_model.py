@@ -3,40 +3,90 @@ from typing import Optional
 
 import tensorflow as tf
 
+from cnn_classifier.components.model_store import ModelStore
 from cnn_classifier.entity.config_entity import BaseModelConfig
 
+# Backbone constructors and the rescaling of the [0, 1] input images to the range their
+# ImageNet weights expect. VGG16 keeps its historical [0, 1] input for existing models.
+BACKBONES = {
+    "vgg16": dict(constructor=tf.keras.applications.VGG16, rescaling=None, kwargs={}),
+    "resnet50_v2": dict(
+        constructor=tf.keras.applications.ResNet50V2,
+        rescaling=dict(scale=2.0, offset=-1.0),
+        kwargs={},
+    ),
+    "mobilenet_v3_small": dict(
+        constructor=tf.keras.applications.MobileNetV3Small,
+        rescaling=dict(scale=2.0, offset=-1.0),
+        kwargs=dict(include_preprocessing=False),
+    ),
+    "mobilenet_v3_large": dict(
+        constructor=tf.keras.applications.MobileNetV3Large,
+        rescaling=dict(scale=2.0, offset=-1.0),
+        kwargs=dict(include_preprocessing=False),
+    ),
+    "efficientnet_b0": dict(
+        constructor=tf.keras.applications.EfficientNetB0,
+        rescaling=dict(scale=255.0),
+        kwargs={},
+    ),
+}
+
 
 class PrepareBaseModel:
-    def __init__(self, config: BaseModelConfig):
+    def __init__(
+        self, config: BaseModelConfig, model_store: Optional[ModelStore] = None
+    ):
         """
         Initializes the class with the given BaseModelConfig object.
 
         Args:
             config (BaseModelConfig): The configuration object for base model.
+            model_store (Optional[ModelStore], optional): The store to hand the models to the next
+                stages in memory. Defaults to None, which saves them synchronously.
         """
         self.config = config
+        self.model_store = model_store
 
     def get_base_model(self):
         """Returns the base model for the given configuration."""
-        self.model = tf.keras.applications.vgg16.VGG16(
-            input_shape=self.config.image_size,
+        self.model = self.build_backbone(
+            backbone=self.config.backbone,
+            image_size=self.config.image_size,
             weights=self.config.weights,
             include_top=self.config.include_top,
         )
 
-        self.save_model(path=self.config.base_model_path, model=self.model)
+        self._persist(path=self.config.base_model_path, model=self.model)
 
     def update_base_model(self):
         """Updates the base model with the prepared full model with additional parameters."""
+        if self.model_store is not None:
+            # Freezing modifies the base model's layers, so its pending write must finish first
+            self.model_store.wait(self.config.base_model_path)
         self.full_model = self._prepare_full_model(
             model=self.model,
             classes=self.config.classes,
             freeze_all=True,
             freeze_till=None,
             learning_rate=self.config.learning_rate,
+            pooling=self.config.pooling,
         )
 
-        self.save_model(path=self.config.updated_base_model_path, model=self.full_model)
+        self._persist(path=self.config.updated_base_model_path, model=self.full_model)
+
+    def _persist(self, path: Path, model: tf.keras.Model):
+        """
+        Hands the model to the model store if there is one, otherwise saves it.
+
+        Args:
+            path (Path): The path where the model will be saved.
+            model (tf.keras.Model): The model to be saved.
+        """
+        if self.model_store is not None:
+            self.model_store.put(path, model)
+        else:
+            self.save_model(path=path, model=model)
 
     @staticmethod
     def save_model(path: Path, model: tf.keras.Model):
@@ -49,6 +99,42 @@ class PrepareBaseModel:
         """
         model.save(path)
 
+    @staticmethod
+    def build_backbone(
+        backbone: str, image_size: list, weights: str, include_top: bool = False
+    ) -> tf.keras.Model:
+        """
+        Builds a Keras Applications backbone taking [0, 1] images.
+
+        Args:
+            backbone (str): The backbone name, one of `BACKBONES`.
+            image_size (list): The input image shape.
+            weights (str): The pretrained weights, e.g. "imagenet", or None.
+            include_top (bool, optional): Whether to include the ImageNet classifier. Defaults to False.
+
+        Raises:
+            ValueError: If the backbone is unknown.
+
+        Returns:
+            tf.keras.Model: The backbone.
+        """
+        if backbone not in BACKBONES:
+            raise ValueError(
+                f"Unknown backbone: {backbone}, expected one of {list(BACKBONES)}"
+            )
+        spec = BACKBONES[backbone]
+        kwargs = dict(weights=weights, include_top=include_top, **spec["kwargs"])
+        if spec["rescaling"] is None:
+            return spec["constructor"](input_shape=image_size, **kwargs)
+
+        # The rescaling is built into the backbone graph, so its layers stay flat in the full model
+        inputs = tf.keras.Input(shape=image_size, name="image")
+        rescaled = tf.keras.layers.Rescaling(
+            **spec["rescaling"], name="backbone_rescaling"
+        )(inputs)
+
+        return spec["constructor"](input_tensor=rescaled, **kwargs)
+
     @staticmethod
     def _prepare_full_model(
         model: tf.keras.Model,
@@ -56,32 +142,42 @@ class PrepareBaseModel:
         freeze_all: bool = True,
         freeze_till: Optional[int] = None,
         learning_rate: float = 0.01,
+        pooling: str = "flatten",
     ) -> tf.keras.Model:
         """
-        Prepares a full model by freezing specified layers, adding a flatten layer,
-        a dense prediction layer, compiling the model, and returning the full model.
+        Prepares a full model by freezing specified layers, adding a flatten or global average
+        pooling layer, a dense prediction layer, compiling the model, and returning the full model.
 
         Args:
             model (tf.keras.Model): The input model.
             classes (int): The number of output classes.
             freeze_all (bool, optional): Whether to freeze all layers. Defaults to True.
-            freeze_till (Optional[int], optional): Number of layers to freeze from the end. Defaults to None.
+            freeze_till (Optional[int], optional): Number of layers at the end left trainable. Defaults to None.
             learning_rate (float, optional): Learning rate for the optimizer. Defaults to 0.01.
+            pooling (str, optional): Either "flatten" or "avg", global average pooling keeps the
+                dense layer small. Defaults to "flatten".
 
         Returns:
             tf.keras.Model: The compiled full model.
         """
-        if freeze_all:
-            model.trainable = False
-        elif (freeze_till is not None) and (freeze_till > 0):
-            for layer in model.layers[:-freeze_till]:
-                layer.trainable = False
-
-        flatten_in = tf.keras.layers.Flatten()(model.output)
-        prediction = tf.keras.layers.Dense(units=classes, activation="softmax")(
-            flatten_in
+        PrepareBaseModel.freeze_layers(
+            model.layers, freeze_all=freeze_all, freeze_till=freeze_till
         )
 
+        if pooling == "avg":
+            features = tf.keras.layers.GlobalAveragePooling2D(name="head_pooling")(
+                model.output
+            )
+        elif pooling == "flatten":
+            features = tf.keras.layers.Flatten(name="head_flatten")(model.output)
+        else:
+            raise ValueError(
+                f"Unknown pooling: {pooling}, expected either 'flatten' or 'avg'"
+            )
+        prediction = tf.keras.layers.Dense(
+            units=classes, activation="softmax", name="head_output"
+        )(features)
+
         full_model = tf.keras.models.Model(inputs=model.input, outputs=prediction)
         full_model.compile(
             optimizer=tf.keras.optimizers.legacy.SGD(learning_rate=learning_rate),
@@ -91,3 +187,52 @@ class PrepareBaseModel:
         full_model.summary()
 
         return full_model
+
+    @staticmethod
+    def freeze_layers(
+        layers: list, freeze_all: bool = True, freeze_till: Optional[int] = None
+    ):
+        """
+        Freezes backbone layers. Batch normalization layers always stay frozen so their
+        statistics are not disturbed by small fine-tuning batches.
+
+        Args:
+            layers (list): The backbone layers.
+            freeze_all (bool, optional): Whether to freeze all layers. Defaults to True.
+            freeze_till (Optional[int], optional): Number of layers at the end left trainable
+                when not freezing all, None leaves every layer trainable. Defaults to None.
+        """
+        if freeze_all:
+            trainable_from = len(layers)
+        elif (freeze_till is not None) and (freeze_till > 0):
+            trainable_from = max(0, len(layers) - freeze_till)
+        else:
+            trainable_from = 0
+
+        for i, layer in enumerate(layers):
+            layer.trainable = i >= trainable_from and not isinstance(
+                layer, tf.keras.layers.BatchNormalization
+            )
+
+    @staticmethod
+    def split_model(model: tf.keras.Model) -> tuple:
+        """
+        Splits a full model into its backbone and the layers of the classification head.
+        The head starts at the first layer named `head_*`, falling back to the last two
+        layers (Flatten + Dense) for models prepared before the head layers were named.
+
+        Args:
+            model (tf.keras.Model): The full model.
+
+        Returns:
+            tuple: The backbone `tf.keras.Model` and the list of head layers.
+        """
+        head_start = next(
+            (i for i, layer in enumerate(model.layers) if layer.name.startswith("head_")),
+            len(model.layers) - 2,
+        )
+        backbone = tf.keras.models.Model(
+            inputs=model.input, outputs=model.layers[head_start - 1].output
+        )
+
+        return backbone, model.layers[head_start:]
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import yaml
+from box import ConfigBox
+
+from cnn_classifier.constants import CONFIG_FILE_PATH
+from cnn_classifier.entity.config_entity import PipelineRunnerConfig
+
+# Files up to this size are hashed by content, larger ones by size and modification time
+CONTENT_HASH_MAX_BYTES = 1 << 20
+
+
+class StageFingerprint:
+    def __init__(
+        self, config: PipelineRunnerConfig, config_box: ConfigBox, params: ConfigBox
+    ):
+        """
+        Initializes the class which fingerprints the stages declared in `dvc.yaml`.
+
+        Args:
+            config (PipelineRunnerConfig): The configuration object for the pipeline runner.
+            config_box (ConfigBox): The loaded `config.yaml`.
+            params (ConfigBox): The loaded `params.yaml`.
+        """
+        self.config = config
+        self.config_box = config_box
+        self.params = params
+
+        with open(config.dvc_file) as f:
+            self.stages = yaml.safe_load(f)["stages"]
+
+    @staticmethod
+    def _hash_file(digest, path: str):
+        """
+        Adds a file to the digest, by content for small files and by stat for large ones.
+
+        Args:
+            digest: The hashlib digest to update.
+            path (str): The path of the file.
+        """
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:".encode())
+        if stat.st_size <= CONTENT_HASH_MAX_BYTES:
+            with open(path, "rb") as f:
+                digest.update(hashlib.file_digest(f, "sha256").digest())
+        else:
+            digest.update(str(stat.st_mtime_ns).encode())
+
+    def _hash_path(self, digest, path: str):
+        """
+        Adds a file or every file below a directory to the digest.
+
+        Args:
+            digest: The hashlib digest to update.
+            path (str): The path of the file or directory.
+        """
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file_name in sorted(files):
+                    self._hash_file(digest, os.path.join(root, file_name))
+        elif os.path.exists(path):
+            self._hash_file(digest, path)
+        else:
+            digest.update(f"{path}:missing".encode())
+
+    def _lookup_param(self, key: str) -> Any:
+        """
+        Resolves a dotted `dvc.yaml` params key such as `params.IMAGE_SIZE`.
+
+        Args:
+            key (str): The dotted key.
+
+        Returns:
+            Any: The value of the parameter, or None if it is not set.
+        """
+        value = self.params
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return None
+            value = value[part]
+
+        return value
+
+    def deps(self, stage: str) -> list:
+        """
+        Returns the dependencies of a stage as declared in `dvc.yaml`.
+
+        Args:
+            stage (str): The stage name in `dvc.yaml`.
+
+        Returns:
+            list: The dependency paths.
+        """
+        return self.stages[stage].get("deps", [])
+
+    def compute(self, stage: str) -> str:
+        """
+        Computes the fingerprint of a stage from its command, its own `config.yaml` section,
+        the `params.yaml` keys it declares and the contents of its other dependencies.
+
+        Args:
+            stage (str): The stage name in `dvc.yaml`.
+
+        Returns:
+            str: The hex digest of the fingerprint.
+        """
+        spec = self.stages[stage]
+        digest = hashlib.sha256(spec["cmd"].encode())
+
+        # Only the stage's own config section matters, not unrelated edits to config.yaml
+        digest.update(
+            json.dumps(
+                [self.config_box.get("artifacts_root"), self.config_box.get(stage)],
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+        params = {key: self._lookup_param(key) for key in spec.get("params", [])}
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+
+        for dep in self.deps(stage):
+            if Path(dep) != CONFIG_FILE_PATH:
+                self._hash_path(digest, dep)
+
+        return digest.hexdigest()
+
+    def _fingerprint_path(self, stage: str) -> str:
+        """
+        Returns the path of the stored fingerprint of a stage.
+
+        Args:
+            stage (str): The stage name in `dvc.yaml`.
+
+        Returns:
+            str: The path of the fingerprint file.
+        """
+        return os.path.join(self.config.fingerprint_dir, f"{stage}.json")
+
+    def is_up_to_date(self, stage: str, fingerprint: str) -> bool:
+        """
+        Checks whether a stage ran successfully with the same fingerprint and its outputs still exist.
+
+        Args:
+            stage (str): The stage name in `dvc.yaml`.
+            fingerprint (str): The current fingerprint of the stage.
+
+        Returns:
+            bool: True if the stage can be skipped.
+        """
+        path = self._fingerprint_path(stage)
+        if not os.path.exists(path):
+            return False
+        with open(path) as f:
+            stored = json.load(f)
+
+        return stored.get("fingerprint") == fingerprint and all(
+            os.path.exists(out) for out in self.stages[stage].get("outs", [])
+        )
+
+    def save(self, stage: str, fingerprint: str):
+        """
+        Persists the fingerprint of a stage after it ran successfully.
+
+        Args:
+            stage (str): The stage name in `dvc.yaml`.
+            fingerprint (str): The fingerprint the stage ran with.
+        """
+        os.makedirs(self.config.fingerprint_dir, exist_ok=True)
+        with open(self._fingerprint_path(stage), "w") as f:
+            json.dump(
+                {"fingerprint": fingerprint, "created_at": time.time()}, f, indent=4
+            )
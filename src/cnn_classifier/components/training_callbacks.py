@@ -0,0 +1,112 @@
+import json
+import os
+import time
+
+import tensorflow as tf
+
+from cnn_classifier import logger
+
+WEIGHTS_FILE = "weights.h5"
+STATE_FILE = "checkpoint.json"
+
+
+class EpochLogger(tf.keras.callbacks.Callback):
+    def __init__(self, samples_per_epoch: int):
+        """
+        Initializes the callback which logs the metrics and the throughput of every epoch.
+
+        Args:
+            samples_per_epoch (int): The number of training images per epoch.
+        """
+        super().__init__()
+        self.samples_per_epoch = samples_per_epoch
+
+    def on_epoch_begin(self, epoch: int, logs: dict = None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch: int, logs: dict = None):
+        duration = time.perf_counter() - self._start
+        metrics = ", ".join(
+            f"{name}: {value:.4f}" for name, value in (logs or {}).items()
+        )
+        logger.info(
+            f"Epoch {epoch + 1} took {duration:.1f}s "
+            f"({self.samples_per_epoch / duration:.1f} images/sec), {metrics}"
+        )
+
+
+class WeightCheckpoint(tf.keras.callbacks.Callback):
+    def __init__(self, checkpoint_dir: str, every_epochs: int, key: str):
+        """
+        Initializes the callback which periodically saves the model weights, without the
+        optimizer state, so an interrupted training run can be resumed.
+
+        Args:
+            checkpoint_dir (str): The directory of the checkpoint.
+            every_epochs (int): How many epochs pass between two checkpoints.
+            key (str): Identifies the training setup, a checkpoint is only resumed with the same key.
+        """
+        super().__init__()
+        self.checkpoint_dir = checkpoint_dir
+        self.every_epochs = every_epochs
+        self.key = key
+
+    def on_epoch_end(self, epoch: int, logs: dict = None):
+        if (epoch + 1) % self.every_epochs:
+            return
+
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        weights_path = os.path.join(self.checkpoint_dir, WEIGHTS_FILE)
+        state_path = os.path.join(self.checkpoint_dir, STATE_FILE)
+        # Both files are replaced atomically, the state last, so an interruption while
+        # saving leaves the previous checkpoint usable
+        self.model.save_weights(f"{weights_path}.tmp.h5")
+        os.replace(f"{weights_path}.tmp.h5", weights_path)
+        with open(f"{state_path}.tmp", "w") as f:
+            json.dump({"epoch": epoch + 1, "key": self.key}, f)
+        os.replace(f"{state_path}.tmp", state_path)
+        logger.info(
+            f"Saved checkpoint after epoch {epoch + 1} to {self.checkpoint_dir}"
+        )
+
+    @staticmethod
+    def restore(checkpoint_dir: str, key: str, model: tf.keras.Model) -> int:
+        """
+        Loads the last checkpoint into the model if it was saved with the same key.
+
+        Args:
+            checkpoint_dir (str): The directory of the checkpoint.
+            key (str): Identifies the training setup.
+            model (tf.keras.Model): The model to load the weights into.
+
+        Returns:
+            int: The number of epochs completed by the checkpoint, 0 if there is none.
+        """
+        state_path = os.path.join(checkpoint_dir, STATE_FILE)
+        if not os.path.exists(state_path):
+            return 0
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get("key") != key:
+            logger.info(
+                f"Ignoring checkpoint in {checkpoint_dir}, the training setup changed"
+            )
+            return 0
+
+        model.load_weights(os.path.join(checkpoint_dir, WEIGHTS_FILE))
+        logger.info(f"Resuming from the checkpoint after epoch {state['epoch']}")
+
+        return state["epoch"]
+
+    @staticmethod
+    def clear(checkpoint_dir: str):
+        """
+        Removes the checkpoint, e.g. once training completed.
+
+        Args:
+            checkpoint_dir (str): The directory of the checkpoint.
+        """
+        for file_name in (STATE_FILE, WEIGHTS_FILE):
+            path = os.path.join(checkpoint_dir, file_name)
+            if os.path.exists(path):
+                os.remove(path)
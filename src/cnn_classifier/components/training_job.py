@@ -0,0 +1,215 @@
+import fcntl
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+from cnn_classifier import logger
+from cnn_classifier.entity.config_entity import TrainingJobConfig
+
+ACTIVE_STATUSES = ("queued", "running")
+# How long a job started by another process may stay queued before it is considered lost
+QUEUED_TIMEOUT_SEC = 60
+# Serializes job submissions across the server's worker processes
+SUBMIT_LOCK_FILE = "submit.lock"
+
+
+def _write_status(path: Path, job: dict):
+    """
+    Atomically writes the job status so readers never see a partially written file.
+
+    Args:
+        path (Path): The path of the job status file.
+        job (dict): The job status.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(job, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _run_job(status_path: Path, target: Callable):
+    """
+    Entry point of the training process: runs the pipelines and records per-stage progress.
+
+    Args:
+        status_path (Path): The path of the job status file.
+        target (Callable): The function running the pipelines, called with a configuration
+            manager and a progress callback.
+    """
+    from cnn_classifier.config.configuration import ConfigurationManager
+
+    with open(status_path) as f:
+        job = json.load(f)
+    job.update(status="running", pid=os.getpid(), started_at=time.time())
+    _write_status(status_path, job)
+
+    def progress_callback(stage: str, status: str):
+        stage_status = job["stages"].setdefault(stage, {})
+        stage_status["status"] = status
+        if status == "running":
+            stage_status["started_at"] = time.time()
+        elif status != "skipped":
+            stage_status["finished_at"] = time.time()
+            stage_status["duration_sec"] = (
+                stage_status["finished_at"] - stage_status["started_at"]
+            )
+        _write_status(status_path, job)
+
+    try:
+        target(ConfigurationManager(), progress_callback=progress_callback)
+        job["status"] = "succeeded"
+    except Exception as e:
+        logger.error(f"Training job {job['job_id']} failed: {e}")
+        job.update(status="failed", error=str(e))
+    finally:
+        job["finished_at"] = time.time()
+        _write_status(status_path, job)
+
+
+class TrainingJobManager:
+    def __init__(self, config: TrainingJobConfig, target: Callable):
+        """
+        Initializes the manager which runs training in a separate process, one job at a time.
+
+        Args:
+            config (TrainingJobConfig): The configuration object for training jobs.
+            target (Callable): The function running the pipelines, e.g. `run_pipelines` from `main.py`.
+                It must be importable by a fresh interpreter.
+        """
+        self.config = config
+        self.target = target
+        self._processes = {}
+        self._lock = threading.Lock()
+
+    def _status_path(self, job_id: str) -> Path:
+        """
+        Returns the path of the status file of a job.
+
+        Args:
+            job_id (str): The job id.
+
+        Returns:
+            Path: The path of the job status file.
+        """
+        return Path(os.path.join(self.config.root_dir, f"{job_id}.json"))
+
+    @staticmethod
+    def _is_alive(pid: Optional[int]) -> bool:
+        """
+        Checks whether a process with the given id is still running.
+
+        Args:
+            pid (Optional[int]): The process id.
+
+        Returns:
+            bool: True if the process exists.
+        """
+        if pid is None:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+
+        return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """
+        Returns the status of a job, marking it failed if its process died unexpectedly.
+
+        Args:
+            job_id (str): The job id.
+
+        Returns:
+            Optional[dict]: The job status, or None if the job does not exist.
+        """
+        status_path = self._status_path(job_id)
+        if not os.path.exists(status_path):
+            return None
+        with open(status_path) as f:
+            job = json.load(f)
+
+        process = self._processes.get(job_id)
+        if process is not None:
+            # `is_alive` also reaps the finished child process
+            alive = process.is_alive()
+        elif job.get("pid") is not None:
+            alive = self._is_alive(job["pid"])
+        else:
+            alive = time.time() - job["created_at"] < QUEUED_TIMEOUT_SEC
+        if job["status"] in ACTIVE_STATUSES and not alive:
+            job.update(status="failed", error="Training process exited unexpectedly")
+            _write_status(status_path, job)
+
+        return job
+
+    def active_job(self) -> Optional[dict]:
+        """
+        Returns the currently queued or running job, if any.
+
+        Returns:
+            Optional[dict]: The job status of the active job.
+        """
+        for file_name in os.listdir(self.config.root_dir):
+            if not file_name.endswith(".json"):
+                continue
+            job = self.get(file_name[: -len(".json")])
+            if job is not None and job["status"] in ACTIVE_STATUSES:
+                return job
+
+        return None
+
+    def submit(self) -> dict:
+        """
+        Launches a new training job in a separate process and returns immediately.
+
+        Raises:
+            RuntimeError: If another training job is still queued or running.
+
+        Returns:
+            dict: The status of the new job.
+        """
+        with self._lock, open(
+            os.path.join(self.config.root_dir, SUBMIT_LOCK_FILE), "w"
+        ) as lock_file:
+            # Held until the new job's status file is written, so a concurrent submission in
+            # another worker process sees it as the active job
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            active_job = self.active_job()
+            if active_job is not None:
+                raise RuntimeError(
+                    f"Training job {active_job['job_id']} is already {active_job['status']}"
+                )
+
+            job_id = uuid.uuid4().hex
+            job = {
+                "job_id": job_id,
+                "status": "queued",
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "pid": None,
+                "error": None,
+                "stages": {},
+            }
+            status_path = self._status_path(job_id)
+            _write_status(status_path, job)
+
+            # Spawn a fresh interpreter so the child does not inherit the serving model or TF runtime
+            context = multiprocessing.get_context("spawn")
+            process = context.Process(
+                target=_run_job, args=(status_path, self.target), daemon=False
+            )
+            process.start()
+            self._processes[job_id] = process
+            job["pid"] = process.pid
+            logger.info(f"Started training job {job_id} (pid {process.pid})")
+
+            return job
@@ -3,10 +3,20 @@ import os
 from dotenv import load_dotenv
 
 from cnn_classifier.constants import *
-from cnn_classifier.entity.config_entity import (BaseModelConfig,
+from cnn_classifier.entity.config_entity import (BackboneReportConfig,
+                                                 BaseModelConfig,
+                                                 BatchPredictionConfig,
                                                  DataIngestionConfig,
+                                                 DataPreprocessingConfig,
+                                                 HyperparameterSweepConfig,
                                                  ModelEvaluationConfig,
-                                                 ModelTrainerConfig)
+                                                 ModelExportConfig,
+                                                 ModelTrainerConfig,
+                                                 MonitoringConfig,
+                                                 PipelineRunnerConfig,
+                                                 PredictionConfig,
+                                                 ServingConfig,
+                                                 TrainingJobConfig)
 from cnn_classifier.utils.common import create_directories, read_yaml
 
 load_dotenv()
@@ -49,10 +59,38 @@ class ConfigurationManager:
             local_data_file=cfg.local_data_file,
             unzip_dir=cfg.unzip_dir,
             prefix=cfg.prefix,
+            sha256=cfg.sha256,
+            extract_workers=cfg.extract_workers,
         )
 
         return data_ingestion_config
 
+    def get_data_preprocessing_config(self) -> DataPreprocessingConfig:
+        """
+        Returns the data preprocessing configuration based on the provided config.
+
+        Returns:
+            DataPreprocessingConfig: The data preprocessing configuration object.
+        """
+        cfg = self.config.data_preprocessing
+        params = self.params.params
+
+        data_path = [
+            f.path
+            for f in os.scandir(self.config.data_ingestion.unzip_dir)
+            if f.is_dir()
+        ][0]
+
+        create_directories([cfg.root_dir])
+
+        data_preprocessing_config = DataPreprocessingConfig(
+            root_dir=cfg.root_dir,
+            data_path=data_path,
+            image_size=params.IMAGE_SIZE,
+        )
+
+        return data_preprocessing_config
+
     def get_base_model_config(self) -> BaseModelConfig:
         """
         Returns the base model configuration based on the provided config.
@@ -74,6 +112,8 @@ class ConfigurationManager:
             include_top=params.INCLUDE_TOP,
             weights=params.WEIGHTS,
             classes=params.CLASSES,
+            backbone=params.BACKBONE,
+            pooling=params.POOLING,
         )
 
         return base_model_config
@@ -106,10 +146,77 @@ class ConfigurationManager:
             epochs=params.EPOCHS,
             batch_size=params.BATCH_SIZE,
             augmentation=params.AUGMENTATION,
+            input_pipeline=params.INPUT_PIPELINE,
+            dataset_cache_dir=self.config.data_preprocessing.root_dir,
+            training_mode=params.TRAINING_MODE,
+            feature_cache_dir=cfg.feature_cache_dir,
+            checkpoint_dir=cfg.checkpoint_dir,
+            early_stopping_patience=params.EARLY_STOPPING_PATIENCE,
+            checkpoint_every_epochs=params.CHECKPOINT_EVERY_EPOCHS,
+            resume=params.RESUME,
+            fine_tune_layers=params.FINE_TUNE_LAYERS,
+            fine_tune_epochs=params.FINE_TUNE_EPOCHS,
+            fine_tune_learning_rate=params.FINE_TUNE_LEARNING_RATE,
+            mixed_precision=params.MIXED_PRECISION,
+            jit_compile=params.JIT_COMPILE,
         )
 
         return model_trainer_config
 
+    def get_hyperparameter_sweep_config(self) -> HyperparameterSweepConfig:
+        """
+        Returns the hyperparameter sweep configuration based on the provided config.
+
+        Returns:
+            HyperparameterSweepConfig: The hyperparameter sweep configuration object.
+        """
+        cfg = self.config.hyperparameter_sweep
+
+        create_directories([cfg.root_dir])
+
+        hyperparameter_sweep_config = HyperparameterSweepConfig(
+            root_dir=cfg.root_dir,
+            report_file=cfg.report_file,
+            trained_model_file_path=self.config.model_trainer.trained_model_file_path,
+            search_space=cfg.search_space.to_dict(),
+            params=self.params.params.to_dict(),
+            num_trials=cfg.num_trials,
+            max_workers=cfg.max_workers,
+            threads_per_trial=cfg.threads_per_trial,
+            metric=cfg.metric,
+            mode=cfg.mode,
+            min_epochs=cfg.min_epochs,
+            reduction_factor=cfg.reduction_factor,
+            seed=cfg.seed,
+            promote=cfg.promote,
+            mlflow_uri=MLFLOW_TRACKING_URI,
+        )
+
+        return hyperparameter_sweep_config
+
+    def get_backbone_report_config(self) -> BackboneReportConfig:
+        """
+        Returns the backbone report configuration based on the provided config.
+
+        Returns:
+            BackboneReportConfig: The backbone report configuration object.
+        """
+        cfg = self.config.backbone_report
+
+        create_directories([cfg.root_dir])
+
+        backbone_report_config = BackboneReportConfig(
+            root_dir=cfg.root_dir,
+            report_file=cfg.report_file,
+            backbones=list(cfg.backbones),
+            pooling=cfg.pooling,
+            train=cfg.train,
+            latency_runs=cfg.latency_runs,
+            accuracy_bar=cfg.accuracy_bar,
+        )
+
+        return backbone_report_config
+
     def get_model_evaluation_config(self) -> ModelEvaluationConfig:
         """
         Returns the model evaluation configuration based on the provided config.
@@ -137,6 +244,174 @@ class ConfigurationManager:
             mlflow_uri=MLFLOW_TRACKING_URI,
             image_size=params.IMAGE_SIZE,
             batch_size=params.BATCH_SIZE,
+            input_pipeline=params.INPUT_PIPELINE,
+            dataset_cache_dir=self.config.data_preprocessing.root_dir,
+            mlflow_max_retries=cfg.mlflow_max_retries,
+            mlflow_retry_backoff_sec=cfg.mlflow_retry_backoff_sec,
+            score_file=cfg.score_file,
+            decision_threshold=params.DECISION_THRESHOLD,
+            positive_class=params.POSITIVE_CLASS,
+            calibration_bins=params.CALIBRATION_BINS,
         )
 
         return model_evaluation_config
+
+    def get_model_export_config(self) -> ModelExportConfig:
+        """
+        Returns the model export configuration based on the provided config.
+
+        Returns:
+            ModelExportConfig: The model export configuration object.
+        """
+        cfg = self.config.model_export
+        params = self.params.params
+
+        model_path = self.config.model_trainer.trained_model_file_path
+        data_path = [
+            f.path
+            for f in os.scandir(self.config.data_ingestion.unzip_dir)
+            if f.is_dir()
+        ][0]
+
+        create_directories([cfg.root_dir])
+
+        model_export_config = ModelExportConfig(
+            root_dir=cfg.root_dir,
+            model_path=model_path,
+            tflite_model_path=cfg.tflite_model_path,
+            report_file=cfg.report_file,
+            data_path=data_path,
+            image_size=params.IMAGE_SIZE,
+            batch_size=params.BATCH_SIZE,
+            input_pipeline=params.INPUT_PIPELINE,
+            dataset_cache_dir=self.config.data_preprocessing.root_dir,
+            quantization=params.QUANTIZATION,
+            calibration_samples=params.CALIBRATION_SAMPLES,
+        )
+
+        return model_export_config
+
+    def get_monitoring_config(self) -> MonitoringConfig:
+        """
+        Returns the monitoring configuration based on the provided config.
+
+        Returns:
+            MonitoringConfig: The monitoring configuration object.
+        """
+        cfg = self.config.monitoring
+
+        create_directories([cfg.metrics_dir])
+
+        monitoring_config = MonitoringConfig(metrics_dir=cfg.metrics_dir)
+
+        return monitoring_config
+
+    def get_pipeline_runner_config(self) -> PipelineRunnerConfig:
+        """
+        Returns the pipeline runner configuration based on the provided config.
+
+        Returns:
+            PipelineRunnerConfig: The pipeline runner configuration object.
+        """
+        cfg = self.config.pipeline_runner
+
+        create_directories([cfg.fingerprint_dir])
+
+        pipeline_runner_config = PipelineRunnerConfig(
+            dvc_file=cfg.dvc_file,
+            fingerprint_dir=cfg.fingerprint_dir,
+            in_memory_handoff=cfg.in_memory_handoff,
+        )
+
+        return pipeline_runner_config
+
+    def get_training_job_config(self) -> TrainingJobConfig:
+        """
+        Returns the training job configuration based on the provided config.
+
+        Returns:
+            TrainingJobConfig: The training job configuration object.
+        """
+        cfg = self.config.training_job
+
+        create_directories([cfg.root_dir])
+
+        training_job_config = TrainingJobConfig(root_dir=cfg.root_dir)
+
+        return training_job_config
+
+    def get_prediction_config(self) -> PredictionConfig:
+        """
+        Returns the prediction configuration based on the provided config.
+
+        Returns:
+            PredictionConfig: The prediction configuration object.
+        """
+        cfg = self.config.prediction
+        params = self.params.params
+
+        prediction_config = PredictionConfig(
+            backend=cfg.backend,
+            model_path=cfg.model_path,
+            tflite_model_path=cfg.tflite_model_path,
+            num_threads=cfg.num_threads,
+            image_size=params.IMAGE_SIZE,
+            preload=cfg.preload,
+            warm_up=cfg.warm_up,
+            hot_reload=cfg.hot_reload,
+            batching=cfg.batching,
+            max_batch_size=cfg.max_batch_size,
+            max_latency_ms=cfg.max_latency_ms,
+            cache=cfg.cache,
+            cache_max_bytes=cfg.cache_max_bytes,
+            cache_ttl_sec=cfg.cache_ttl_sec,
+        )
+
+        return prediction_config
+
+    def get_serving_config(self) -> ServingConfig:
+        """
+        Returns the serving configuration based on the provided config.
+
+        Returns:
+            ServingConfig: The serving configuration object.
+        """
+        cfg = self.config.serving
+
+        serving_config = ServingConfig(
+            bind=cfg.bind,
+            workers=cfg.workers,
+            threads=cfg.threads,
+            timeout=cfg.timeout,
+            intra_op_threads=cfg.intra_op_threads,
+            inter_op_threads=cfg.inter_op_threads,
+            max_upload_bytes=cfg.max_upload_bytes,
+            max_batch_images=cfg.max_batch_images,
+            inference_workers=cfg.inference_workers,
+            max_in_flight=cfg.max_in_flight,
+            overload_status_code=cfg.overload_status_code,
+            retry_after_sec=cfg.retry_after_sec,
+        )
+
+        return serving_config
+
+    def get_batch_prediction_config(self) -> BatchPredictionConfig:
+        """
+        Returns the batch prediction configuration based on the provided config.
+
+        Returns:
+            BatchPredictionConfig: The batch prediction configuration object.
+        """
+        cfg = self.config.batch_prediction
+
+        create_directories([cfg.root_dir])
+
+        batch_prediction_config = BatchPredictionConfig(
+            root_dir=cfg.root_dir,
+            output_file=cfg.output_file,
+            batch_size=cfg.batch_size,
+            num_workers=cfg.num_workers,
+            prefetch_batches=cfg.prefetch_batches,
+        )
+
+        return batch_prediction_config
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 
 @dataclass(frozen=True)
@@ -9,6 +10,15 @@ class DataIngestionConfig:
     local_data_file: Path
     unzip_dir: Path
     prefix: str
+    sha256: Optional[str]
+    extract_workers: int
+
+
+@dataclass(frozen=True)
+class DataPreprocessingConfig:
+    root_dir: Path
+    data_path: Path
+    image_size: list
 
 
 @dataclass(frozen=True)
@@ -21,6 +31,8 @@ class BaseModelConfig:
     include_top: bool
     weights: str
     classes: int
+    backbone: str
+    pooling: str
 
 
 @dataclass(frozen=True)
@@ -33,6 +45,49 @@ class ModelTrainerConfig:
     epochs: int
     batch_size: int
     augmentation: bool
+    input_pipeline: str
+    dataset_cache_dir: Path
+    training_mode: str
+    feature_cache_dir: Path
+    checkpoint_dir: Path
+    early_stopping_patience: Optional[int]
+    checkpoint_every_epochs: Optional[int]
+    resume: bool
+    fine_tune_layers: Optional[int]
+    fine_tune_epochs: int
+    fine_tune_learning_rate: float
+    mixed_precision: bool
+    jit_compile: bool
+
+
+@dataclass(frozen=True)
+class HyperparameterSweepConfig:
+    root_dir: Path
+    report_file: Path
+    trained_model_file_path: Path
+    search_space: dict
+    params: dict
+    num_trials: Optional[int]
+    max_workers: int
+    threads_per_trial: Optional[int]
+    metric: str
+    mode: str
+    min_epochs: int
+    reduction_factor: int
+    seed: int
+    promote: bool
+    mlflow_uri: str
+
+
+@dataclass(frozen=True)
+class BackboneReportConfig:
+    root_dir: Path
+    report_file: Path
+    backbones: list
+    pooling: str
+    train: bool
+    latency_runs: int
+    accuracy_bar: Optional[float]
 
 
 @dataclass(frozen=True)
@@ -44,3 +99,86 @@ class ModelEvaluationConfig:
     mlflow_uri: str
     image_size: list
     batch_size: int
+    input_pipeline: str
+    dataset_cache_dir: Path
+    mlflow_max_retries: int
+    mlflow_retry_backoff_sec: float
+    score_file: Path
+    decision_threshold: float
+    positive_class: str
+    calibration_bins: int
+
+
+@dataclass(frozen=True)
+class ModelExportConfig:
+    root_dir: Path
+    model_path: Path
+    tflite_model_path: Path
+    report_file: Path
+    data_path: Path
+    image_size: list
+    batch_size: int
+    input_pipeline: str
+    dataset_cache_dir: Path
+    quantization: str
+    calibration_samples: int
+
+
+@dataclass(frozen=True)
+class MonitoringConfig:
+    metrics_dir: Path
+
+
+@dataclass(frozen=True)
+class PipelineRunnerConfig:
+    dvc_file: Path
+    fingerprint_dir: Path
+    in_memory_handoff: bool
+
+
+@dataclass(frozen=True)
+class TrainingJobConfig:
+    root_dir: Path
+
+
+@dataclass(frozen=True)
+class PredictionConfig:
+    backend: str
+    model_path: Path
+    tflite_model_path: Path
+    num_threads: Optional[int]
+    image_size: list
+    preload: bool
+    warm_up: bool
+    hot_reload: bool
+    batching: bool
+    max_batch_size: int
+    max_latency_ms: float
+    cache: bool
+    cache_max_bytes: int
+    cache_ttl_sec: Optional[float]
+
+
+@dataclass(frozen=True)
+class ServingConfig:
+    bind: str
+    workers: int
+    threads: int
+    timeout: int
+    intra_op_threads: Optional[int]
+    inter_op_threads: int
+    max_upload_bytes: int
+    max_batch_images: int
+    inference_workers: int
+    max_in_flight: int
+    overload_status_code: int
+    retry_after_sec: int
+
+
+@dataclass(frozen=True)
+class BatchPredictionConfig:
+    root_dir: Path
+    output_file: Path
+    batch_size: int
+    num_workers: int
+    prefetch_batches: int
@@ -0,0 +1,39 @@
+from cnn_classifier import logger
+from cnn_classifier.components.backbone_report import BackboneReport
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.utils.monitoring import track_stage
+
+
+class BackboneReportPipeline:
+
+    def run_pipeline(self, configuration_manager: ConfigurationManager):
+        """
+        Method to run the backbone report pipeline.
+
+        Args:
+            configuration_manager (ConfigurationManager): The configuration manager object.
+
+        Raises:
+            e: Exception.
+        """
+        try:
+            logger.info("Backbone report started")
+            metrics_dir = configuration_manager.get_monitoring_config().metrics_dir
+            with track_stage("backbone_report", metrics_dir) as stage:
+                backbone_report = BackboneReport(
+                    config=configuration_manager.get_backbone_report_config(),
+                    base_model_config=configuration_manager.get_base_model_config(),
+                    model_trainer_config=configuration_manager.get_model_trainer_config(),
+                )
+                backbone_report.run()
+                stage.images = backbone_report.images_processed
+            logger.info("Backbone report ended")
+
+        except Exception as e:
+            logger.error(f"Backbone report failed: {e}")
+            raise e
+
+
+if __name__ == "__main__":
+    backbone_report_pipeline = BackboneReportPipeline()
+    backbone_report_pipeline.run_pipeline(configuration_manager=ConfigurationManager())
@@ -0,0 +1,74 @@
+import argparse
+from dataclasses import replace
+from pathlib import Path
+from typing import Optional
+
+from cnn_classifier import logger
+from cnn_classifier.components.batch_predictor import BatchPredictor
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.pipeline.prediction import PredictionPipeline
+from cnn_classifier.utils.monitoring import track_stage
+
+
+class BatchPredictionPipeline:
+
+    def run_pipeline(
+        self,
+        configuration_manager: ConfigurationManager,
+        input_dir: Path,
+        output_file: Optional[Path] = None,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        Method to run the batch prediction pipeline over a directory of images.
+
+        Args:
+            configuration_manager (ConfigurationManager): The configuration manager object.
+            input_dir (Path): The directory containing the images to score.
+            output_file (Optional[Path], optional): The JSONL or CSV output file. Defaults to the configured file.
+            batch_size (Optional[int], optional): The inference batch size. Defaults to the configured batch size.
+
+        Raises:
+            e: Exception.
+        """
+        try:
+            logger.info("Batch prediction started")
+            batch_prediction_config = (
+                configuration_manager.get_batch_prediction_config()
+            )
+            if batch_size is not None:
+                batch_prediction_config = replace(
+                    batch_prediction_config, batch_size=batch_size
+                )
+            metrics_dir = configuration_manager.get_monitoring_config().metrics_dir
+            with track_stage("batch_prediction", metrics_dir) as stage:
+                classifier = PredictionPipeline(
+                    config=configuration_manager.get_prediction_config()
+                )
+                batch_predictor = BatchPredictor(
+                    config=batch_prediction_config, classifier=classifier
+                )
+                stage.images = batch_predictor.predict_directory(
+                    input_dir, output_file
+                )
+            logger.info("Batch prediction completed")
+
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {e}")
+            raise e
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a directory of CT scans.")
+    parser.add_argument("input_dir", type=Path)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    batch_prediction_pipeline = BatchPredictionPipeline()
+    batch_prediction_pipeline.run_pipeline(
+        configuration_manager=ConfigurationManager(),
+        input_dir=args.input_dir,
+        output_file=args.output,
+        batch_size=args.batch_size,
+    )
@@ -1,6 +1,7 @@
 from cnn_classifier import logger
 from cnn_classifier.components.data_ingestion import DataIngestion
 from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.utils.monitoring import track_stage
 
 
 class DataIngestionPipeline:
@@ -17,10 +18,12 @@ class DataIngestionPipeline:
         """
         try:
             logger.info("Data ingestion started")
-            data_ingestion_config = configuration_manager.get_data_ingestion_config()
-            data_ingestion = DataIngestion(config=data_ingestion_config)
-            data_ingestion.download_data()
-            data_ingestion.extract_zip_file()
+            metrics_dir = configuration_manager.get_monitoring_config().metrics_dir
+            with track_stage("data_ingestion", metrics_dir) as stage:
+                data_ingestion_config = configuration_manager.get_data_ingestion_config()
+                data_ingestion = DataIngestion(config=data_ingestion_config)
+                data_ingestion.download_data()
+                data_ingestion.extract_zip_file()
             logger.info("Data ingestion completed")
 
         except Exception as e:
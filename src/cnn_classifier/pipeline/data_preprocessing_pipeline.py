@@ -0,0 +1,40 @@
+from cnn_classifier import logger
+from cnn_classifier.components.data_preprocessing import DataPreprocessing
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.utils.monitoring import track_stage
+
+
+class DataPreprocessingPipeline:
+
+    def run_pipeline(self, configuration_manager: ConfigurationManager):
+        """
+        Method to run the data preprocessing pipeline.
+
+        Args:
+            configuration_manager (ConfigurationManager): The configuration manager object.
+
+        Raises:
+            e: Exception.
+        """
+        try:
+            logger.info("Data preprocessing started")
+            metrics_dir = configuration_manager.get_monitoring_config().metrics_dir
+            with track_stage("data_preprocessing", metrics_dir) as stage:
+                data_preprocessing_config = (
+                    configuration_manager.get_data_preprocessing_config()
+                )
+                data_preprocessing = DataPreprocessing(config=data_preprocessing_config)
+                data_preprocessing.preprocess()
+                stage.images = data_preprocessing.images_processed
+            logger.info("Data preprocessing completed")
+
+        except Exception as e:
+            logger.error(f"Data preprocessing failed: {e}")
+            raise e
+
+
+if __name__ == "__main__":
+    data_preprocessing_pipeline = DataPreprocessingPipeline()
+    data_preprocessing_pipeline.run_pipeline(
+        configuration_manager=ConfigurationManager()
+    )
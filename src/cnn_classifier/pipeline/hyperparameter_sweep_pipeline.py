@@ -0,0 +1,40 @@
+from cnn_classifier import logger
+from cnn_classifier.components.hyperparameter_sweep import HyperparameterSweep
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.utils.monitoring import track_stage
+
+
+class HyperparameterSweepPipeline:
+
+    def run_pipeline(self, configuration_manager: ConfigurationManager):
+        """
+        Method to run the hyperparameter sweep pipeline.
+
+        Args:
+            configuration_manager (ConfigurationManager): The configuration manager object.
+
+        Raises:
+            e: Exception.
+        """
+        try:
+            logger.info("Hyperparameter sweep started")
+            metrics_dir = configuration_manager.get_monitoring_config().metrics_dir
+            with track_stage("hyperparameter_sweep", metrics_dir) as stage:
+                hyperparameter_sweep = HyperparameterSweep(
+                    config=configuration_manager.get_hyperparameter_sweep_config(),
+                    model_trainer_config=configuration_manager.get_model_trainer_config(),
+                )
+                hyperparameter_sweep.run()
+                stage.images = hyperparameter_sweep.images_processed
+            logger.info("Hyperparameter sweep ended")
+
+        except Exception as e:
+            logger.error(f"Hyperparameter sweep failed: {e}")
+            raise e
+
+
+if __name__ == "__main__":
+    hyperparameter_sweep_pipeline = HyperparameterSweepPipeline()
+    hyperparameter_sweep_pipeline.run_pipeline(
+        configuration_manager=ConfigurationManager()
+    )
@@ -1,28 +1,48 @@
+from pathlib import Path
+from typing import Optional
+
 from cnn_classifier import logger
 from cnn_classifier.components.model_evaluation import ModelEvaluation
+from cnn_classifier.components.model_store import ModelStore
 from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.utils.monitoring import track_stage
 
 
 class ModelEvaluationPipeline:
 
-    def run_pipeline(self, configuration_manager: ConfigurationManager):
+    def run_pipeline(
+        self,
+        configuration_manager: ConfigurationManager,
+        model_store: Optional[ModelStore] = None,
+    ):
         """
         Method to run the model evaluation pipeline.
 
         Args:
             configuration_manager (ConfigurationManager): The configuration manager object.
+            model_store (Optional[ModelStore], optional): The store to exchange models in memory
+                with the other stages. Defaults to None.
 
         Raises:
             e: Exception.
         """
         try:
             logger.info("Model evaluation started")
-            model_evaluation_config = (
-                configuration_manager.get_model_evaluation_config()
-            )
-            model_evaluation = ModelEvaluation(config=model_evaluation_config)
-            model_evaluation.evaluation()
-            # model_evaluation.log_into_mlflow()  # only for production
+            metrics_dir = configuration_manager.get_monitoring_config().metrics_dir
+            with track_stage("model_evaluation", metrics_dir) as stage:
+                model_evaluation_config = (
+                    configuration_manager.get_model_evaluation_config()
+                )
+                model_evaluation = ModelEvaluation(
+                    config=model_evaluation_config, model_store=model_store
+                )
+                model_evaluation.evaluation()
+                model_evaluation.save_score(
+                    path=Path(model_evaluation_config.score_file),
+                    scores=model_evaluation.scores,
+                )
+                # model_evaluation.log_into_mlflow()  # only for production
+                stage.images = model_evaluation.images_processed
             logger.info("Model evaluation ended")
 
         except Exception as e:
@@ -0,0 +1,48 @@
+from typing import Optional
+
+from cnn_classifier import logger
+from cnn_classifier.components.model_export import ModelExport
+from cnn_classifier.components.model_store import ModelStore
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.utils.monitoring import track_stage
+
+
+class ModelExportPipeline:
+
+    def run_pipeline(
+        self,
+        configuration_manager: ConfigurationManager,
+        model_store: Optional[ModelStore] = None,
+    ):
+        """
+        Method to run the model export pipeline.
+
+        Args:
+            configuration_manager (ConfigurationManager): The configuration manager object.
+            model_store (Optional[ModelStore], optional): The store to exchange models in memory
+                with the other stages. Defaults to None.
+
+        Raises:
+            e: Exception.
+        """
+        try:
+            logger.info("Model export started")
+            metrics_dir = configuration_manager.get_monitoring_config().metrics_dir
+            with track_stage("model_export", metrics_dir) as stage:
+                model_export_config = configuration_manager.get_model_export_config()
+                model_export = ModelExport(
+                    config=model_export_config, model_store=model_store
+                )
+                model_export.export()
+                model_export.compare()
+                stage.images = model_export.images_processed
+            logger.info("Model export completed")
+
+        except Exception as e:
+            logger.error(f"Model export failed: {e}")
+            raise e
+
+
+if __name__ == "__main__":
+    model_export_pipeline = ModelExportPipeline()
+    model_export_pipeline.run_pipeline(configuration_manager=ConfigurationManager())
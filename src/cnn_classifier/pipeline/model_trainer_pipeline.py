@@ -1,27 +1,43 @@
+from typing import Optional
+
 from cnn_classifier import logger
+from cnn_classifier.components.model_store import ModelStore
 from cnn_classifier.components.model_trainer import ModelTrainer
 from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.utils.monitoring import track_stage
 
 
 class ModelTrainerPipeline:
 
-    def run_pipeline(self, configuration_manager: ConfigurationManager):
+    def run_pipeline(
+        self,
+        configuration_manager: ConfigurationManager,
+        model_store: Optional[ModelStore] = None,
+    ):
         """
         Method to run the base model trainer pipeline.
 
         Args:
             configuration_manager (ConfigurationManager): The configuration manager object.
+            model_store (Optional[ModelStore], optional): The store to exchange models in memory
+                with the other stages. Defaults to None.
 
         Raises:
             e: Exception.
         """
         try:
             logger.info("Model training started")
-            model_trainer_config = configuration_manager.get_model_trainer_config()
-            model_trainer = ModelTrainer(config=model_trainer_config)
-            model_trainer.get_base_model()
-            model_trainer.train_val_generator()
-            model_trainer.train()
+            metrics_dir = configuration_manager.get_monitoring_config().metrics_dir
+            with track_stage("model_trainer", metrics_dir) as stage:
+                model_trainer_config = configuration_manager.get_model_trainer_config()
+                model_trainer = ModelTrainer(
+                    config=model_trainer_config, model_store=model_store
+                )
+                # Build the data pipelines first to overlap with a pending base model write
+                model_trainer.train_val_generator()
+                model_trainer.get_base_model()
+                model_trainer.train()
+                stage.images = model_trainer.images_processed
             logger.info("Model training ended")
 
         except Exception as e:
@@ -1,41 +1,313 @@
-import os
+import asyncio
+from concurrent.futures import Executor
+from typing import Optional
 
 import numpy as np
 
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
+from cnn_classifier.components.micro_batcher import MicroBatcher
+from cnn_classifier.components.model_holder import ModelHolder
+from cnn_classifier.components.prediction_cache import PredictionCache
+from cnn_classifier.entity.config_entity import PredictionConfig
+from cnn_classifier.utils.common import decode_base64, load_image_array
+from cnn_classifier.utils.monitoring import PHASE_LATENCY
 
 
 class PredictionPipeline:
 
-    def __init__(self, file_name: str):
+    def __init__(self, config: PredictionConfig):
         """
-        Initializes the class with the given file name.
+        Initializes the class with the given PredictionConfig object and loads
+        the model once for the lifetime of the process.
 
         Args:
-            file_name (str): The name of the file.
+            config (PredictionConfig): The configuration object for prediction.
         """
-        self.file_name = file_name
+        self.config = config
+        self.model_holder = ModelHolder(
+            model_path=(
+                config.tflite_model_path
+                if config.backend == "tflite"
+                else config.model_path
+            ),
+            image_size=config.image_size,
+            warm_up=config.warm_up,
+            hot_reload=config.hot_reload,
+            backend=config.backend,
+            num_threads=config.num_threads,
+        )
+
+        if config.preload:
+            self.model_holder.load()
+
+        self.batcher = (
+            MicroBatcher(
+                predict_fn=self.model_holder.predict,
+                max_batch_size=config.max_batch_size,
+                max_latency_ms=config.max_latency_ms,
+            )
+            if config.batching
+            else None
+        )
+        self.cache = (
+            PredictionCache(
+                max_bytes=config.cache_max_bytes, ttl_sec=config.cache_ttl_sec
+            )
+            if config.cache
+            else None
+        )
+
+    def preprocess(self, img_bytes: bytes) -> np.ndarray:
+        """
+        Decodes and resizes the encoded image bytes in memory.
+
+        Args:
+            img_bytes (bytes): The encoded image bytes.
+
+        Returns:
+            np.ndarray: The image array with shape (H, W, C).
+        """
+        return load_image_array(img_bytes, target_size=self.config.image_size[:-1])
+
+    @staticmethod
+    def _stack_batch(images: list, errors: dict) -> np.ndarray:
+        """
+        Stacks the preprocessed images of a batch request into a batch.
+
+        Args:
+            images (list): The preprocessed images.
+            errors (dict): The decoding error of every invalid image by its index.
+
+        Raises:
+            ValueError: If the request has no images or some images are invalid.
+
+        Returns:
+            np.ndarray: The batch of images with shape (N, H, W, C).
+        """
+        if errors:
+            raise ValueError(
+                "Invalid images: "
+                + "; ".join(f"{index}: {error}" for index, error in errors.items())
+            )
+        if not images:
+            raise ValueError("No images in request")
+
+        return np.stack(images)
+
+    def preprocess_batch(self, img_strs: list) -> np.ndarray:
+        """
+        Decodes and resizes the base64 encoded images of a batch request.
+
+        Args:
+            img_strs (list): The base64 encoded image strings.
+
+        Raises:
+            ValueError: If the request has no images or some images are invalid.
+
+        Returns:
+            np.ndarray: The batch of images with shape (N, H, W, C).
+        """
+        images, errors = [], {}
+        for index, img_str in enumerate(img_strs):
+            try:
+                images.append(self.preprocess(decode_base64(img_str)))
+            except (ValueError, TypeError, OSError) as e:
+                errors[index] = str(e)
+
+        return self._stack_batch(images, errors)
+
+    @staticmethod
+    def to_label(class_index: int) -> str:
+        """
+        Maps a predicted class index to its human readable label.
+
+        Args:
+            class_index (int): The predicted class index.
+
+        Returns:
+            str: The label of the class.
+        """
+        return "Normal" if class_index == 1 else "Adenocarcinoma Cancer"
+
+    @classmethod
+    def _to_response(cls, class_index: int) -> list:
+        """
+        Maps a predicted class index to the response returned to clients.
+
+        Args:
+            class_index (int): The predicted class index.
+
+        Returns:
+            list: List of dictionary containing the prediction.
+        """
+        return [{"image": cls.to_label(class_index)}]
+
+    def predict_proba(self, images: np.ndarray, batch_size: int = None) -> np.ndarray:
+        """
+        Runs inference on preprocessed images in chunks of at most `batch_size` images.
+
+        Args:
+            images (np.ndarray): The images with shape (N, H, W, C).
+            batch_size (int, optional): The maximum chunk size. Defaults to the configured max batch size.
+
+        Returns:
+            np.ndarray: The predicted class probabilities with shape (N, classes).
+        """
+        batch_size = batch_size or self.config.max_batch_size
+
+        return np.concatenate(
+            [
+                self.model_holder.predict(images[i : i + batch_size])
+                for i in range(0, len(images), batch_size)
+            ]
+        )
+
+    def predict_batch(self, images: np.ndarray) -> list:
+        """
+        Makes predictions on a batch of preprocessed images.
+
+        Args:
+            images (np.ndarray): The batch of images with shape (N, H, W, C).
+
+        Returns:
+            list: List of prediction responses, one per image.
+        """
+        result = np.argmax(self.predict_proba(images), axis=1)
+
+        return [self._to_response(class_index) for class_index in result]
+
+    def _lookup(self, img_bytes: bytes) -> tuple:
+        """
+        Looks up the model output of an image in the prediction cache.
+
+        Args:
+            img_bytes (bytes): The encoded image bytes.
+
+        Returns:
+            tuple: The cache key, the model version and the cached output or None.
+        """
+        if self.cache is None:
+            return None, None, None
+
+        # Picks up a hot reloaded model first, so its version invalidates the cache
+        self.model_holder.get_model()
+        key = PredictionCache.key(img_bytes)
+        model_version = self.model_holder.version
+
+        return key, model_version, self.cache.get(key, model_version)
+
+    def _store(self, key: Optional[str], model_version: int, output: np.ndarray):
+        """
+        Stores the model output of an image in the prediction cache, if enabled.
+
+        Args:
+            key (Optional[str]): The cache key returned by `_lookup`.
+            model_version (int): The model version returned by `_lookup`.
+            output (np.ndarray): The model output.
+        """
+        if self.cache is not None:
+            self.cache.put(key, model_version, output)
 
-    def predict(self) -> list:
+    def predict(self, img_bytes: bytes) -> list:
         """
         A method to make a prediction using a trained model and return the prediction result.
+        Repeated images are answered from the prediction cache. Otherwise the image is decoded
+        in memory so concurrent requests never share state on disk, and when batching is enabled
+        it is grouped with other in-flight requests into one forward pass.
+
+        Args:
+            img_bytes (bytes): The encoded image bytes.
+
+        Returns:
+            list: List of dictionary containing the prediction.
+        """
+        with PHASE_LATENCY.labels(phase="cache").time():
+            key, model_version, output = self._lookup(img_bytes)
+        if output is None:
+            with PHASE_LATENCY.labels(phase="preprocess").time():
+                test_image = self.preprocess(img_bytes)
+            with PHASE_LATENCY.labels(phase="inference").time():
+                if self.batcher is None:
+                    output = self.model_holder.predict(
+                        np.expand_dims(test_image, axis=0)
+                    )[0]
+                else:
+                    output = self.batcher.predict(test_image)
+            self._store(key, model_version, output)
+
+        return self._to_response(int(np.argmax(output)))
+
+    async def predict_async(self, img_str: str, executor: Executor) -> list:
+        """
+        Asynchronous variant of `predict` for the ASGI app taking the base64 encoded image.
+        Decoding, the cache lookup and preprocessing run on the executor, and with batching
+        enabled the event loop awaits the batch result without blocking any thread.
+
+        Args:
+            img_str (str): The base64 encoded image string.
+            executor (Executor): The executor running the CPU-bound work.
 
         Returns:
             list: List of dictionary containing the prediction.
         """
-        # Load the model
-        model = load_model(os.path.join("model", "trained_model.keras"))
+        loop = asyncio.get_running_loop()
+        with PHASE_LATENCY.labels(phase="decode").time():
+            img_bytes = await loop.run_in_executor(executor, decode_base64, img_str)
+        with PHASE_LATENCY.labels(phase="cache").time():
+            key, model_version, output = await loop.run_in_executor(
+                executor, self._lookup, img_bytes
+            )
+        if output is None:
+            with PHASE_LATENCY.labels(phase="preprocess").time():
+                test_image = await loop.run_in_executor(
+                    executor, self.preprocess, img_bytes
+                )
+            with PHASE_LATENCY.labels(phase="inference").time():
+                if self.batcher is None:
+                    outputs = await loop.run_in_executor(
+                        executor, self.model_holder.predict, test_image[np.newaxis]
+                    )
+                    output = outputs[0]
+                else:
+                    output = await asyncio.wrap_future(
+                        self.batcher.submit(test_image)
+                    )
+            self._store(key, model_version, output)
+
+        return self._to_response(int(np.argmax(output)))
+
+    async def predict_batch_async(self, img_strs: list, executor: Executor) -> list:
+        """
+        Asynchronous variant of `predict_batch` for the ASGI app taking base64 encoded images.
 
-        image_name = self.file_name
-        test_image = image.load_img(image_name, target_size=(224, 224))
-        test_image = image.img_to_array(test_image)
-        test_image = np.expand_dims(test_image, axis=0)
-        result = np.argmax(model.predict(test_image), axis=1)
-        print(result)
+        Args:
+            img_strs (list): The base64 encoded image strings.
+            executor (Executor): The executor running the CPU-bound work.
+
+        Raises:
+            ValueError: If the request has no images or some images are invalid.
+
+        Returns:
+            list: List of prediction responses, one per image.
+        """
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    executor, lambda s=img_str: self.preprocess(decode_base64(s))
+                )
+                for img_str in img_strs
+            ],
+            return_exceptions=True,
+        )
+        images, errors = [], {}
+        for index, result in enumerate(results):
+            if isinstance(result, (ValueError, TypeError, OSError)):
+                errors[index] = str(result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                images.append(result)
 
-        return (
-            [{"image": "Normal"}]
-            if result[0] == 1
-            else [{"image": "Adenocarcinoma Cancer"}]
+        return await loop.run_in_executor(
+            executor, self.predict_batch, self._stack_batch(images, errors)
         )
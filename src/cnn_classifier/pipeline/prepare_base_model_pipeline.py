@@ -1,26 +1,40 @@
+from typing import Optional
+
 from cnn_classifier import logger
+from cnn_classifier.components.model_store import ModelStore
 from cnn_classifier.components.prepare_base_model import PrepareBaseModel
 from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.utils.monitoring import track_stage
 
 
 class PrepareBaseModelPipeline:
 
-    def run_pipeline(self, configuration_manager: ConfigurationManager):
+    def run_pipeline(
+        self,
+        configuration_manager: ConfigurationManager,
+        model_store: Optional[ModelStore] = None,
+    ):
         """
         Method to run the base model preparation pipeline.
 
         Args:
             configuration_manager (ConfigurationManager): The configuration manager object.
+            model_store (Optional[ModelStore], optional): The store to exchange models in memory
+                with the other stages. Defaults to None.
 
         Raises:
             e: Exception.
         """
         try:
             logger.info("Base model preparation started")
-            base_model_config = configuration_manager.get_base_model_config()
-            prepare_base_model = PrepareBaseModel(config=base_model_config)
-            prepare_base_model.get_base_model()
-            prepare_base_model.update_base_model()
+            metrics_dir = configuration_manager.get_monitoring_config().metrics_dir
+            with track_stage("prepare_base_model", metrics_dir) as stage:
+                base_model_config = configuration_manager.get_base_model_config()
+                prepare_base_model = PrepareBaseModel(
+                    config=base_model_config, model_store=model_store
+                )
+                prepare_base_model.get_base_model()
+                prepare_base_model.update_base_model()
             logger.info("Base model preparation completed")
 
         except Exception as e:
@@ -0,0 +1,262 @@
+from typing import Optional
+
+import numpy as np
+
+# Same clipping as `tf.keras.losses.CategoricalCrossentropy`
+EPSILON = 1e-7
+
+
+def predict_labels(
+    probabilities: np.ndarray,
+    threshold: float = 0.5,
+    positive_index: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Turns class probabilities into predicted labels. Binary classifiers with a positive class
+    predict it whenever its probability reaches the threshold, otherwise the most likely class wins.
+
+    Args:
+        probabilities (np.ndarray): The (samples, classes) probabilities.
+        threshold (float, optional): The decision threshold of the positive class. Defaults to 0.5.
+        positive_index (Optional[int], optional): The index of the positive class. Defaults to None.
+
+    Returns:
+        np.ndarray: The predicted labels.
+    """
+    if positive_index is not None and probabilities.shape[1] == 2:
+        return np.where(
+            probabilities[:, positive_index] >= threshold,
+            positive_index,
+            1 - positive_index,
+        )
+
+    return np.argmax(probabilities, axis=1)
+
+
+def confusion_matrix(
+    labels: np.ndarray, predictions: np.ndarray, num_classes: int
+) -> np.ndarray:
+    """
+    Computes the confusion matrix with true labels as rows and predictions as columns.
+
+    Args:
+        labels (np.ndarray): The true labels.
+        predictions (np.ndarray): The predicted labels.
+        num_classes (int): The number of classes.
+
+    Returns:
+        np.ndarray: The (classes, classes) matrix of counts.
+    """
+    return np.bincount(
+        labels * num_classes + predictions, minlength=num_classes**2
+    ).reshape(num_classes, num_classes)
+
+
+def precision_recall_f1(matrix: np.ndarray) -> tuple:
+    """
+    Computes per-class precision, recall and F1 from a confusion matrix, using 0 where
+    a class is never predicted or never present.
+
+    Args:
+        matrix (np.ndarray): The confusion matrix.
+
+    Returns:
+        tuple: The precision, recall and F1 arrays.
+    """
+    true_positives = np.diag(matrix).astype(np.float64)
+    predicted = matrix.sum(axis=0)
+    actual = matrix.sum(axis=1)
+
+    precision = np.divide(
+        true_positives,
+        predicted,
+        out=np.zeros_like(true_positives),
+        where=predicted > 0,
+    )
+    recall = np.divide(
+        true_positives, actual, out=np.zeros_like(true_positives), where=actual > 0
+    )
+    denominator = precision + recall
+    f1 = np.divide(
+        2 * precision * recall,
+        denominator,
+        out=np.zeros_like(true_positives),
+        where=denominator > 0,
+    )
+
+    return precision, recall, f1
+
+
+def roc_auc(probabilities: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """
+    Computes the one-vs-rest ROC-AUC of every class from the Mann-Whitney U statistic,
+    with tied scores receiving their average rank.
+
+    Args:
+        probabilities (np.ndarray): The (samples, classes) probabilities.
+        labels (np.ndarray): The true labels.
+
+    Returns:
+        np.ndarray: The ROC-AUC per class, NaN for classes without positives or negatives.
+    """
+    num_classes = probabilities.shape[1]
+    auc = np.full(num_classes, np.nan)
+    for class_index in range(num_classes):
+        positives = labels == class_index
+        num_positives = int(positives.sum())
+        num_negatives = len(labels) - num_positives
+        if num_positives == 0 or num_negatives == 0:
+            continue
+
+        _, inverse, counts = np.unique(
+            probabilities[:, class_index], return_inverse=True, return_counts=True
+        )
+        average_ranks = np.cumsum(counts) - (counts - 1) / 2
+        rank_sum = average_ranks[inverse][positives].sum()
+        auc[class_index] = (rank_sum - num_positives * (num_positives + 1) / 2) / (
+            num_positives * num_negatives
+        )
+
+    return auc
+
+
+def calibration(
+    probabilities: np.ndarray, labels: np.ndarray, num_bins: int = 15
+) -> dict:
+    """
+    Computes the expected calibration error (ECE) of the top-class confidence and the
+    reliability diagram over equal-width confidence bins.
+
+    Args:
+        probabilities (np.ndarray): The (samples, classes) probabilities.
+        labels (np.ndarray): The true labels.
+        num_bins (int, optional): The number of confidence bins. Defaults to 15.
+
+    Returns:
+        dict: The ECE and the per-bin count, accuracy and mean confidence.
+    """
+    confidence = probabilities.max(axis=1)
+    correct = (np.argmax(probabilities, axis=1) == labels).astype(np.float64)
+    bins = np.minimum((confidence * num_bins).astype(int), num_bins - 1)
+
+    count = np.bincount(bins, minlength=num_bins)
+    confidence_sum = np.bincount(bins, weights=confidence, minlength=num_bins)
+    correct_sum = np.bincount(bins, weights=correct, minlength=num_bins)
+    nonempty = count > 0
+
+    bin_accuracy = np.divide(
+        correct_sum, count, out=np.zeros(num_bins), where=nonempty
+    )
+    bin_confidence = np.divide(
+        confidence_sum, count, out=np.zeros(num_bins), where=nonempty
+    )
+
+    return {
+        "ece": float(np.abs(correct_sum - confidence_sum).sum() / len(labels)),
+        "bin_count": count.tolist(),
+        "bin_accuracy": bin_accuracy.tolist(),
+        "bin_confidence": bin_confidence.tolist(),
+    }
+
+
+def _to_float(value: float) -> Optional[float]:
+    """
+    Converts a metric to a JSON-safe float, mapping NaN to None.
+
+    Args:
+        value (float): The metric value.
+
+    Returns:
+        Optional[float]: The float value or None.
+    """
+    return None if np.isnan(value) else float(value)
+
+
+def classification_report(
+    probabilities: np.ndarray,
+    labels: np.ndarray,
+    class_names: list,
+    threshold: float = 0.5,
+    positive_class: Optional[str] = None,
+    calibration_bins: int = 15,
+) -> dict:
+    """
+    Computes loss, accuracy, the confusion matrix, per-class and macro precision/recall/F1,
+    ROC-AUC and calibration from a single set of predicted probabilities.
+
+    Args:
+        probabilities (np.ndarray): The (samples, classes) softmax probabilities.
+        labels (np.ndarray): The true labels.
+        class_names (list): The class names in label order.
+        threshold (float, optional): The decision threshold of the positive class. Defaults to 0.5.
+        positive_class (Optional[str], optional): The positive class of a binary classifier.
+            Defaults to None, which predicts the most likely class.
+        calibration_bins (int, optional): The number of calibration bins. Defaults to 15.
+
+    Returns:
+        dict: The JSON-serializable report.
+    """
+    num_classes = len(class_names)
+    positive_index = (
+        class_names.index(positive_class) if positive_class in class_names else None
+    )
+    predictions = predict_labels(probabilities, threshold, positive_index)
+
+    matrix = confusion_matrix(labels, predictions, num_classes)
+    precision, recall, f1 = precision_recall_f1(matrix)
+    auc = roc_auc(probabilities, labels)
+    true_probabilities = probabilities[np.arange(len(labels)), labels]
+
+    return {
+        "loss": float(-np.mean(np.log(np.clip(true_probabilities, EPSILON, 1.0)))),
+        "accuracy": float(np.mean(predictions == labels)),
+        "threshold": threshold,
+        "positive_class": positive_class if positive_index is not None else None,
+        "macro_precision": float(precision.mean()),
+        "macro_recall": float(recall.mean()),
+        "macro_f1": float(f1.mean()),
+        "macro_roc_auc": (
+            None if np.all(np.isnan(auc)) else _to_float(np.nanmean(auc))
+        ),
+        "per_class": {
+            class_name: {
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "f1": float(f1[i]),
+                "roc_auc": _to_float(auc[i]),
+                "support": int(matrix[i].sum()),
+            }
+            for i, class_name in enumerate(class_names)
+        },
+        "confusion_matrix": {"labels": class_names, "matrix": matrix.tolist()},
+        "calibration": calibration(probabilities, labels, calibration_bins),
+    }
+
+
+def scalar_metrics(report: dict) -> dict:
+    """
+    Flattens the scalar values of a classification report into MLflow metric names.
+
+    Args:
+        report (dict): The report returned by `classification_report`.
+
+    Returns:
+        dict: The metric names and values, leaving out undefined metrics.
+    """
+    metrics = {
+        key: report[key]
+        for key in (
+            "loss",
+            "accuracy",
+            "macro_precision",
+            "macro_recall",
+            "macro_f1",
+            "macro_roc_auc",
+        )
+    }
+    metrics["ece"] = report["calibration"]["ece"]
+    for class_name, class_metrics in report["per_class"].items():
+        for key in ("precision", "recall", "f1", "roc_auc"):
+            metrics[f"{key}_{class_name}"] = class_metrics[key]
+
+    return {key: value for key, value in metrics.items() if value is not None}
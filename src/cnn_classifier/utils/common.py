@@ -1,14 +1,16 @@
 import base64
+import io
 import json
 import os
 from pathlib import Path
 from typing import Any
 
-import joblib
+import numpy as np
 import yaml
 from box import ConfigBox
 from box.exceptions import BoxValueError
 from ensure import ensure_annotations
+from PIL import Image
 
 from cnn_classifier import logger
 
@@ -99,6 +101,8 @@ def save_bin(data: Any, path: Path):
         data (Any): The data to be saved.
         path (Path): The file path where the data will be saved.
     """
+    import joblib
+
     joblib.dump(value=data, filename=path)
     logger.info(f"Binary file saved at: {path}")
 
@@ -114,6 +118,8 @@ def load_bin(path: Path) -> Any:
     Returns:
         Any: The loaded data from the binary file.
     """
+    import joblib
+
     data = joblib.load(path)
     logger.info(f"Binary file loaded from: {path}")
 
@@ -136,6 +142,19 @@ def get_size(path: Path) -> str:
     return f"~ {size_in_kb} KB"
 
 
+def decode_base64(img_str: str) -> bytes:
+    """
+    Decodes the base64 encoded image string into raw image bytes.
+
+    Args:
+        img_str (str): The base64 encoded image string.
+
+    Returns:
+        bytes: The encoded image bytes (e.g. JPEG or PNG).
+    """
+    return base64.b64decode(img_str)
+
+
 def decode_image(img_str: str, file_name: str):
     """
     Decodes the base64 encoded image string and writes the resulting image data to a file.
@@ -144,11 +163,32 @@ def decode_image(img_str: str, file_name: str):
         img_str (str): The base64 encoded image string.
         file_name (str): The name of the file to write the image data to.
     """
-    img_data = base64.b64decode(img_str)
+    img_data = decode_base64(img_str)
     with open(file_name, "wb") as f:
         f.write(img_data)
 
 
+def load_image_array(img_bytes: bytes, target_size: tuple) -> np.ndarray:
+    """
+    Decodes encoded image bytes entirely in memory and resizes them into an array,
+    mirroring `tf.keras.preprocessing.image.load_img` followed by `img_to_array`.
+
+    Args:
+        img_bytes (bytes): The encoded image bytes (e.g. JPEG or PNG).
+        target_size (tuple): The target size as (height, width).
+
+    Returns:
+        np.ndarray: The float32 image array with shape (height, width, 3).
+    """
+    with Image.open(io.BytesIO(img_bytes)) as img:
+        img = img.convert("RGB")
+        width_height = (target_size[1], target_size[0])
+        if img.size != width_height:
+            img = img.resize(width_height, Image.NEAREST)
+
+        return np.asarray(img, dtype=np.float32)
+
+
 def encode_image(img_path: str) -> str:
     """
     Encodes an image file to base64.
@@ -0,0 +1,152 @@
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry,
+                               Counter, Gauge, Histogram, generate_latest,
+                               multiprocess, write_to_textfile)
+
+from cnn_classifier import logger
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+# Serving metrics, registered in the default registry
+REQUESTS = Counter(
+    "cnn_classifier_requests_total",
+    "HTTP requests by endpoint and status code.",
+    ["endpoint", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "cnn_classifier_request_latency_seconds",
+    "HTTP request latency by endpoint.",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+PHASE_LATENCY = Histogram(
+    "cnn_classifier_predict_phase_seconds",
+    "Prediction latency by phase: decode, cache, preprocess, inference, serialization.",
+    ["phase"],
+    buckets=LATENCY_BUCKETS,
+)
+FORWARD_PASS_LATENCY = Histogram(
+    "cnn_classifier_forward_pass_seconds",
+    "Latency of a single model forward pass.",
+    buckets=LATENCY_BUCKETS,
+)
+BATCH_SIZE = Histogram(
+    "cnn_classifier_inference_batch_size",
+    "Number of images per model forward pass.",
+    buckets=BATCH_SIZE_BUCKETS,
+)
+MODEL_LOAD_SECONDS = Histogram(
+    "cnn_classifier_model_load_seconds",
+    "Time to load and warm up the serving model.",
+    ["backend"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+MODEL_VERSION = Gauge(
+    "cnn_classifier_model_version",
+    "Number of times the serving model was loaded.",
+    multiprocess_mode="max",
+)
+CACHE_REQUESTS = Counter(
+    "cnn_classifier_prediction_cache_requests_total",
+    "Prediction cache lookups by result.",
+    ["result"],
+)
+CACHE_EVICTIONS = Counter(
+    "cnn_classifier_prediction_cache_evictions_total",
+    "Entries evicted from the prediction cache.",
+)
+CACHE_SIZE_BYTES = Gauge(
+    "cnn_classifier_prediction_cache_size_bytes",
+    "Approximate memory used by the prediction cache.",
+    multiprocess_mode="livesum",
+)
+
+
+def render_metrics() -> tuple:
+    """
+    Renders the serving metrics in the Prometheus text format, aggregating every gunicorn
+    worker when `PROMETHEUS_MULTIPROC_DIR` is set.
+
+    Returns:
+        tuple: The response body and its content type.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+@contextmanager
+def track_stage(stage: str, metrics_dir: Optional[Path] = None):
+    """
+    Measures the duration and throughput of a pipeline stage and writes them in the Prometheus
+    text format to `<metrics_dir>/<stage>.prom`, e.g. for the node exporter textfile collector.
+    Set `images` on the yielded object to report the number of images the stage processed.
+
+    Args:
+        stage (str): The stage name.
+        metrics_dir (Optional[Path], optional): The directory of the metrics files.
+            Defaults to None, which only logs the metrics.
+
+    Yields:
+        SimpleNamespace: The tracker with an `images` attribute.
+    """
+    tracker = SimpleNamespace(images=0)
+    start = time.perf_counter()
+    yield tracker
+    duration = time.perf_counter() - start
+
+    registry = CollectorRegistry()
+    labels = dict(stage=stage)
+    Gauge(
+        "cnn_classifier_pipeline_stage_duration_seconds",
+        "Duration of the last successful run of a pipeline stage.",
+        list(labels),
+        registry=registry,
+    ).labels(**labels).set(duration)
+    Gauge(
+        "cnn_classifier_pipeline_stage_last_success_timestamp_seconds",
+        "Time of the last successful run of a pipeline stage.",
+        list(labels),
+        registry=registry,
+    ).labels(**labels).set_to_current_time()
+
+    message = f"Stage {stage} took {duration:.2f}s"
+    if tracker.images:
+        images_per_sec = tracker.images / duration
+        Gauge(
+            "cnn_classifier_pipeline_stage_images_per_second",
+            "Images processed per second by the last successful run of a pipeline stage.",
+            list(labels),
+            registry=registry,
+        ).labels(**labels).set(images_per_sec)
+        message += f" ({tracker.images} images, {images_per_sec:.1f} images/sec)"
+    logger.info(message)
+
+    if metrics_dir is not None:
+        os.makedirs(metrics_dir, exist_ok=True)
+        write_to_textfile(os.path.join(metrics_dir, f"{stage}.prom"), registry)
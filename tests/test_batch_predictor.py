@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+
+from cnn_classifier.entity.config_entity import BatchPredictionConfig
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("tensorflow")
+
+from cnn_classifier.components.batch_predictor import BatchPredictor  # noqa: E402
+
+
+class FailingClassifier:
+    def preprocess(self, img_bytes: bytes) -> np.ndarray:
+        return np.zeros((2, 2, 3), dtype=np.float32)
+
+    def predict_proba(self, images: np.ndarray, batch_size: int = None) -> np.ndarray:
+        raise RuntimeError("inference failed")
+
+
+def test_loader_thread_stops_when_inference_fails(tmp_path):
+    input_dir = tmp_path / "images"
+    input_dir.mkdir()
+    for i in range(20):
+        (input_dir / f"{i:02d}.png").write_bytes(b"")
+    batch_predictor = BatchPredictor(
+        config=BatchPredictionConfig(
+            root_dir=tmp_path,
+            output_file=tmp_path / "predictions.jsonl",
+            batch_size=1,
+            num_workers=1,
+            prefetch_batches=1,
+        ),
+        classifier=FailingClassifier(),
+    )
+
+    with pytest.raises(RuntimeError):
+        batch_predictor.predict_directory(input_dir)
+
+    loaders = [
+        thread for thread in threading.enumerate() if thread.name == "batch-loader"
+    ]
+    for thread in loaders:
+        thread.join(timeout=5)
+    assert not any(thread.is_alive() for thread in loaders)
@@ -0,0 +1,47 @@
+import os
+import zipfile
+
+import pytest
+
+from cnn_classifier.components.data_ingestion import DataIngestion
+from cnn_classifier.entity.config_entity import DataIngestionConfig
+
+
+def make_data_ingestion(tmp_path, members: dict) -> DataIngestion:
+    local_data_file = tmp_path / "data.zip"
+    with zipfile.ZipFile(local_data_file, "w") as f:
+        for name, data in members.items():
+            f.writestr(name, data)
+
+    return DataIngestion(
+        config=DataIngestionConfig(
+            root_dir=tmp_path,
+            source_url="",
+            local_data_file=local_data_file,
+            unzip_dir=tmp_path / "unzip",
+            prefix="",
+            sha256=None,
+            extract_workers=2,
+        )
+    )
+
+
+def test_extract_zip_file(tmp_path):
+    data_ingestion = make_data_ingestion(
+        tmp_path, {"data/": b"", "data/a.txt": b"a", "data/b/c.txt": b"c"}
+    )
+    data_ingestion.extract_zip_file()
+
+    assert (tmp_path / "unzip" / "data" / "a.txt").read_bytes() == b"a"
+    assert (tmp_path / "unzip" / "data" / "b" / "c.txt").read_bytes() == b"c"
+    assert data_ingestion._zip_files == []
+
+
+@pytest.mark.parametrize("name", ["../outside/", "../outside.txt"])
+def test_extract_zip_file_rejects_members_outside_unzip_dir(tmp_path, name: str):
+    data_ingestion = make_data_ingestion(tmp_path, {name: b"x"})
+
+    with pytest.raises(ValueError):
+        data_ingestion.extract_zip_file()
+    assert not os.path.exists(tmp_path / "outside")
+    assert not os.path.exists(tmp_path / "outside.txt")
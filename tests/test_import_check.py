@@ -0,0 +1,11 @@
+import pytest
+
+from benchmarks.import_check import CHECKS, run_check
+
+
+@pytest.mark.parametrize("name", list(CHECKS))
+def test_no_heavy_imports(name: str):
+    code, forbidden = CHECKS[name]
+    result = run_check(code, forbidden)
+
+    assert result["passed"], f"{name} imported {', '.join(result['imported'])}"
@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from cnn_classifier.components.micro_batcher import MicroBatcher  # noqa: E402
+
+
+def test_cancelled_future_does_not_stop_the_worker():
+    started, release = threading.Event(), threading.Event()
+
+    def predict_fn(images: np.ndarray) -> np.ndarray:
+        started.set()
+        release.wait(timeout=5)
+        return images.sum(axis=(1, 2, 3))
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=1, max_latency_ms=0)
+    try:
+        first = batcher.submit(np.ones((2, 2, 1)))
+        assert started.wait(timeout=5)
+        # Queued behind the running batch and cancelled before it is processed
+        cancelled = batcher.submit(np.ones((2, 2, 1)))
+        assert cancelled.cancel()
+        release.set()
+
+        assert first.result(timeout=5) == 4
+        assert batcher.submit(np.full((2, 2, 1), 2.0)).result(timeout=5) == 8
+        assert batcher._thread.is_alive()
+    finally:
+        release.set()
+        batcher.close()
+
+
+def test_failed_batch_does_not_stop_the_worker():
+    def predict_fn(images: np.ndarray) -> np.ndarray:
+        if images.max() < 0:
+            raise ValueError("invalid images")
+        return images.sum(axis=(1, 2, 3))
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=1, max_latency_ms=0)
+    try:
+        with pytest.raises(ValueError):
+            batcher.submit(np.full((2, 2, 1), -1.0)).result(timeout=5)
+        assert batcher.submit(np.ones((2, 2, 1))).result(timeout=5) == 4
+    finally:
+        batcher.close()
+
+
+def test_submit_after_close_raises():
+    batcher = MicroBatcher(lambda images: images, max_batch_size=1)
+    batcher.close()
+
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.ones((2, 2, 1)))
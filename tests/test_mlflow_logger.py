@@ -0,0 +1,38 @@
+import pytest
+
+mlflow = pytest.importorskip("mlflow")
+tf = pytest.importorskip("tensorflow")
+
+from mlflow.tracking import MlflowClient  # noqa: E402
+
+from cnn_classifier.components.mlflow_logger import AsyncMlflowLogger  # noqa: E402
+
+
+def test_logs_to_a_local_file_store(tmp_path):
+    tracking_uri = (tmp_path / "mlruns").as_uri()
+    model = tf.keras.Sequential(
+        [tf.keras.Input(shape=(4,)), tf.keras.layers.Dense(2, activation="softmax")]
+    )
+
+    mlflow_logger = AsyncMlflowLogger(tracking_uri=tracking_uri)
+    run_id = mlflow_logger.start_run(experiment_name="test")
+    mlflow_logger.log_params({"epochs": 2, "batch_size": 16})
+    mlflow_logger.log_metrics({"loss": 0.5, "accuracy": 0.75})
+    mlflow_logger.log_model(model, "model")
+    # The model was serialized already, so changing it now must not affect the logged one
+    model.layers[-1].kernel.assign(tf.zeros_like(model.layers[-1].kernel))
+    mlflow_logger.close()
+
+    client = MlflowClient(tracking_uri=tracking_uri)
+    run = client.get_run(run_id)
+    assert run.info.status == "FINISHED"
+    assert run.data.params == {"epochs": "2", "batch_size": "16"}
+    assert run.data.metrics == {"loss": 0.5, "accuracy": 0.75}
+    assert "model" in [artifact.path for artifact in client.list_artifacts(run_id)]
+
+    download_dir = tmp_path / "download"
+    download_dir.mkdir()
+    logged_model = mlflow.keras.load_model(
+        client.download_artifacts(run_id, "model", str(download_dir))
+    )
+    assert tf.reduce_any(logged_model.layers[-1].kernel != 0)